@@ -0,0 +1,196 @@
+"""
+Shared helpers for the benchmark scripts: percentiles, peak RSS and JSON results.
+
+Every script writes its results as::
+
+    {"benchmark": ..., "timestamp": ..., "python": ..., "params": {...},
+     "peak_rss_mb": ..., "peak_rss_scope": "process" | "process tree",
+     "results": {case: {metric: value}}}
+
+and ``--baseline`` compares a run against an earlier results file.
+"""
+import importlib.util
+import json
+import math
+import os
+import platform
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+if importlib.util.find_spec("psutil") is not None:
+    import psutil
+else:
+    psutil = None
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Metrics where a larger value is an improvement (everything else is a time or a size)
+HIGHER_IS_BETTER = ("throughput_rps", "speedup")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+def latency_summary(timings_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99, mean and max of a list of timings in milliseconds."""
+    values = sorted(timings_ms)
+    return {
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p95_ms": round(percentile(values, 0.95), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MiB (None where the resource module is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _proc_tree_rss(root: int) -> int:
+    """RSS in bytes of a process and its descendants, from /proc (Linux)."""
+    children: Dict[int, List[int]] = {}
+    rss: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as file:
+                # The fields after the parenthesized command name: state, ppid, ...
+                fields = file.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{entry}/statm", encoding="utf-8") as file:
+                rss[int(entry)] = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue  # Exited while scanning
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    total, pending = 0, [root]
+    while pending:
+        pid = pending.pop()
+        total += rss.get(pid, 0)
+        pending.extend(children.get(pid, ()))
+    return total
+
+
+def process_tree_rss_mb() -> float | None:
+    """Current RSS of this process plus all its child processes in MiB (psutil, or /proc; None elsewhere)."""
+    if psutil is not None:
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+    if sys.platform.startswith("linux"):
+        return _proc_tree_rss(os.getpid()) / (1024 * 1024)
+    return None
+
+
+class PeakRssSampler:
+    """
+    Peak RSS of this process and its child processes (the parse pool workers).
+
+    ru_maxrss only covers this process, so the total is sampled in a background
+    thread every interval seconds while the sampler is active.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        while True:
+            current = process_tree_rss_mb()
+            if current is None:
+                return
+            self.peak_mb = max(self.peak_mb or 0.0, current)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "PeakRssSampler":
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        if self.peak_mb is not None:
+            self.peak_mb = round(self.peak_mb, 1)
+
+
+def write_results(name: str, params: Dict[str, Any], results: Dict[str, Dict[str, Any]],
+                  path: str | None = None, tree_peak_rss_mb: float | None = None) -> Dict[str, Any]:
+    """
+    Write a results file (default benchmarks/results/<name>.json) and return its content.
+
+    With tree_peak_rss_mb (see PeakRssSampler), the peak RSS includes the child processes.
+    """
+    document = {
+        "benchmark": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "peak_rss_mb": tree_peak_rss_mb if tree_peak_rss_mb is not None else peak_rss_mb(),
+        "peak_rss_scope": "process tree" if tree_peak_rss_mb is not None else "process",
+        "results": results,
+    }
+    path = path or os.path.join(RESULTS_DIR, f"{name}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+    print(f"Results written to {path}")
+    return document
+
+
+def _numeric_metrics(document: Dict[str, Any]) -> Dict[str, float]:
+    metrics = {}
+    for case, values in document.get("results", {}).items():
+        for metric, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[f"{case}.{metric}"] = float(value)
+    if isinstance(document.get("peak_rss_mb"), (int, float)):
+        metrics["peak_rss_mb"] = float(document["peak_rss_mb"])
+    return metrics
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read a results file (load a baseline before writing, as runs overwrite the default path)."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print every metric present in both runs with its relative change; regressions are flagged."""
+    if baseline.get("params") != current.get("params"):
+        print("Warning: baseline was run with different parameters")
+    if baseline.get("peak_rss_scope", "process") != current.get("peak_rss_scope", "process"):
+        print("Warning: peak RSS of the baseline covers a different set of processes")
+    before = _numeric_metrics(baseline)
+    after = _numeric_metrics(current)
+
+    print(f"\n{'metric':56} {'baseline':>12} {'current':>12} {'change':>9}")
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = (new - old) / old * 100 if old else 0.0
+        worse = change < 0 if key.endswith(HIGHER_IS_BETTER) else change > 0
+        flag = "  <-" if worse and abs(change) >= 10 else ""
+        print(f"{key[:56]:56} {old:>12.3f} {new:>12.3f} {change:>+8.1f}%{flag}")
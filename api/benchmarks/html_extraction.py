@@ -0,0 +1,84 @@
+"""
+Benchmark the generic HTML section extractors.
+
+Compares the BeautifulSoup (html.parser) extractor with the single-pass lxml
+extractor on publisher article pages: by default every page in
+``benchmarks/pages/``, or the pages given on the command line. A synthetic,
+deeply nested page is added as an extra case (skip it with --no-synthetic).
+
+Usage:
+    python benchmarks/html_extraction.py [page.html ...] [--repeat N] [--no-synthetic]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from html_sections import extract_html_sections as extract_single_pass  # noqa: E402
+from sections import extract_html_sections_bs4  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+
+def synthetic_page(sections: int = 40, depth: int = 12, paragraphs: int = 6) -> bytes:
+    """A worst case for repeated get_text(): deeply nested layout divs around long paragraphs."""
+    words = "microgravity exposure alters bone density and muscle mass in spaceflight crews " * 4
+    headings = ["Introduction", "Materials and Methods", "Results", "Discussion", "Supplementary"]
+    parts = [
+        "<html><head><title>Synthetic Article</title>",
+        "<script>var tracking = {};</script><style>.x { color: red }</style></head><body>",
+    ]
+    for index in range(sections):
+        heading = headings[index % len(headings)]
+        parts.append("<div class='layout'>" * depth)
+        parts.append(f"<section><h2>{heading}</h2>")
+        for _ in range(paragraphs):
+            parts.append(f"<p>{heading} {words}<a href='#r'>[1]</a> {words}</p>")
+        parts.append("</section>")
+        parts.append("</div>" * depth)
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def time_extractor(extract, content: bytes, repeat: int) -> float:
+    """Median wall time of one extraction in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="Saved HTML pages (default: benchmarks/pages/*.html)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per extractor and page")
+    parser.add_argument("--no-synthetic", action="store_true", help="Leave out the synthetic nested page")
+    args = parser.parse_args()
+
+    paths = args.pages or sorted(glob.glob(os.path.join(PAGES_DIR, "*.html")))
+    pages = []
+    for path in paths:
+        with open(path, "rb") as file:
+            pages.append((path, file.read()))
+    if not args.no_synthetic:
+        pages.append(("<synthetic>", synthetic_page()))
+
+    print(f"{'page':40} {'size':>10} {'bs4 ms':>10} {'lxml ms':>10} {'speedup':>8}  fields equal")
+    for name, content in pages:
+        bs4_ms = time_extractor(extract_html_sections_bs4, content, args.repeat)
+        lxml_ms = time_extractor(extract_single_pass, content, args.repeat)
+        expected = extract_html_sections_bs4(content)
+        actual = extract_single_pass(content)
+        equal = sum(expected[key] == actual[key] for key in expected)
+        print(f"{os.path.basename(name)[:40]:40} {len(content):>10} {bs4_ms:>10.1f} {lxml_ms:>10.1f} "
+              f"{bs4_ms / lxml_ms:>7.1f}x  {equal}/{len(expected)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Load test the API offline against local NCBI, publisher and Gemini stand-ins.
+
+Starts the fake E-utilities/publisher server from fakes.py, points the app at
+it, swaps in a FakeGenerativeModel and drives /summarize-get, /summarize and
+/chat in process (through httpx's ASGI transport, app lifespan included) at
+the given concurrency. Reports p50/p95/p99 latency and throughput per
+endpoint, and the peak RSS of the process together with its parse pool
+worker processes.
+
+Request i of a scenario uses paper i modulo --papers, so with --papers smaller
+than --requests the later requests of /summarize-get are cache hits. A share
+of the papers (--html-ratio) are publisher pages instead of PMC articles.
+
+Usage:
+    python benchmarks/load_test.py [--requests 200] [--concurrency 16] [--papers 50]
+        [--llm-latency 0.05] [--ncbi-latency 0.02] [--page-latency 0.02]
+        [--scenarios summarize-get summarize chat] [--recordings DIR]
+        [--output PATH] [--baseline PATH]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import httpx  # noqa: E402
+
+from common import PeakRssSampler, compare_results, latency_summary, load_results, write_results  # noqa: E402
+from fakes import FakeGenerativeModel, start_fake_eutils  # noqa: E402
+
+SCENARIOS = ("summarize-get", "summarize", "chat")
+
+
+def paper_urls(server, count: int, html_ratio: float) -> List[str]:
+    """Distinct paper URLs: PMC articles, with every n-th one a publisher page."""
+    html_every = round(1 / html_ratio) if html_ratio > 0 else 0
+    urls = []
+    for index in range(count):
+        if html_every and index % html_every == html_every - 1:
+            urls.append(server.page_url(f"paper-{index}"))
+        else:
+            urls.append(f"https://pmc.ncbi.nlm.nih.gov/articles/PMC{100000 + index}/")
+    return urls
+
+
+def chat_messages(papers: List[Dict[str, Any]], count: int) -> List[str]:
+    """Chat questions built from the corpus keywords."""
+    messages = []
+    for paper in papers[:count]:
+        keywords = paper.get('keywords') or paper.get('title', '').split()[:3]
+        messages.append(f"What does the research say about {' '.join(keywords[:3])}?")
+    return messages or ["What happens to bone density in microgravity?"]
+
+
+def build_request(scenario: str, index: int, urls: List[str], messages: List[str]) -> Dict[str, Any]:
+    if scenario == "summarize-get":
+        return {"method": "GET", "url": "/summarize-get", "params": {"url": urls[index % len(urls)]}}
+    if scenario == "summarize":
+        return {"method": "POST", "url": "/summarize", "json": {"url": urls[index % len(urls)]}}
+    return {"method": "GET", "url": "/chat", "params": {"message": messages[index % len(messages)]}}
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, requests: int, concurrency: int,
+                       urls: List[str], messages: List[str]) -> Dict[str, Any]:
+    """Send requests with at most concurrency in flight; returns latency and throughput figures."""
+    timings: List[float] = []
+    statuses: Counter = Counter()
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(**build_request(scenario, index, urls, messages))
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            timings.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    duration = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": sum(count for status, count in statuses.items() if status != "200"),
+        "statuses": dict(statuses),
+        **latency_summary(timings),
+        "throughput_rps": round(requests / duration, 2) if duration else 0.0,
+        "duration_seconds": round(duration, 3),
+    }
+
+
+async def run(args, server, api) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    async with api.lifespan(api.app):
+        urls = paper_urls(server, args.papers, args.html_ratio)
+        messages = chat_messages(list(api.corpus_manager.snapshot.papers), args.papers)
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            for scenario in args.scenarios:
+                efetch_before = len(server.requests)
+                pages_before = len(server.page_requests)
+                llm_before = api.ai_model.calls
+                results[scenario] = await run_scenario(client, scenario, args.requests, args.concurrency, urls, messages)
+                results[scenario].update({
+                    "efetch_requests": len(server.requests) - efetch_before,
+                    "page_requests": len(server.page_requests) - pages_before,
+                    "llm_calls": api.ai_model.calls - llm_before,
+                })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--papers", type=int, default=50, help="Distinct papers (and chat messages) requested")
+    parser.add_argument("--html-ratio", type=float, default=0.2, help="Share of papers that are publisher pages")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake model call")
+    parser.add_argument("--ncbi-latency", type=float, default=0.02, help="Seconds per fake efetch request")
+    parser.add_argument("--page-latency", type=float, default=0.02, help="Seconds per fake publisher page request")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--recordings", help="Directory of recorded <PMC ID>.xml and <name>.html responses to replay")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/load_test.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    server = start_fake_eutils(latency=args.ncbi_latency, page_latency=args.page_latency, recordings=args.recordings)
+    # The app reads its configuration at import time. Rate limits are lifted so the
+    # service itself is measured; caches are in memory so every run starts cold.
+    os.environ.update({
+        'EUTILS_BASE_URL': server.base_url,
+        'IDCONV_BASE_URL': server.idconv_url,
+        'NCBI_API_KEY': 'fake-key',
+        'NCBI_REQUESTS_PER_SECOND': '0',
+        'GEMINI_REQUESTS_PER_SECOND': '0',
+        'CACHE_BACKEND': 'memory',
+        'LLM_CACHE_BACKEND': 'memory',
+    })
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    import main as api
+    api.ai_model = FakeGenerativeModel(latency=args.llm_latency)
+
+    with PeakRssSampler() as rss:
+        results = asyncio.run(run(args, server, api))
+    server.shutdown()
+
+    print(f"{'scenario':16} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for scenario, figures in results.items():
+        print(f"{scenario:16} {figures['requests']:>9} {figures['errors']:>7} {figures['p50_ms']:>9.1f} "
+              f"{figures['p95_ms']:>9.1f} {figures['p99_ms']:>9.1f} {figures['throughput_rps']:>9.1f}")
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    document = write_results("load_test", params, results, args.output, tree_peak_rss_mb=rss.peak_mb)
+    print(f"Peak RSS (with parse workers): {document['peak_rss_mb']} MiB")
+    if baseline:
+        compare_results(document, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Micro-benchmarks for the request hot paths.
+
+- find_most_relevant_paper (the "sequence" chat engine) over the corpus from
+  assets/papers.json scaled by each --scales factor (one run per query),
+  next to the numpy and bm25 index searches used by default;
+- parse_pmc_xml_content (PMC XML parsing plus a zero-latency fake model call,
+  with the LLM response cache off) and the lxml/BeautifulSoup PMC extractors
+  on synthetic JATS articles scaled by the same factors;
+- extract_text_content on synthetic publisher pages (BeautifulSoup parsing
+  is done outside the timed region).
+
+Reports the median and p95 of each case in milliseconds.
+
+Usage:
+    python benchmarks/micro.py [--scales 1 4 16] [--repeat 20] [--output PATH] [--baseline PATH]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from common import compare_results, latency_summary, load_results, write_results  # noqa: E402
+from fakes import FakeGenerativeModel, jats_article, publisher_page  # noqa: E402
+from pmc_parser import extract_pmc_sections as extract_pmc_sections_streaming  # noqa: E402
+from retrieval import find_most_relevant_paper  # noqa: E402
+from sections import extract_pmc_sections_bs4, extract_text_content  # noqa: E402
+
+QUERIES = (
+    "bone loss in microgravity",
+    "How does spaceflight affect the immune system of mice?",
+    "plant root growth on the space station",
+    "radiation exposure and cardiovascular risk for astronauts",
+    "muscle atrophy",
+)
+
+
+def scaled_corpus(papers: List[Dict[str, Any]], scale: int) -> List[Dict[str, Any]]:
+    """The corpus repeated scale times, copies made distinct by a title suffix."""
+    corpus = list(papers)
+    for copy in range(1, scale):
+        corpus.extend({**paper, 'title': f"{paper.get('title', '')} ({copy})"} for paper in papers)
+    return corpus
+
+
+def time_calls(call: Callable[[], Any], repeat: int, setup: Callable[[], Any] | None = None) -> List[float]:
+    """Wall time of repeat calls in milliseconds; setup() runs untimed before each call and its result is passed in."""
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        call(argument) if setup else call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def case(timings: List[float], **extra) -> Dict[str, Any]:
+    summary = latency_summary(timings)
+    return {"median_ms": summary["p50_ms"], "p95_ms": summary["p95_ms"], "runs": len(timings), **extra}
+
+
+def bench_retrieval(papers: List[Dict[str, Any]], scale: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    from retrieval import BM25Index, MatrixIndex
+
+    corpus = scaled_corpus(papers, scale)
+    indexes = {"numpy": MatrixIndex(corpus), "bm25": BM25Index(corpus)}
+    results = {}
+    runs = max(1, repeat // len(QUERIES))
+    # The SequenceMatcher scorer takes seconds per query on large corpora; one run per query is enough
+    timings = [ms for query in QUERIES for ms in time_calls(lambda: find_most_relevant_paper(query, corpus), 1)]
+    results[f"find_most_relevant_paper/x{scale}"] = case(timings, papers=len(corpus))
+    for engine, index in indexes.items():
+        timings = [ms for query in QUERIES for ms in time_calls(lambda: index.search(query, top_k=3), runs)]
+        results[f"{engine}_search/x{scale}"] = case(timings, papers=len(corpus))
+    return results
+
+
+def bench_pmc(api, scale: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<pmc-articleset>'
+        f"{jats_article('PMC4095884', paragraphs_per_section=3 * scale)}</pmc-articleset>"
+    ).encode("utf-8")
+
+    async def parse_all() -> List[float]:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await api.parse_pmc_xml_content(xml, "https://pmc.ncbi.nlm.nih.gov/articles/PMC4095884/")
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    return {
+        f"parse_pmc_xml_content/x{scale}": case(asyncio.run(parse_all()), bytes=len(xml)),
+        f"extract_pmc_sections_lxml/x{scale}": case(
+            time_calls(lambda: extract_pmc_sections_streaming(xml), repeat), bytes=len(xml)
+        ),
+        f"extract_pmc_sections_bs4/x{scale}": case(
+            time_calls(lambda: extract_pmc_sections_bs4(xml), repeat), bytes=len(xml)
+        ),
+    }
+
+
+def bench_text_content(scale: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    html = publisher_page("benchmark", paragraphs_per_section=3 * scale)
+    timings = time_calls(extract_text_content, repeat, setup=lambda: BeautifulSoup(html, "html.parser"))
+    return {f"extract_text_content/x{scale}": case(timings, bytes=len(html.encode("utf-8")))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16], help="Corpus and document scale factors")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/micro.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    os.environ.update({'CACHE_BACKEND': 'memory', 'LLM_CACHE_BACKEND': 'memory'})
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    import main as api
+    api.ai_model = FakeGenerativeModel()
+    # Every parse_pmc_xml_content run should reach the (fake) model
+    api.llm_cache = None
+    with open(api.PAPERS_PATH, encoding="utf-8") as file:
+        papers = api.flatten_papers(json.load(file))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for scale in args.scales:
+        results.update(bench_retrieval(papers, scale, args.repeat))
+        results.update(bench_pmc(api, scale, args.repeat))
+        results.update(bench_text_content(scale, args.repeat))
+
+    print(f"{'case':40} {'size':>10} {'median ms':>10} {'p95 ms':>10}")
+    for name, figures in results.items():
+        size = figures.get("papers", figures.get("bytes"))
+        print(f"{name:40} {size:>10} {figures['median_ms']:>10.3f} {figures['p95_ms']:>10.3f}")
+
+    params = {"scales": args.scales, "repeat": args.repeat, "corpus_papers": len(papers)}
+    document = write_results("micro", params, results, args.output)
+    if baseline:
+        compare_results(document, baseline)
+
+
+if __name__ == "__main__":
+    main()
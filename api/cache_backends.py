@@ -0,0 +1,210 @@
+"""
+Second-level storage backends for the summarization cache.
+
+``SummarizationCache`` keeps hot entries in process memory (L1). A backend
+sits behind it (L2) so entries survive restarts and are shared between
+uvicorn worker processes on the same host.
+"""
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, Set, Tuple
+
+# Seconds the schema setup waits for other workers creating it at the same time
+SETUP_TIMEOUT = 10.0
+
+
+class CacheBackend(abc.ABC):
+    """
+    Interface for persistent cache stores. Timestamps are Unix epoch seconds.
+
+    An entry is fresh until expires_at. It is kept (stale) until retain_until
+    so it can be revalidated against upstream with its validators.
+    """
+
+    name = "none"
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Tuple[Dict[str, Any], float, Dict[str, Any] | None] | None:
+        """Return (data, stored_at, validators) for a fresh entry, or None."""
+
+    @abc.abstractmethod
+    def get_stale(self, key: str) -> Tuple[Dict[str, Any], float, Dict[str, Any] | None] | None:
+        """Return (data, stored_at, validators) for an entry that is fresh or still retained, or None."""
+
+    @abc.abstractmethod
+    def set(self, key: str, url: str, data: Dict[str, Any], stored_at: float, expires_at: float,
+            validators: Dict[str, Any] | None = None, retain_until: float | None = None) -> None:
+        """Store an entry until expires_at, retained until retain_until (default: expires_at)."""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+
+    @abc.abstractmethod
+    def clear_expired(self) -> int:
+        """Remove entries past their retention and return how many were removed."""
+
+    @abc.abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite-backed cache store with zlib-compressed JSON payloads.
+
+    The database runs in WAL mode so any number of worker processes can read
+    concurrently while one writes. Each thread gets its own connection.
+
+    Calls are made from the event loop, so they must not wait long for the
+    write lock held by another worker process: after busy_timeout the
+    operation is given up, reads as a miss and writes as skipped (the L1
+    entry is still stored), and counted in the stats.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, table: str = "summaries", compression_level: int = 6,
+                 busy_timeout: float = 0.005):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Database file path
+            table: Table name, so several caches can share one file
+            compression_level: zlib compression level for payloads
+            busy_timeout: Seconds an operation waits for another connection's lock before it is given up
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.compression_level = compression_level
+        self.busy_timeout = busy_timeout
+        self.busy = 0
+        self._local = threading.local()
+        # Every thread's connection, so close() can close them all
+        self._connections: Set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Creating the schema may wait for other workers starting at the same time
+        connection = sqlite3.connect(self.path, timeout=SETUP_TIMEOUT, isolation_level=None)
+        try:
+            self._create_schema(connection)
+        finally:
+            connection.close()
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, "
+            "url TEXT, "
+            "payload BLOB NOT NULL, "
+            "stored_at REAL NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_expires_at ON {self.table} (expires_at)")
+        # Columns added after the first release
+        columns = {row[1] for row in connection.execute(f"PRAGMA table_info({self.table})")}
+        if "validators" not in columns:
+            connection.execute(f"ALTER TABLE {self.table} ADD COLUMN validators TEXT")
+        if "retain_until" not in columns:
+            connection.execute(f"ALTER TABLE {self.table} ADD COLUMN retain_until REAL")
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Only used by the thread that opened it, but closed by whichever thread calls close()
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                self._connections.add(connection)
+            self._local.connection = connection
+        return connection
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> sqlite3.Cursor | None:
+        """Execute a statement, or return None if the database stayed locked past busy_timeout."""
+        try:
+            return self._connection().execute(sql, parameters)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            self.busy += 1
+            return None
+
+    @staticmethod
+    def _decode(row) -> Tuple[Dict[str, Any], float, Dict[str, Any] | None] | None:
+        if row is None:
+            return None
+        payload, stored_at, validators = row
+        return json.loads(zlib.decompress(payload)), stored_at, json.loads(validators) if validators else None
+
+    def get(self, key: str) -> Tuple[Dict[str, Any], float, Dict[str, Any] | None] | None:
+        cursor = self._execute(
+            f"SELECT payload, stored_at, validators FROM {self.table} WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        )
+        return self._decode(cursor.fetchone()) if cursor else None
+
+    def get_stale(self, key: str) -> Tuple[Dict[str, Any], float, Dict[str, Any] | None] | None:
+        cursor = self._execute(
+            f"SELECT payload, stored_at, validators FROM {self.table} WHERE key = ? AND COALESCE(retain_until, expires_at) > ?",
+            (key, time.time()),
+        )
+        return self._decode(cursor.fetchone()) if cursor else None
+
+    def set(self, key: str, url: str, data: Dict[str, Any], stored_at: float, expires_at: float,
+            validators: Dict[str, Any] | None = None, retain_until: float | None = None) -> None:
+        payload = zlib.compress(json.dumps(data, default=str).encode('utf-8'), self.compression_level)
+        self._execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, url, payload, stored_at, expires_at, validators, retain_until) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, url, payload, stored_at, expires_at, json.dumps(validators) if validators else None,
+             retain_until if retain_until is not None else expires_at),
+        )
+
+    def delete(self, key: str) -> None:
+        self._execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear_expired(self) -> int:
+        cursor = self._execute(
+            f"DELETE FROM {self.table} WHERE COALESCE(retain_until, expires_at) <= ?", (time.time(),)
+        )
+        return cursor.rowcount if cursor else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        total_entries, expired_entries, payload_bytes = self._connection().execute(
+            f"SELECT COUNT(*), COALESCE(SUM(expires_at <= ?), 0), COALESCE(SUM(LENGTH(payload)), 0) FROM {self.table}",
+            (time.time(),),
+        ).fetchone()
+        return {
+            'backend': self.name,
+            'path': self.path,
+            'total_entries': total_entries,
+            'expired_entries': expired_entries,
+            'compressed_bytes': payload_bytes,
+            'busy_timeout_ms': round(self.busy_timeout * 1000, 1),
+            'busy': self.busy,
+        }
+
+    def close(self) -> None:
+        """Close the connections of every thread; threads using the backend afterwards open new ones."""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
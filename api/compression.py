@@ -0,0 +1,270 @@
+"""
+Response compression (gzip, and brotli when the ``brotli`` package is installed) and ETags.
+
+``ResponseEncoder.payload()`` serializes a JSON response once into an
+``EncodedPayload``: the body, a strong ETag derived from it, and the body
+compressed with every supported content coding when it is at least
+``min_size`` bytes. The summarization cache keeps the payload next to each
+entry, so a cache hit is served from the stored compressed bytes without
+serializing or compressing anything. ``ResponseEncoder.response()`` picks the
+encoding from Accept-Encoding and answers a matching If-None-Match with a
+304 and no body.
+
+``CompressionMiddleware`` compresses every other response of at least
+``min_size`` bytes on the fly. Responses that already carry a
+Content-Encoding, streamed responses and Server-Sent Events pass through
+unchanged.
+
+Compressed variants get their own ETag (the identity ETag with an
+``-gzip``/``-br`` suffix), as they are different representations; If-None-Match
+matches any variant of the same content.
+"""
+import gzip
+import hashlib
+import importlib.util
+import json
+from typing import Any, Dict, Iterable, Mapping, Tuple
+
+from starlette.responses import Response
+
+if importlib.util.find_spec("brotli") is not None:
+    import brotli
+else:
+    brotli = None
+
+# Content codings in order of preference
+ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Media types worth compressing (others, e.g. images, are already compressed)
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/xml", "application/javascript")
+
+# Compression levels: cached payloads are compressed once, so they get the
+# slower, denser settings; responses compressed per request the faster ones
+CACHED_LEVELS = {"gzip": 9, "br": 9}
+DYNAMIC_LEVELS = {"gzip": 6, "br": 4}
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """Compress body with a content coding ("gzip" or "br")."""
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    # mtime=0 keeps the output, and with it the ETag of the variant, identical across processes
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def negotiate_encoding(accept_encoding: str | None, encodings: Iterable[str] = ENCODINGS) -> str | None:
+    """
+    Pick the content coding for a response from the request's Accept-Encoding.
+
+    Returns:
+        The preferred coding with the highest q-value the client accepts, or None for identity
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether If-None-Match matches an ETag (weak comparison, any content-coding variant)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        tag = candidate.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for encoding in ("br", "gzip"):
+            if tag.endswith(f"-{encoding}"):
+                tag = tag[:-len(encoding) - 1]
+                break
+        if tag == opaque:
+            return True
+    return False
+
+
+def is_compressible(content_type: str | None) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class EncodedPayload:
+    """A response body serialized once, with its strong ETag and compressed variants."""
+
+    def __init__(self, body: bytes, variants: Dict[str, bytes], media_type: str = "application/json"):
+        self.body = body
+        self.variants = variants
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    @property
+    def size(self) -> int:
+        """Bytes held: the body plus every compressed variant."""
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+    def etag_for(self, encoding: str | None) -> str:
+        return f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+
+
+class ResponseEncoder:
+    def __init__(self, min_size: int = 1024):
+        """
+        Args:
+            min_size: Smallest body in bytes that is compressed
+        """
+        self.min_size = min_size
+        # Counters reported by /metrics
+        self.compressed: Dict[Tuple[str, str], int] = {}
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    def negotiate(self, accept_encoding: str | None) -> str | None:
+        return negotiate_encoding(accept_encoding)
+
+    def payload(self, data: Any, media_type: str = "application/json") -> EncodedPayload:
+        """Serialize data as compact JSON (as JSONResponse does) and compress it with every supported coding."""
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        return self.encode(body, media_type)
+
+    def encode(self, body: bytes, media_type: str = "application/json") -> EncodedPayload:
+        """Wrap an already serialized body, compressing it if it is large enough."""
+        variants = {}
+        if len(body) >= self.min_size:
+            variants = {encoding: compress(body, encoding, CACHED_LEVELS[encoding]) for encoding in ENCODINGS}
+        return EncodedPayload(body, variants, media_type)
+
+    def record(self, encoding: str, source: str, original: int, compressed: int) -> None:
+        key = (encoding, source)
+        self.compressed[key] = self.compressed.get(key, 0) + 1
+        self.bytes_saved += original - compressed
+
+    def response(self, payload: EncodedPayload, request_headers: Mapping[str, str],
+                 headers: Dict[str, str] | None = None) -> Response:
+        """
+        Serve a payload, compressed if the client accepts it, or 304 if the client's copy is current.
+
+        Args:
+            payload: Encoded response body
+            request_headers: Headers of the request (Accept-Encoding, If-None-Match)
+            headers: Further response headers (also sent with a 304)
+        """
+        encoding = self.negotiate(request_headers.get("accept-encoding")) if payload.variants else None
+        response_headers = {**(headers or {}), "ETag": payload.etag_for(encoding)}
+        if payload.variants:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, payload.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=response_headers)
+
+        if encoding is None:
+            return Response(payload.body, media_type=payload.media_type, headers=response_headers)
+        body = payload.variants[encoding]
+        self.record(encoding, "cached", len(payload.body), len(body))
+        return Response(body, media_type=payload.media_type, headers={**response_headers, "Content-Encoding": encoding})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get compression statistics."""
+        return {
+            'encodings': list(ENCODINGS),
+            'min_size': self.min_size,
+            'compressed': {f"{encoding}/{source}": count for (encoding, source), count in self.compressed.items()},
+            'not_modified': self.not_modified,
+            'bytes_saved': self.bytes_saved,
+        }
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses of at least the encoder's min_size on the fly.
+
+    The response start is held back until the first body chunk: a body sent in
+    one piece is compressed, anything streamed is passed through unchanged.
+    """
+
+    def __init__(self, app, encoder: ResponseEncoder):
+        """
+        Args:
+            app: ASGI application
+            encoder: Shared encoder (settings and counters)
+        """
+        self.app = app
+        self.encoder = encoder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = self.encoder.negotiate(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        held_start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal held_start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", ())}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (b"content-encoding" in headers or message["status"] in (204, 304)
+                        or not is_compressible(content_type) or content_type.startswith("text/event-stream")):
+                    passthrough = True
+                    await send(message)
+                    return
+                held_start = message
+                return
+            if message["type"] != "http.response.body" or held_start is None:
+                await send(message)
+                return
+
+            start, held_start = held_start, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.encoder.min_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, DYNAMIC_LEVELS[encoding])
+            self.encoder.record(encoding, "dynamic", len(body), len(compressed))
+            headers = [(name, value) for name, value in start.get("headers", ()) if name.lower() != b"content-length"]
+            vary = [value for name, value in headers if name.lower() == b"vary"]
+            if not any(b"accept-encoding" in value.lower() for value in vary):
+                vary.append(b"Accept-Encoding")
+            headers = [(name, value) for name, value in headers if name.lower() != b"vary"]
+            headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", b", ".join(vary)),
+            ]
+            await send({**start, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,205 @@
+"""
+Corpus manager for the local research paper database.
+
+Parses ``assets/papers.json`` once, keeps the result as an immutable snapshot
+together with any derived indexes, and swaps in a fresh snapshot when the file
+changes on disk. Readers grab ``manager.snapshot`` once per request and keep
+using it even if a reload happens mid-request.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import List, Dict, Any, Callable, Mapping, Tuple
+
+logger = logging.getLogger("astrolens.corpus")
+
+
+def flatten_papers(data: Any) -> List[Dict[str, Any]]:
+    """Flatten parsed papers.json data into a single list of papers.
+
+    Supports two formats:
+    - Legacy: a top-level list of paper objects.
+    - Categorized: a top-level dict where each key is a category and the value is a list of paper objects.
+
+    If a paper item does not include a 'category' field, it is set from the surrounding
+    category (helpful for downstream debugging and faceting).
+    """
+    papers: List[Dict[str, Any]] = []
+
+    # Legacy format: top-level list of paper objects
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                papers.append(item)
+
+    # Categorized format: top-level dict mapping category -> list of papers
+    elif isinstance(data, dict):
+        for category, items in data.items():
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if isinstance(item, dict):
+                    # Preserve category on the item if not present
+                    if "category" not in item:
+                        try:
+                            item["category"] = str(category)
+                        except Exception:
+                            pass
+                    papers.append(item)
+    else:
+        logger.warning("Unexpected papers.json structure — expected list or dict")
+
+    return papers
+
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """An immutable, fully built view of the paper corpus."""
+    version: int
+    papers: Tuple[Dict[str, Any], ...]
+    content_hash: str | None
+    loaded_at: datetime
+    load_time_ms: float
+    indexes: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+
+
+class CorpusManager:
+    def __init__(self, path: str, index_builders: Dict[str, Callable[[List[Dict[str, Any]]], Any]] | None = None):
+        """
+        Initialize the corpus manager.
+
+        Args:
+            path: Path to papers.json
+            index_builders: Mapping of index name -> callable building that index
+                from the flattened paper list. Indexes are rebuilt with every snapshot.
+        """
+        self.path = path
+        self.index_builders = dict(index_builders or {})
+        self._snapshot: CorpusSnapshot | None = None
+        self._file_signature: Tuple[int, int] | None = None  # (mtime_ns, size)
+        self._reload_lock = threading.Lock()
+        self.reload_count = 0
+        self.last_reload: datetime | None = None
+        self.last_check: datetime | None = None
+        self.last_error: str | None = None
+
+    @property
+    def snapshot(self) -> CorpusSnapshot:
+        """The current snapshot; loads the corpus on first access."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.reload_if_changed()
+            snapshot = self._snapshot
+        return snapshot
+
+    def _stat_signature(self) -> Tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _build_snapshot(self, raw: bytes | None, content_hash: str | None) -> CorpusSnapshot:
+        """Parse raw file content and build all derived indexes."""
+        start = time.perf_counter()
+        papers: List[Dict[str, Any]] = []
+        if raw is not None:
+            papers = flatten_papers(json.loads(raw))
+
+        indexes = {}
+        for name, builder in self.index_builders.items():
+            indexes[name] = builder(papers)
+
+        previous = self._snapshot
+        return CorpusSnapshot(
+            version=(previous.version + 1) if previous else 1,
+            papers=tuple(papers),
+            content_hash=content_hash,
+            loaded_at=datetime.now(),
+            load_time_ms=(time.perf_counter() - start) * 1000,
+            indexes=MappingProxyType(indexes),
+        )
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the corpus if papers.json changed since the last load.
+
+        A cheap stat() check is done first; the file is only read and hashed
+        when its mtime or size moved, and only re-parsed when the content hash
+        differs. On failure the previous snapshot stays in place.
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        with self._reload_lock:
+            self.last_check = datetime.now()
+            signature = self._stat_signature()
+            if self._snapshot is not None and signature == self._file_signature:
+                return False
+
+            try:
+                if signature is None:
+                    if self._snapshot is None:
+                        logger.warning("papers.json file not found")
+                    raw, content_hash = None, None
+                else:
+                    with open(self.path, "rb") as file:
+                        raw = file.read()
+                    content_hash = hashlib.sha256(raw).hexdigest()
+
+                self._file_signature = signature
+                if self._snapshot is not None and content_hash == self._snapshot.content_hash:
+                    return False
+
+                new_snapshot = self._build_snapshot(raw, content_hash)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.error("Error loading papers.json: %s", e)
+                if self._snapshot is None:
+                    # Serve an empty corpus rather than failing every request
+                    self._snapshot = self._build_snapshot(None, None)
+                return False
+
+            is_reload = self._snapshot is not None
+            # Single reference assignment: in-flight readers keep the old snapshot
+            self._snapshot = new_snapshot
+            self.last_error = None
+            if is_reload:
+                self.reload_count += 1
+                self.last_reload = new_snapshot.loaded_at
+                logger.info("Reloaded papers.json (version %s, %s papers)", new_snapshot.version, len(new_snapshot.papers))
+            return True
+
+    async def watch(self, interval_seconds: float) -> None:
+        """Poll papers.json for changes until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                # Parsing and index building run off the event loop
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                logger.error("Error checking papers.json for changes: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get corpus statistics."""
+        snapshot = self.snapshot
+        return {
+            'snapshot_version': snapshot.version,
+            'paper_count': len(snapshot.papers),
+            'content_hash': snapshot.content_hash,
+            'loaded_at': snapshot.loaded_at.isoformat(),
+            'load_time_ms': round(snapshot.load_time_ms, 2),
+            'last_reload': self.last_reload.isoformat() if self.last_reload else None,
+            'last_check': self.last_check.isoformat() if self.last_check else None,
+            'reload_count': self.reload_count,
+            'last_error': self.last_error,
+            'indexes': list(snapshot.indexes.keys()),
+            'path': self.path,
+        }
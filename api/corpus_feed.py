@@ -0,0 +1,182 @@
+"""
+The paper corpus as versioned, precompressed client payloads (``GET /corpus``).
+
+``CorpusFeedBuilder`` is registered as an index builder of the corpus
+manager, so a ``CorpusFeed`` is built with every snapshot. The feed holds
+the whole corpus and each category slice in the papers.json layout
+(category -> list of papers), serialized and compressed once, so requests
+only pick the stored bytes.
+
+A feed's version is a hash of its papers' content, not the snapshot
+counter, so it is the same across restarts and worker processes and does
+not change when papers.json is rewritten without changing a paper. The
+builder remembers the per-paper content hashes of the last few versions;
+given one of them, ``CorpusFeed.delta()`` returns only the papers added or
+changed since, and the keys of the papers removed. A client whose version
+is unknown (older than the history, or from before a restart that also
+changed the corpus) gets the full payload instead.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from compression import EncodedPayload, ResponseEncoder
+
+# Per-paper content hash and category, by paper key
+PaperEntries = Dict[str, Tuple[str, str]]
+
+
+def paper_key(paper: Dict[str, Any]) -> str:
+    """Stable identity of a paper: its id, or its link (then title) for papers without one."""
+    if paper.get('id') is not None:
+        return str(paper['id'])
+    return str(paper.get('link') or paper.get('title') or '')
+
+
+def paper_category(paper: Dict[str, Any]) -> str:
+    return str(paper.get('category') or 'Uncategorized')
+
+
+def paper_hash(paper: Dict[str, Any]) -> str:
+    """Hash of all fields of a paper, including its category."""
+    content = json.dumps(paper, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+def client_paper(paper: Dict[str, Any]) -> Dict[str, Any]:
+    """A paper as sent to clients; the category is the key it is listed under."""
+    return {key: value for key, value in paper.items() if key != 'category'}
+
+
+class CorpusFeed:
+    """The corpus of one snapshot as client payloads: full, per category and deltas from earlier versions."""
+
+    def __init__(self, papers: List[Dict[str, Any]], encoder: ResponseEncoder, builder: "CorpusFeedBuilder"):
+        """
+        Serialize and compress the full corpus and every category slice.
+
+        Args:
+            papers: Flattened list of paper dictionaries
+            encoder: Encoder compressing the payloads
+            builder: Builder holding the entries of earlier versions
+        """
+        self.encoder = encoder
+        self.builder = builder
+        self.entries: PaperEntries = {}
+        self.papers_by_key: Dict[str, Dict[str, Any]] = {}
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        hashes = []
+        for paper in papers:
+            key, digest, category = paper_key(paper), paper_hash(paper), paper_category(paper)
+            self.entries[key] = (digest, category)
+            self.papers_by_key[key] = paper
+            grouped.setdefault(category, []).append(client_paper(paper))
+            hashes.append(digest)
+
+        self.version = hashlib.sha256("\n".join(hashes).encode('utf-8')).hexdigest()[:16]
+        self.paper_count = len(papers)
+        self.categories = {category: len(items) for category, items in grouped.items()}
+        self.full = self.encoder.payload({
+            'version': self.version,
+            'delta': False,
+            'paper_count': self.paper_count,
+            'categories': self.categories,
+            'papers': grouped,
+        })
+        self.slices = {
+            category: self.encoder.payload({
+                'version': self.version,
+                'delta': False,
+                'category': category,
+                'paper_count': len(items),
+                'papers': {category: items},
+            })
+            for category, items in grouped.items()
+        }
+        self._deltas: Dict[Tuple[str, str | None], EncodedPayload] = {}
+
+    def delta(self, since: str, category: str | None = None) -> EncodedPayload | None:
+        """
+        Papers added or changed, and keys of papers removed, since an earlier version.
+
+        With a category, only that slice is compared; a paper that moved to
+        another category counts as removed from it.
+
+        Args:
+            since: Version the client has
+            category: Optional category slice
+
+        Returns:
+            The delta payload, or None if the version is not in the history
+        """
+        cached = self._deltas.get((since, category))
+        if cached is not None:
+            return cached
+        previous = self.builder.entries(since)
+        if previous is None:
+            return None
+
+        changed: Dict[str, List[Dict[str, Any]]] = {}
+        for key, (digest, current_category) in self.entries.items():
+            if category is not None and current_category != category:
+                continue
+            old = previous.get(key)
+            if old is None or old[0] != digest:
+                changed.setdefault(current_category, []).append(client_paper(self.papers_by_key[key]))
+        removed = [
+            key for key, (_, old_category) in previous.items()
+            if (category is None or old_category == category)
+            and (key not in self.entries or (category is not None and self.entries[key][1] != category))
+        ]
+
+        payload = self.encoder.payload({
+            'version': self.version,
+            'delta': True,
+            'since': since,
+            **({'category': category} if category is not None else {}),
+            'changed_count': sum(len(items) for items in changed.values()),
+            'changed': changed,
+            'removed': removed,
+        })
+        self._deltas[(since, category)] = payload
+        return payload
+
+
+class CorpusFeedBuilder:
+    def __init__(self, encoder: ResponseEncoder, max_versions: int = 20):
+        """
+        Index builder for CorpusManager (call it with the flattened papers).
+
+        Args:
+            encoder: Encoder compressing the payloads
+            max_versions: Earlier versions remembered for deltas
+        """
+        self.encoder = encoder
+        self.max_versions = max(1, max_versions)
+        self._history: OrderedDict[str, PaperEntries] = OrderedDict()
+        # Snapshots are built on a worker thread while requests read the history
+        self._lock = threading.Lock()
+
+    def __call__(self, papers: List[Dict[str, Any]]) -> CorpusFeed:
+        feed = CorpusFeed(papers, self.encoder, self)
+        with self._lock:
+            self._history[feed.version] = feed.entries
+            self._history.move_to_end(feed.version)
+            while len(self._history) > self.max_versions:
+                self._history.popitem(last=False)
+        return feed
+
+    def entries(self, version: str) -> PaperEntries | None:
+        with self._lock:
+            return self._history.get(version)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get corpus feed statistics."""
+        with self._lock:
+            versions = list(self._history)
+        return {
+            'versions': versions,
+            'max_versions': self.max_versions,
+        }
@@ -0,0 +1,343 @@
+"""
+Local stand-ins for NCBI E-utilities and Gemini.
+
+Used to run ingestion (``python ingest.py --fake``), benchmarks and load tests
+offline and deterministically: ``start_fake_eutils`` serves synthetic JATS
+articles for any PMC ID from a local HTTP server, along with an ID converter
+that maps every PMC ID to a synthetic PMID and DOI and publisher-style HTML
+pages under ``/articles/<name>``, and ``FakeGenerativeModel`` answers prompts
+like ``genai.GenerativeModel`` after a configurable delay.
+
+efetch responses carry an ETag of their body and answer a matching
+If-None-Match with 304. Bumping ``server.revisions[pmc_id]`` changes an
+article's content (and so its ETag), as an upstream correction would.
+
+Recorded responses can be replayed instead of synthetic ones: given a
+``recordings`` directory, ``<PMC ID>.xml`` files (saved efetch responses) and
+``<name>.html`` files (saved publisher pages) are served when present.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, AsyncIterator
+
+WORDS = (
+    "microgravity bone density muscle atrophy spaceflight radiation exposure cells "
+    "gene expression mice astronauts plants growth immune response cardiovascular "
+    "vestibular adaptation oxidative stress tissue samples orbit station"
+).split()
+
+
+def _sentence(seed: str, index: int, length: int = 24) -> str:
+    digest = hashlib.sha256(f"{seed}:{index}".encode()).digest()
+    words = [WORDS[byte % len(WORDS)] for byte in digest[:length]]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(seed: str, sentences: int = 6) -> str:
+    return " ".join(_sentence(seed, index) for index in range(sentences))
+
+
+def jats_article(pmc_id: str, paragraphs_per_section: int = 3, revision: int = 0) -> str:
+    """A synthetic JATS <article> for a PMC ID, deterministic in the ID (and revision, which edits the abstract)."""
+    digits = pmc_id.upper().removeprefix("PMC")
+    correction = f"Correction {revision}: {_sentence(f'{digits}:revision', revision)} " if revision else ""
+    sections = []
+    for title in ("Introduction", "Materials and Methods", "Results", "Discussion"):
+        body = "".join(
+            f"<p>{_paragraph(f'{digits}:{title}:{index}')}</p>" for index in range(paragraphs_per_section)
+        )
+        sections.append(f"<sec><title>{title}</title>{body}<fig><caption><p>Figure</p></caption></fig></sec>")
+    return (
+        "<article><front><article-meta>"
+        f'<article-id pub-id-type="pmc">{digits}</article-id>'
+        f"<title-group><article-title>Synthetic article {pmc_id}: {_sentence(digits, 0, 8)}</article-title></title-group>"
+        f"<abstract><title>Abstract</title><p>{correction}{_paragraph(digits + ':abstract', 4)}</p></abstract>"
+        "</article-meta></front>"
+        f"<body>{''.join(sections)}</body>"
+        "<back><ref-list><ref><mixed-citation>Reference</mixed-citation></ref></ref-list></back></article>"
+    )
+
+
+def publisher_page(name: str, paragraphs_per_section: int = 3, depth: int = 8) -> str:
+    """A synthetic publisher article page, deterministic in the name: nested layout divs around the sections."""
+    sections = []
+    for title in ("Abstract", "Introduction", "Materials and Methods", "Results", "Discussion"):
+        count = 1 if title == "Abstract" else paragraphs_per_section
+        body = "".join(f"<p>{_paragraph(f'{name}:{title}:{index}')}<a href='#ref'>[1]</a></p>" for index in range(count))
+        sections.append("<div class='layout'>" * depth + f"<section><h2>{title}</h2>{body}</section>" + "</div>" * depth)
+    return (
+        f"<html><head><title>Synthetic page {name}</title>"
+        "<script>var tracking = {};</script><style>.x { color: red }</style></head><body>"
+        f"<nav><a href='/'>Journal</a></nav><h1>Synthetic page {name}: {_sentence(name, 0, 8)}</h1>"
+        f"{''.join(sections)}<footer>Copyright</footer></body></html>"
+    )
+
+
+ARTICLE_PATTERN = re.compile(rb"<article[\s>].*?</article>", re.DOTALL)
+
+
+# Synthetic PMIDs are PMC number + offset; DOIs embed the PMC number
+FAKE_PMID_OFFSET = 30000000
+FAKE_DOI_PREFIX = "10.5555/fake.pmc"
+
+
+def idconv_record(value: str) -> dict:
+    """The ID converter record for a PMC ID, PMID or DOI (with an error for unknown IDs)."""
+    value = value.strip()
+    digits = None
+    if value.upper().startswith("PMC") and value[3:].isdigit():
+        digits = int(value[3:])
+    elif value.isdigit() and int(value) > FAKE_PMID_OFFSET:
+        digits = int(value) - FAKE_PMID_OFFSET
+    elif value.lower().startswith(FAKE_DOI_PREFIX) and value[len(FAKE_DOI_PREFIX):].isdigit():
+        digits = int(value[len(FAKE_DOI_PREFIX):])
+    if digits is None:
+        return {"requested-id": value, "status": "error", "errmsg": "invalid article id"}
+    return {
+        "requested-id": value,
+        "pmcid": f"PMC{digits}",
+        "pmid": str(FAKE_PMID_OFFSET + digits),
+        "doi": f"{FAKE_DOI_PREFIX}{digits}",
+    }
+
+
+class _EutilsHandler(BaseHTTPRequestHandler):
+    server: "FakeEutilsServer"
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        if parsed.path.rstrip("/").endswith("/idconv/v1.0") and "ids" in query:
+            self._idconv(query["ids"][0].split(","))
+            return
+        if parsed.path.startswith("/articles/"):
+            self._publisher_page(urllib.parse.unquote(parsed.path[len("/articles/"):]).strip("/"))
+            return
+        if not parsed.path.endswith("/efetch.fcgi") or "id" not in query:
+            self.send_error(404)
+            return
+
+        ids = [pmc_id for pmc_id in query["id"][0].split(",") if pmc_id]
+        self.server.record(ids)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status = self.server.next_failure()
+        if status:
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        articles = b"".join(self.server.article(pmc_id) for pmc_id in ids if pmc_id not in self.server.missing_ids)
+        body = b'<?xml version="1.0" encoding="UTF-8"?>\n<pmc-articleset>' + articles + b'</pmc-articleset>'
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match:
+            self.server.record_conditional(ids)
+        if if_none_match == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml; charset=UTF-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _idconv(self, ids: List[str]) -> None:
+        self.server.record_idconv(ids)
+        body = json.dumps({"status": "ok", "records": [idconv_record(value) for value in ids if value]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _publisher_page(self, name: str) -> None:
+        self.server.record_page(name)
+        if self.server.page_latency:
+            time.sleep(self.server.page_latency)
+        body = self.server.page(name)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeEutilsServer(ThreadingHTTPServer):
+    """Threaded local E-utilities and publisher server; records every efetch, ID converter and page request."""
+
+    daemon_threads = True
+    # The default listen backlog (5) drops connections under load tests, adding 1s SYN retransmits
+    request_queue_size = 256
+
+    def __init__(self, address: Tuple[str, int], latency: float = 0.0, missing_ids: List[str] | None = None,
+                 page_latency: float = 0.0, recordings: str | None = None):
+        super().__init__(address, _EutilsHandler)
+        self.latency = latency
+        self.page_latency = page_latency
+        self.missing_ids = set(missing_ids or ())
+        self.recordings = recordings
+        self.requests: List[List[str]] = []
+        self.idconv_requests: List[List[str]] = []
+        self.page_requests: List[str] = []
+        # efetch requests sent with If-None-Match
+        self.conditional_requests: List[List[str]] = []
+        # PMC ID -> content revision of the article (see jats_article)
+        self.revisions: Dict[str, int] = {}
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+
+    def fail_next(self, count: int, status: int = 429) -> None:
+        """Answer the next count efetch requests with the given error status."""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def next_failure(self) -> int | None:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def record(self, ids: List[str]) -> None:
+        with self._lock:
+            self.requests.append(ids)
+
+    def record_conditional(self, ids: List[str]) -> None:
+        with self._lock:
+            self.conditional_requests.append(ids)
+
+    def record_idconv(self, ids: List[str]) -> None:
+        with self._lock:
+            self.idconv_requests.append(ids)
+
+    def record_page(self, name: str) -> None:
+        with self._lock:
+            self.page_requests.append(name)
+
+    def _recording(self, filename: str) -> bytes | None:
+        if not self.recordings:
+            return None
+        path = os.path.join(self.recordings, os.path.basename(filename))
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as file:
+            return file.read()
+
+    def article(self, pmc_id: str) -> bytes:
+        """The <article> XML for a PMC ID: from a recorded efetch response if there is one, else synthetic."""
+        recorded = self._recording(f"{pmc_id.upper()}.xml")
+        if recorded is not None:
+            match = ARTICLE_PATTERN.search(recorded)
+            if match:
+                return match.group(0)
+        return jats_article(pmc_id, revision=self.revisions.get(pmc_id, 0)).encode("utf-8")
+
+    def page(self, name: str) -> bytes:
+        """A publisher page: recorded if there is one, else synthetic."""
+        recorded = self._recording(f"{name}.html")
+        return recorded if recorded is not None else publisher_page(name).encode("utf-8")
+
+    def page_url(self, name: str) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/articles/{urllib.parse.quote(name)}"
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/entrez/eutils"
+
+    @property
+    def idconv_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/pmc/utils/idconv/v1.0/"
+
+
+def start_fake_eutils(latency: float = 0.0, missing_ids: List[str] | None = None,
+                      host: str = "127.0.0.1", port: int = 0,
+                      page_latency: float = 0.0, recordings: str | None = None) -> FakeEutilsServer:
+    """
+    Start a fake E-utilities server in a background thread.
+
+    Args:
+        latency: Seconds each efetch request takes
+        missing_ids: PMC IDs left out of efetch responses
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        page_latency: Seconds each publisher page request takes
+        recordings: Directory of recorded <PMC ID>.xml and <name>.html responses to replay
+
+    Returns:
+        The running server; point EUTILS_BASE_URL at server.base_url and
+        IDCONV_BASE_URL at server.idconv_url, and fetch publisher pages from
+        server.page_url(name)
+    """
+    server = FakeEutilsServer((host, port), latency=latency, missing_ids=missing_ids,
+                              page_latency=page_latency, recordings=recordings)
+    threading.Thread(target=server.serve_forever, name="fake-eutils", daemon=True).start()
+    return server
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeStream:
+    def __init__(self, chunks: List[str], latency: float):
+        self._chunks = chunks
+        self._latency = latency
+
+    async def __aiter__(self) -> AsyncIterator[FakeResponse]:
+        for chunk in self._chunks:
+            await asyncio.sleep(self._latency)
+            yield FakeResponse(chunk)
+
+
+class FakeGenerativeModel:
+    """
+    Stand-in for ``genai.GenerativeModel``.
+
+    Replies with a short deterministic text derived from the prompt after
+    ``latency`` seconds; streamed replies are split into ``stream_chunks`` parts
+    spread over the same delay.
+    """
+
+    def __init__(self, latency: float = 0.0, stream_chunks: int = 4, model_name: str = "models/fake-model"):
+        self.latency = latency
+        self.stream_chunks = stream_chunks
+        self.model_name = model_name
+        self.calls = 0
+
+    def _reply(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{_paragraph(digest, 3)} {_paragraph(digest[::-1], 2)}"
+
+    def generate_content(self, prompt: str, **kwargs) -> FakeResponse:
+        self.calls += 1
+        time.sleep(self.latency)
+        return FakeResponse(self._reply(prompt))
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        self.calls += 1
+        text = self._reply(prompt)
+        if not stream:
+            await asyncio.sleep(self.latency)
+            return FakeResponse(text)
+        words = text.split(" ")
+        size = max(1, -(-len(words) // self.stream_chunks))
+        chunks = [" ".join(words[start:start + size]) + " " for start in range(0, len(words), size)]
+        return _FakeStream(chunks, self.latency / max(len(chunks), 1))
@@ -0,0 +1,183 @@
+"""
+Single-pass section extractor for publisher HTML pages.
+
+The BeautifulSoup path in ``sections.py`` calls ``get_text()`` on every
+``<p>``/``<div>``/``<section>``, so the text of a deeply nested block is
+re-serialized once per ancestor, and the whole document is walked several
+more times for the abstract and fallback paragraphs. Here the page is parsed
+with lxml's HTML parser and walked once: the document text is laid out in a
+single buffer and every element records the (start, end) offsets of its text
+in it, so each block's text is computed once and candidates are read as
+slices of the shared buffer.
+"""
+import re
+from typing import List, Dict, Tuple
+
+from lxml import etree, html
+
+# Elements whose content is never part of the page text
+SKIPPED_TAGS = frozenset({'script', 'style'})
+
+# Block elements considered as section candidates
+BLOCK_TAGS = frozenset({'p', 'div', 'section'})
+
+# Section indicators, checked in order against the first 100 characters of a block
+SECTION_INDICATORS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('introduction', ('introduction', 'background', 'overview')),
+    ('materials_methods', ('materials', 'methods', 'methodology', 'procedure', 'experimental')),
+    ('results', ('results', 'findings', 'outcomes', 'data show')),
+    ('discussion', ('discussion', 'conclusion', 'implications', 'suggest')),
+)
+
+ABSTRACT_PATTERN = re.compile(r'abstract', re.I)
+
+
+def clean_text(text: str) -> str:
+    """Collapse page text into one line, as extract_text_content does."""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+class PageText:
+    """The text of a parsed page with per-element offsets into it."""
+
+    def __init__(self, root):
+        chunks: List[str] = []
+        length = 0
+        self.spans: Dict[object, Tuple[int, int]] = {}
+        # Elements in document (start) order, for "first match" lookups
+        self.elements: List[object] = []
+
+        for event, element in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+            if event == 'comment' or event == 'pi':
+                # Skip the content, keep the tail
+                if element.tail:
+                    chunks.append(element.tail)
+                    length += len(element.tail)
+                continue
+            tag = element.tag
+            if event == 'start':
+                self.elements.append(element)
+                self.spans[element] = (length, -1)
+                if element.text and tag not in SKIPPED_TAGS:
+                    chunks.append(element.text)
+                    length += len(element.text)
+            else:
+                self.spans[element] = (self.spans[element][0], length)
+                if element.tail and element is not root:
+                    chunks.append(element.tail)
+                    length += len(element.tail)
+
+        self.text = ''.join(chunks)
+
+    def stripped_span(self, element) -> Tuple[int, int]:
+        """Offsets of an element's text without leading/trailing whitespace."""
+        start, end = self.spans[element]
+        text = self.text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    def stripped(self, element) -> str:
+        """An element's text without leading/trailing whitespace."""
+        start, end = self.stripped_span(element)
+        return self.text[start:end]
+
+    def raw(self, element) -> str:
+        """An element's text as it appears in the page."""
+        start, end = self.spans[element]
+        return self.text[start:end]
+
+
+def extract_html_sections(html_content: bytes | str) -> Dict[str, str]:
+    """
+    Extract title, abstract and main sections from a publisher HTML page in
+    a single traversal.
+
+    Returns:
+        Dict with title, abstract, introduction, materials_methods, results and discussion
+    """
+    root = html.document_fromstring(html_content)
+    page = PageText(root)
+
+    title_element = None
+    meta_title = meta_description = og_description = None
+    abstract_by_class = abstract_by_id = None
+    paragraphs = []
+    blocks = []
+    for element in page.elements:
+        tag = element.tag
+        if tag == 'title':
+            if title_element is None:
+                title_element = element
+        elif tag == 'meta':
+            if meta_title is None and element.get('property') == 'og:title':
+                meta_title = element
+            if meta_description is None and element.get('name') == 'description':
+                meta_description = element
+            if og_description is None and element.get('property') == 'og:description':
+                og_description = element
+        if tag in BLOCK_TAGS:
+            blocks.append(element)
+            if tag == 'p':
+                paragraphs.append(element)
+            if abstract_by_class is None and ABSTRACT_PATTERN.search(element.get('class') or ''):
+                abstract_by_class = element
+        if abstract_by_id is None and ABSTRACT_PATTERN.search(element.get('id') or ''):
+            abstract_by_id = element
+
+    # Extract title, with the OpenGraph title as backup
+    title = page.stripped(title_element) if title_element is not None else "Untitled Document"
+    if (not title or title == "Untitled Document") and meta_title is not None:
+        title = meta_title.get('content', '').strip()
+
+    # Extract abstract: meta description, OpenGraph description, abstract
+    # section by class or id, first substantial paragraph, then body text
+    abstract = ""
+    if meta_description is not None:
+        abstract = meta_description.get('content', '').strip()
+    if not abstract and og_description is not None:
+        abstract = og_description.get('content', '').strip()
+    if not abstract and abstract_by_class is not None:
+        abstract = clean_text(page.raw(abstract_by_class))[:500]
+    if not abstract and abstract_by_id is not None:
+        abstract = clean_text(page.raw(abstract_by_id))[:500]
+    if not abstract:
+        for p in paragraphs[:5]:
+            start, end = page.stripped_span(p)
+            if end - start > 100:
+                abstract = page.text[start:min(end, start + 500)]
+                break
+    if not abstract:
+        body_text = clean_text(page.text)
+        abstract = body_text[:500] if body_text else "No content available"
+
+    # Find sections by indicators near the start of each block
+    sections = {'introduction': "", 'materials_methods': "", 'results': "", 'discussion': ""}
+    for element in blocks:
+        start, end = page.stripped_span(element)
+        if end - start < 50:
+            continue
+        head = page.text[start:min(end, start + 100)].lower()
+        for field, indicators in SECTION_INDICATORS:
+            if not sections[field] and any(indicator in head for indicator in indicators):
+                sections[field] = page.text[start:min(end, start + 1000)]
+                break
+
+    # If sections still not found, use the first substantial paragraphs
+    if not all(sections.values()):
+        paragraphs_text = []
+        for p in paragraphs:
+            start, end = page.stripped_span(p)
+            if end - start > 100:
+                paragraphs_text.append(page.text[start:min(end, start + 1000)])
+                if len(paragraphs_text) == 4:
+                    break
+        for position, field in enumerate(('introduction', 'materials_methods', 'results', 'discussion')):
+            if not sections[field] and len(paragraphs_text) > position:
+                sections[field] = paragraphs_text[position]
+
+    return {'title': title, 'abstract': abstract, **sections}
@@ -0,0 +1,194 @@
+"""
+Canonical paper identity.
+
+The same article is reachable through many URLs: the new
+``pmc.ncbi.nlm.nih.gov/articles/PMC…`` pages, the legacy
+``www.ncbi.nlm.nih.gov/pmc/articles/PMC…`` links used in ``papers.json``,
+PubMed, Europe PMC and DOI resolvers. ``IdentityResolver`` maps any of them to
+one canonical ID, used as the cache and coalescing key and to route every
+variant of a PMC article to the E-utilities XML path.
+
+PMID and DOI URLs resolve to the PMC ID when the mapping is known. The mapping
+table is in memory and can be bulk-populated from NCBI's ID converter
+(``load_records`` accepts its JSON ``records``).
+"""
+import re
+import urllib.parse
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable
+
+# Hosts whose URLs can carry a PMC ID or PMID in the path
+NCBI_HOSTS = ('ncbi.nlm.nih.gov', 'nih.gov', 'europepmc.org')
+DOI_HOSTS = ('doi.org', 'dx.doi.org')
+
+PMC_ID_PATTERN = re.compile(r'(?<![A-Za-z0-9])PMC(\d+)(?![0-9])', re.IGNORECASE)
+PUBMED_PATH_PATTERN = re.compile(r'^/(?:pubmed/)?(\d{1,9})/?$')
+EUROPEPMC_MED_PATTERN = re.compile(r'/(?:abstract|article)/MED/(\d{1,9})', re.IGNORECASE)
+DOI_PATTERN = re.compile(r'(10\.\d{4,9}/[^\s?#]+)')
+
+
+def host_in(host: str, domains: tuple) -> bool:
+    """Whether host is one of the domains or a subdomain of one ('evilnih.gov' is not under 'nih.gov')."""
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def normalize_pmcid(value: str) -> str | None:
+    """'pmc4095884', '4095884' or 'PMC4095884' -> 'PMC4095884'."""
+    match = re.fullmatch(r'(?:PMC)?(\d+)', value.strip(), re.IGNORECASE)
+    return f"PMC{match.group(1)}" if match else None
+
+
+def normalize_doi(value: str) -> str:
+    """DOIs are case-insensitive; store them lowercased without a trailing slash."""
+    return urllib.parse.unquote(value).strip().rstrip('/.').lower()
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL that is not a known article link (lowercase, no trailing separator or UTM parameters)."""
+    normalized_url = url.lower().strip()
+    # Remove trailing slashes and common URL parameters that don't affect content
+    normalized_url = re.sub(r'[/?#&]$', '', normalized_url)
+    normalized_url = re.sub(r'[?&]utm_[^&]*', '', normalized_url)  # Remove UTM parameters
+    return normalized_url
+
+
+@dataclass(frozen=True)
+class PaperIdentity:
+    """Identifiers known for a URL; canonical is the most specific one."""
+    canonical: str
+    pmcid: str | None = None
+    pmid: str | None = None
+    doi: str | None = None
+
+
+class IdentityResolver:
+    def __init__(self):
+        """Initialize an empty PMID/DOI -> PMC ID mapping table."""
+        self._pmcid_by_pmid: Dict[str, str] = {}
+        self._pmcid_by_doi: Dict[str, str] = {}
+        self._ids_by_pmcid: Dict[str, Dict[str, str]] = {}
+        self.resolutions = 0
+        self.mapped_resolutions = 0
+
+    @staticmethod
+    def parse(url: str) -> PaperIdentity:
+        """Extract identifiers from the URL itself, without the mapping table."""
+        try:
+            parsed = urllib.parse.urlsplit(url.strip())
+        except ValueError:
+            return PaperIdentity(canonical=normalize_url(url))
+        host = (parsed.hostname or '').lower()
+        path = parsed.path or ''
+
+        if host_in(host, NCBI_HOSTS):
+            pmc_match = PMC_ID_PATTERN.search(path)
+            if pmc_match:
+                pmcid = f"PMC{pmc_match.group(1)}"
+                return PaperIdentity(canonical=pmcid, pmcid=pmcid)
+
+            pmid = None
+            if host.startswith('pubmed.') or '/pubmed/' in path:
+                pubmed_match = PUBMED_PATH_PATTERN.match(path)
+                if pubmed_match:
+                    pmid = pubmed_match.group(1)
+            elif host_in(host, ('europepmc.org',)):
+                med_match = EUROPEPMC_MED_PATTERN.search(path)
+                if med_match:
+                    pmid = med_match.group(1)
+            if pmid:
+                return PaperIdentity(canonical=f"PMID:{pmid}", pmid=pmid)
+
+        doi = None
+        if host_in(host, DOI_HOSTS):
+            doi = normalize_doi(path.lstrip('/')) or None
+        else:
+            # Publisher URLs of the form .../doi/10.xxxx/yyyy or ?doi=10.xxxx/yyyy
+            candidates = [path] if '/doi/' in path.lower() else []
+            candidates += [value for key, value in urllib.parse.parse_qsl(parsed.query) if key.lower() in ('doi', 'id')]
+            for candidate in candidates:
+                doi_match = DOI_PATTERN.search(candidate)
+                if doi_match:
+                    doi = normalize_doi(doi_match.group(1))
+                    break
+        if doi and doi.startswith('10.'):
+            return PaperIdentity(canonical=f"DOI:{doi}", doi=doi)
+
+        return PaperIdentity(canonical=normalize_url(url))
+
+    def resolve(self, url: str) -> PaperIdentity:
+        """
+        Resolve a URL to its canonical identity.
+
+        PMID and DOI identities are upgraded to the PMC ID when the mapping
+        table knows it, so every variant of a PMC article shares one ID.
+        """
+        identity = self.parse(url)
+        self.resolutions += 1
+        pmcid = identity.pmcid
+        if pmcid is None and identity.pmid:
+            pmcid = self._pmcid_by_pmid.get(identity.pmid)
+        if pmcid is None and identity.doi:
+            pmcid = self._pmcid_by_doi.get(identity.doi)
+        if pmcid is None:
+            return identity
+        if identity.pmcid is None:
+            self.mapped_resolutions += 1
+        known = self._ids_by_pmcid.get(pmcid, {})
+        return PaperIdentity(
+            canonical=pmcid,
+            pmcid=pmcid,
+            pmid=identity.pmid or known.get('pmid'),
+            doi=identity.doi or known.get('doi'),
+        )
+
+    def canonical_id(self, url: str) -> str:
+        """The canonical ID of a URL (a PMC ID, 'PMID:…', 'DOI:…' or the normalized URL)."""
+        return self.resolve(url).canonical
+
+    def add_mapping(self, pmcid: str, pmid: str | None = None, doi: str | None = None) -> bool:
+        """Record the identifiers of one article. Returns False if pmcid is not a PMC ID."""
+        pmcid = normalize_pmcid(pmcid or '')
+        if pmcid is None:
+            return False
+        known = self._ids_by_pmcid.setdefault(pmcid, {})
+        if pmid:
+            pmid = str(pmid).strip()
+            self._pmcid_by_pmid[pmid] = pmcid
+            known['pmid'] = pmid
+        if doi:
+            doi = normalize_doi(doi)
+            self._pmcid_by_doi[doi] = pmcid
+            known['doi'] = doi
+        return True
+
+    def load_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Bulk-load ID converter records ({"pmcid", "pmid", "doi"}).
+
+        Returns:
+            Number of records added
+        """
+        added = 0
+        for record in records:
+            if record.get('pmcid') and self.add_mapping(record['pmcid'], record.get('pmid'), record.get('doi')):
+                added += 1
+        return added
+
+    @staticmethod
+    def converter_ids(urls: Iterable[str]) -> List[str]:
+        """IDs to send to the ID converter for a list of URLs (PMC IDs, PMIDs and DOIs), deduplicated."""
+        ids = []
+        for url in urls:
+            identity = IdentityResolver.parse(url)
+            ids.append(identity.pmcid or identity.pmid or identity.doi)
+        return list(dict.fromkeys(value for value in ids if value))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get mapping table statistics."""
+        return {
+            'mapped_articles': len(self._ids_by_pmcid),
+            'pmid_mappings': len(self._pmcid_by_pmid),
+            'doi_mappings': len(self._pmcid_by_doi),
+            'resolutions': self.resolutions,
+            'mapped_resolutions': self.mapped_resolutions,
+        }
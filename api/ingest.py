@@ -0,0 +1,294 @@
+"""
+Offline ingestion: pre-summarize every paper in the corpus.
+
+Walks the paper links in ``assets/papers.json``, summarizes them in batches
+through the same path as ``POST /summarize/batch`` (multi-ID efetch, NCBI
+rate limiting, bounded model calls) and writes the results into the
+summarization cache, so first viewers get a cache hit instead of paying the
+full fetch + LLM latency. Progress is appended to a checkpoint file, so an
+interrupted run resumes where it stopped.
+
+Run it from the command line, or start it in the API process with
+``POST /ingest/start`` and follow it with ``GET /ingest/status``.
+
+Usage:
+    python ingest.py [--workers 4] [--batch-size 20] [--limit N] [--checkpoint PATH] [--fake]
+
+Use CACHE_BACKEND=sqlite so summaries written by the CLI outlive the process.
+A --fake run writes its synthetic summaries to in-memory caches only, and
+keeps its own checkpoint (ingest_checkpoint.fake.jsonl), so it never marks
+papers done for real runs or serves fake summaries as real ones.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Callable, Awaitable
+
+logger = logging.getLogger("astrolens.ingest")
+
+CHECKPOINT_PATH = os.getenv('INGEST_CHECKPOINT_PATH', os.path.join(os.path.dirname(__file__), "ingest_checkpoint.jsonl"))
+FAKE_CHECKPOINT_PATH = os.path.join(os.path.dirname(__file__), "ingest_checkpoint.fake.jsonl")
+
+SummarizeUrls = Callable[[List[str]], Awaitable[Tuple[List[Dict[str, Any]], Dict[str, int]]]]
+
+
+class IngestCheckpoint:
+    """
+    Append-only record of finished URLs (one JSON object per line).
+
+    The last line for a URL wins, so failed URLs are retried on the next run
+    and URLs that later succeeded are skipped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.status: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                        self.status[entry["url"]] = entry["status"]
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Torn line from an interrupted write
+
+    @property
+    def completed(self) -> set:
+        return {url for url, status in self.status.items() if status == "ok"}
+
+    def record(self, results: List[Dict[str, Any]]) -> None:
+        """Append the outcome of a batch and flush it to disk."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            for result in results:
+                entry = {"url": result["url"], "status": result["status"], "at": datetime.now().isoformat()}
+                if result["status"] != "ok":
+                    entry["detail"] = result.get("detail")
+                file.write(json.dumps(entry) + "\n")
+                self.status[result["url"]] = result["status"]
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class CorpusIngestor:
+    def __init__(self, summarize_urls: SummarizeUrls, checkpoint_path: str, workers: int = 4, batch_size: int = 20):
+        """
+        Initialize the ingestor.
+
+        Args:
+            summarize_urls: Callable summarizing and caching a batch of URLs,
+                returning (per-URL results, batch stats) like main.summarize_urls
+            checkpoint_path: Path of the checkpoint file
+            workers: Number of batches processed concurrently
+            batch_size: URLs per batch
+        """
+        self.summarize_urls = summarize_urls
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.task: asyncio.Task | None = None
+        self._reset()
+        self.state = "idle"
+
+    def _reset(self) -> None:
+        self.state = "running"
+        self.total = 0
+        self.skipped = 0
+        self.processed = 0
+        self.summarized = 0
+        self.cached = 0
+        self.failed = 0
+        self.batches = 0
+        self.efetch_requests = 0
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.last_error: str | None = None
+        self._start_time = 0.0
+        self._elapsed = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def run(self, links: List[str], limit: int | None = None) -> Dict[str, Any]:
+        """
+        Summarize every link not yet completed according to the checkpoint.
+
+        Args:
+            links: Paper URLs to ingest (duplicates are ignored)
+            limit: Maximum number of papers to process in this run
+
+        Returns:
+            Final ingestion statistics
+        """
+        self._reset()
+        self.started_at = datetime.now()
+        self._start_time = time.perf_counter()
+        try:
+            checkpoint = IngestCheckpoint(self.checkpoint_path)
+            completed = checkpoint.completed
+            links = list(dict.fromkeys(links))
+            pending = [link for link in links if link not in completed]
+            self.skipped = len(links) - len(pending)
+            if limit is not None:
+                pending = pending[:limit]
+            self.total = len(pending)
+            logger.info("%s papers to process, %s already done, %s workers", self.total, self.skipped, self.workers)
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for start in range(0, len(pending), self.batch_size):
+                queue.put_nowait(pending[start:start + self.batch_size])
+
+            await asyncio.gather(*(self._worker(queue, checkpoint) for _ in range(max(1, self.workers))))
+            self.state = "completed"
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error("Ingest failed: %s", e)
+        finally:
+            self.finished_at = datetime.now()
+            self._elapsed = time.perf_counter() - self._start_time
+        return self.get_stats()
+
+    async def _worker(self, queue: asyncio.Queue, checkpoint: IngestCheckpoint) -> None:
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results, stats = await self.summarize_urls(batch)
+                self.efetch_requests += stats.get('efetch_requests', 0)
+            except Exception as e:
+                # Unexpected failure of the whole batch: record every URL as failed and move on
+                self.last_error = f"{type(e).__name__}: {e}"
+                results = [{'url': url, 'status': 'error', 'detail': self.last_error} for url in batch]
+
+            checkpoint.record(results)
+            self.batches += 1
+            for result in results:
+                self.processed += 1
+                if result['status'] != 'ok':
+                    self.failed += 1
+                elif result.get('cached'):
+                    self.cached += 1
+                else:
+                    self.summarized += 1
+            logger.info("%s/%s processed (%s summarized, %s cached, %s failed)", self.processed, self.total, self.summarized, self.cached, self.failed)
+
+    def start(self, links: List[str], limit: int | None = None) -> asyncio.Task:
+        """Run ingestion as a background task on the current event loop."""
+        if self.running:
+            raise RuntimeError("Ingestion is already running")
+        self._reset()
+        self.task = asyncio.create_task(self.run(links, limit))
+        return self.task
+
+    async def cancel(self) -> None:
+        """Cancel a running background ingestion and wait for it to stop."""
+        if self.running:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ingestion progress statistics."""
+        elapsed = (time.perf_counter() - self._start_time) if self.state == "running" and self._start_time else self._elapsed
+        return {
+            'state': self.state,
+            'total': self.total,
+            'processed': self.processed,
+            'summarized': self.summarized,
+            'cached': self.cached,
+            'failed': self.failed,
+            'skipped_from_checkpoint': self.skipped,
+            'batches': self.batches,
+            'efetch_requests': self.efetch_requests,
+            'workers': self.workers,
+            'batch_size': self.batch_size,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'elapsed_seconds': round(elapsed, 2),
+            'papers_per_second': round(self.processed / elapsed, 2) if elapsed > 0 else None,
+            'last_error': self.last_error,
+            'checkpoint_path': self.checkpoint_path,
+        }
+
+
+def corpus_links(papers) -> List[str]:
+    """Unique paper links in corpus order."""
+    return list(dict.fromkeys(paper['link'] for paper in papers if paper.get('link')))
+
+
+async def _run_cli(args: argparse.Namespace) -> Dict[str, Any]:
+    import main as api
+
+    if args.fake:
+        from fakes import FakeGenerativeModel
+        api.ai_model = FakeGenerativeModel(latency=args.fake_llm_latency)
+
+    await api.http_pool.start()
+    try:
+        ingestor = CorpusIngestor(
+            api.summarize_urls,
+            checkpoint_path=args.checkpoint,
+            workers=args.workers,
+            batch_size=args.batch_size,
+        )
+        return await ingestor.run(corpus_links(api.corpus_manager.snapshot.papers), limit=args.limit)
+    finally:
+        await api.http_pool.close()
+        if api.summarization_cache.backend:
+            api.summarization_cache.backend.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-summarize every paper in papers.json into the summarization cache.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv('INGEST_WORKERS', '4')), help="Batches processed concurrently")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv('EUTILS_BATCH_SIZE', '20')), help="Papers per batch (PMC IDs per efetch request)")
+    parser.add_argument("--limit", type=int, default=None, help="Process at most this many papers")
+    parser.add_argument("--checkpoint", default=None,
+                        help=f"Checkpoint file used to resume interrupted runs (default: {os.path.basename(CHECKPOINT_PATH)}, "
+                             f"or {os.path.basename(FAKE_CHECKPOINT_PATH)} with --fake)")
+    parser.add_argument("--fake", action="store_true", help="Use local stand-ins for NCBI E-utilities and Gemini")
+    parser.add_argument("--fake-llm-latency", type=float, default=0.0, help="Seconds per fake model call")
+    args = parser.parse_args()
+
+    # Nothing else waits on this process, so cache writes wait for the lock instead of being skipped
+    os.environ.setdefault('CACHE_DB_BUSY_TIMEOUT_MS', '10000')
+
+    if args.fake:
+        # Fake summaries must neither mark papers done for real runs nor reach the persistent caches
+        args.checkpoint = args.checkpoint or FAKE_CHECKPOINT_PATH
+        if os.path.abspath(args.checkpoint) == os.path.abspath(CHECKPOINT_PATH):
+            parser.error("--fake cannot use the checkpoint of real runs")
+        os.environ['CACHE_BACKEND'] = 'memory'
+        os.environ['LLM_CACHE_BACKEND'] = 'memory'
+
+        # Must be configured before main is imported, which reads it at import time
+        from fakes import start_fake_eutils
+        server = start_fake_eutils()
+        os.environ['EUTILS_BASE_URL'] = server.base_url
+        os.environ['IDCONV_BASE_URL'] = server.idconv_url
+        os.environ['NCBI_API_KEY'] = 'fake-key'
+        print(f"Ingest: using fake E-utilities at {server.base_url}")
+
+    else:
+        args.checkpoint = args.checkpoint or CHECKPOINT_PATH
+
+    stats = asyncio.run(_run_cli(args))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Structured, non-blocking logging with request-ID correlation.
+
+``configure_logging`` attaches a ``DroppingQueueHandler`` to the ``astrolens``
+logger. Request handlers only check the level and put the record on a bounded
+queue. A ``QueueListener`` thread formats the record (as text or one JSON
+object per line) and writes it, so slow output never blocks the event loop.
+When the queue is full, records are dropped and counted instead of waiting.
+
+Use lazy %-style arguments so disabled levels cost only the level check::
+
+    logger = logging.getLogger("astrolens.api")
+    logger.debug("Fetched %s (%d bytes)", url, len(content))
+
+The message is formatted later, on the listener thread. Records whose
+arguments include a list, dict, set or similar container are formatted when
+they are queued, so they show the container as it was when logged. Other
+mutable objects are not copied: log them as ``str(obj)`` (or their fields)
+if they may change right after the call.
+
+``RequestIdMiddleware`` assigns each HTTP request an ID, taken from an incoming
+``X-Request-ID`` header or generated. It stores the ID in a context variable,
+so every record logged while serving the request (including tasks it starts)
+carries it, and returns the ID in the response's ``X-Request-ID`` header.
+"""
+import atexit
+import collections.abc
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+LOGGER_NAME = "astrolens"
+REQUEST_ID_HEADER = b"x-request-id"
+# Incoming request IDs are reused only if they look like IDs (no log injection)
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+# Arguments of these types may change before the listener formats the record
+_MUTABLE_ARG_TYPES = (list, dict, set, bytearray, collections.deque)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request ID (runs where the record is logged, so the context is visible)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that never blocks or formats on the caller's thread."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process, so the record needs no pickling-safe copy; formatting
+        # (and evaluating the arguments' __str__) is left to the listener thread, except
+        # for container arguments, which the caller may change in the meantime
+        args = record.args
+        if args:
+            # A single mapping argument is stored as the args themselves (logger.info("%(a)s", d))
+            values = (args,) if isinstance(args, collections.abc.Mapping) else args
+            if any(isinstance(value, _MUTABLE_ARG_TYPES) for value in values):
+                try:
+                    record.msg, record.args = record.getMessage(), None
+                except Exception:
+                    pass  # Left for the listener, which reports the formatting error
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request_id, message and any extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+
+class LoggingState:
+    def __init__(self, handler: DroppingQueueHandler, listener: logging.handlers.QueueListener, log_queue: queue.Queue):
+        self.handler = handler
+        self.listener = listener
+        self.queue = log_queue
+        self.running = True
+
+    def stop(self) -> None:
+        """Flush queued records and stop the listener thread."""
+        if self.running:
+            self.running = False
+            self.listener.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'level': logging.getLevelName(logging.getLogger(LOGGER_NAME).getEffectiveLevel()),
+            'queued': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'dropped': self.handler.dropped,
+        }
+
+
+def configure_logging(level: str | None = None, fmt: str | None = None, queue_size: int | None = None,
+                      stream=None) -> LoggingState:
+    """
+    Route the ``astrolens`` loggers through a bounded queue to a background writer.
+
+    Args:
+        level: Minimum level (default LOG_LEVEL, INFO)
+        fmt: "text" or "json" (default LOG_FORMAT, text)
+        queue_size: Records buffered before new ones are dropped (default LOG_QUEUE_SIZE, 10000)
+        stream: Output stream (default stderr)
+
+    Returns:
+        The logging state; queued records are flushed at interpreter exit
+    """
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'text')).lower()
+    queue_size = queue_size if queue_size is not None else int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for existing in list(logger.handlers):
+        logger.removeHandler(existing)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    # Records are written by our listener only, not again by handlers the host (e.g. uvicorn) put on the root logger
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    state = LoggingState(handler, listener, log_queue)
+    atexit.register(state.stop)
+    return state
+
+
+class RequestIdMiddleware:
+    """ASGI middleware setting the request ID context variable and the X-Request-ID response header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                request_id = candidate if REQUEST_ID_PATTERN.fullmatch(candidate) else None
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        encoded = request_id.encode("latin-1")
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (REQUEST_ID_HEADER, encoded)]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
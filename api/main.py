@@ -1,10 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-from typing import List, Dict, Any
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Dict, Any, Tuple, Callable, Awaitable, AsyncIterator, NamedTuple
+import base64
+from contextlib import asynccontextmanager, suppress
+from collections import OrderedDict
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import uvicorn
 import httpx
-from bs4 import BeautifulSoup
+from lxml import etree
 import re
 import os
 import json
@@ -12,16 +18,35 @@ import google.generativeai as genai
 from dotenv import load_dotenv
 from difflib import SequenceMatcher
 import hashlib
+import logging
+import time
 from datetime import datetime, timedelta
+from retrieval import BM25Index, MatrixIndex, CategoryIndex, find_most_relevant_paper, find_most_relevant_in_corpus
+from corpus import CorpusManager, CorpusSnapshot, flatten_papers
+from cache_backends import CacheBackend, SQLiteCacheBackend
+from upstream import UpstreamClientPool
+from sections import extract_pmc_sections, extract_html_sections
+from parse_pool import ParsePool, ParsePoolSaturated
+from ingest import CorpusIngestor, corpus_links
+from identity import IdentityResolver
+from resilience import ResilientUpstream, TokenBucket, CircuitBreaker, RetryPolicy, UpstreamUnavailable
+from metrics import MetricsRegistry, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from logging_setup import configure_logging, RequestIdMiddleware
+from compression import ResponseEncoder, EncodedPayload, CompressionMiddleware
+from corpus_feed import CorpusFeedBuilder
 
 load_dotenv()
 
+# Leveled logging through a background writer (LOG_LEVEL, LOG_FORMAT; see logging_setup.py)
+logging_state = configure_logging()
+logger = logging.getLogger("astrolens.api")
+
 # Initialize Google Generative AI
 def initialize_ai():
     """Initialize the Google Generative AI model."""
     api_key = os.getenv('GOOGLE_API_KEY')
     if not api_key:
-        print("Warning: GOOGLE_API_KEY environment variable not set. AI features will be disabled.")
+        logger.warning("GOOGLE_API_KEY environment variable not set. AI features will be disabled.")
         return None
     
     try:
@@ -29,40 +54,344 @@ def initialize_ai():
         model = genai.GenerativeModel('gemini-2.0-flash-exp')
         return model
     except Exception as e:
-        print(f"Error initializing AI model: {e}")
+        logger.error("Error initializing AI model: %s", e)
         return None
 
 # Initialize AI model on startup
 ai_model = initialize_ai()
 
+# Prometheus metrics served at /metrics (see metrics.py). Request metrics are
+# recorded by MetricsMiddleware; stage timings by stage_seconds.time(stage)
+metrics_registry = MetricsRegistry("astrolens")
+http_requests_total = metrics_registry.counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ["route", "method", "status"]
+)
+http_request_duration_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response body is complete", ["route", "method"]
+)
+http_requests_in_flight = metrics_registry.gauge("http_requests_in_flight", "HTTP requests being served")
+# Stages: fetch (upstream requests), parse (PMC XML), extract (publisher HTML), llm (model calls), retrieval (paper search)
+stage_seconds = metrics_registry.histogram("stage_seconds", "Time spent in each request stage", ["stage"])
+
+# Bound concurrent model calls and how long each call may take (seconds)
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+# Used for models without an async API; sized to the concurrency bound
+llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+llm_stats = {'active': 0, 'waiting': 0, 'calls': 0, 'timeouts': 0, 'errors': 0}
+
+# Upstream retries and circuit breakers (shared by NCBI and Gemini, see resilience.py)
+UPSTREAM_MAX_ATTEMPTS = int(os.getenv('UPSTREAM_MAX_ATTEMPTS', '3'))
+UPSTREAM_MAX_WAIT = float(os.getenv('UPSTREAM_MAX_WAIT', '10'))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_RECOVERY_SECONDS = float(os.getenv('BREAKER_RECOVERY_SECONDS', '30'))
+
+def build_upstream(name: str, requests_per_second: float, transient_errors: tuple = (ConnectionError,)) -> ResilientUpstream:
+    """Rate limiter, retry policy and circuit breaker for one upstream."""
+    return ResilientUpstream(
+        name,
+        TokenBucket(name, requests_per_second),
+        CircuitBreaker(name, BREAKER_FAILURE_THRESHOLD, BREAKER_RECOVERY_SECONDS),
+        RetryPolicy(max_attempts=UPSTREAM_MAX_ATTEMPTS),
+        max_wait=UPSTREAM_MAX_WAIT,
+        transient_errors=transient_errors
+    )
+
+# Gemini request rate (0 disables limiting; concurrency is bounded separately above)
+gemini_upstream = build_upstream('gemini', float(os.getenv('GEMINI_REQUESTS_PER_SECOND', '10')))
+
+class CachedModelResponse:
+    """A model response served from the LLM response cache."""
+    
+    def __init__(self, text: str):
+        self.text = text
+
+def model_name() -> str:
+    """Name of the configured model, part of the LLM response cache key."""
+    return getattr(ai_model, 'model_name', None) or type(ai_model).__name__
+
+def response_text(response) -> str | None:
+    """Text of a model response, or None if it has none (e.g. blocked)."""
+    try:
+        return response.text if response else None
+    except Exception:
+        return None
+
+def response_token_counts(response) -> Tuple[int | None, int | None]:
+    """(prompt tokens, output tokens) reported by the model, if any."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return None, None
+    return getattr(usage, 'prompt_token_count', None), getattr(usage, 'candidates_token_count', None)
+
+async def generate_model_content(prompt: str):
+    """
+    Call the AI model without blocking the event loop.
+    
+    Answers from the LLM response cache when the same prompt was already sent
+    to the same model. Otherwise uses the SDK's async API (or a bounded thread
+    pool for models without one), limits concurrent calls to
+    LLM_MAX_CONCURRENCY and gives up after LLM_TIMEOUT seconds.
+    
+    Args:
+        prompt: Prompt to send to the model
+        
+    Returns:
+        The model response
+    """
+    if llm_cache is not None:
+        cached_text = llm_cache.get_response(model_name(), prompt)
+        if cached_text is not None:
+            return CachedModelResponse(cached_text)
+    
+    response = await call_model(prompt)
+    
+    text = response_text(response)
+    if llm_cache is not None and text:
+        llm_cache.set_response(model_name(), prompt, text, *response_token_counts(response))
+    return response
+
+async def call_model(prompt: str):
+    """
+    Send a prompt to the AI model, bounded by LLM_MAX_CONCURRENCY and LLM_TIMEOUT.
+    
+    Goes through the Gemini rate limiter and circuit breaker; rate-limited and
+    transient errors are retried within the same LLM_TIMEOUT deadline.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_TIMEOUT
+    
+    async def attempt():
+        if hasattr(ai_model, 'generate_content_async'):
+            call = ai_model.generate_content_async(prompt)
+        else:
+            call = loop.run_in_executor(llm_executor, ai_model.generate_content, prompt)
+        return await asyncio.wait_for(call, timeout=max(deadline - loop.time(), 0))
+    
+    llm_stats['waiting'] += 1
+    async with llm_semaphore:
+        llm_stats['waiting'] -= 1
+        llm_stats['active'] += 1
+        llm_stats['calls'] += 1
+        started = time.perf_counter()
+        try:
+            return await gemini_upstream.call(attempt, deadline=deadline)
+        except asyncio.TimeoutError:
+            llm_stats['timeouts'] += 1
+            raise asyncio.TimeoutError(f"AI model call timed out after {LLM_TIMEOUT} seconds")
+        except Exception:
+            llm_stats['errors'] += 1
+            raise
+        finally:
+            llm_stats['active'] -= 1
+            stage_seconds.observe(time.perf_counter() - started, "llm")
+
+async def stream_model_content(prompt: str) -> AsyncIterator[str]:
+    """
+    Stream response text from the AI model as it is generated.
+    
+    Shares the concurrency limit, overall LLM_TIMEOUT deadline and response
+    cache with generate_model_content. Models without an async API, and
+    cached responses, produce a single chunk.
+    
+    The upstream stream is read into a queue by a separate task, which holds
+    the LLM slot only until the model has finished; a slow reader of the
+    chunks (e.g. an SSE client) does not keep the slot.
+    
+    Args:
+        prompt: Prompt to send to the model
+        
+    Yields:
+        Non-empty text chunks
+    """
+    if llm_cache is not None:
+        cached_text = llm_cache.get_response(model_name(), prompt)
+        if cached_text is not None:
+            yield cached_text
+            return
+    
+    if not hasattr(ai_model, 'generate_content_async'):
+        response = await call_model(prompt)
+        text = response_text(response)
+        if text:
+            if llm_cache is not None:
+                llm_cache.set_response(model_name(), prompt, text, *response_token_counts(response))
+            yield text
+        return
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_TIMEOUT
+    texts: asyncio.Queue = asyncio.Queue()
+    end = object()
+    
+    async def read_upstream() -> None:
+        llm_stats['waiting'] += 1
+        async with llm_semaphore:
+            llm_stats['waiting'] -= 1
+            llm_stats['active'] += 1
+            llm_stats['calls'] += 1
+            started = time.perf_counter()
+            try:
+                response = await gemini_upstream.call(
+                    lambda: asyncio.wait_for(
+                        ai_model.generate_content_async(prompt, stream=True),
+                        timeout=max(deadline - loop.time(), 0)
+                    ),
+                    deadline=deadline
+                )
+                chunks = response.__aiter__()
+                received = []
+                prompt_tokens = output_tokens = None
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - loop.time(), 0))
+                    except StopAsyncIteration:
+                        break
+                    text = response_text(chunk)
+                    chunk_prompt_tokens, chunk_output_tokens = response_token_counts(chunk)
+                    prompt_tokens = chunk_prompt_tokens or prompt_tokens
+                    output_tokens = chunk_output_tokens or output_tokens
+                    if text:
+                        received.append(text)
+                        texts.put_nowait(text)
+                # Only complete responses are cached
+                if llm_cache is not None and received:
+                    llm_cache.set_response(model_name(), prompt, "".join(received), prompt_tokens, output_tokens)
+            except asyncio.TimeoutError:
+                llm_stats['timeouts'] += 1
+                raise asyncio.TimeoutError(f"AI model call timed out after {LLM_TIMEOUT} seconds")
+            except Exception:
+                llm_stats['errors'] += 1
+                raise
+            finally:
+                llm_stats['active'] -= 1
+                stage_seconds.observe(time.perf_counter() - started, "llm")
+    
+    reader = asyncio.ensure_future(read_upstream())
+    reader.add_done_callback(lambda _: texts.put_nowait(end))
+    try:
+        while True:
+            text = await texts.get()
+            if text is end:
+                break
+            yield text
+        # Raises the reader's error, if any
+        await reader
+    finally:
+        # A consumer that stops early (client gone) also stops the upstream read
+        reader.cancel()
+
+class CacheEntry(NamedTuple):
+    """A cached response with its upstream validators, age and staleness."""
+    data: Dict[str, Any]
+    validators: Dict[str, Any]
+    age_seconds: float
+    stale: bool
+
 # In-memory cache for storing summarization results
 class SummarizationCache:
-    def __init__(self, ttl_hours: int = 24):
+    def __init__(self, ttl_hours: int = 24, max_entries: int = 1000, max_bytes: int = 100 * 1024 * 1024,
+                 backend: CacheBackend | None = None, revalidate_hours: float = 0,
+                 stale_while_revalidate_hours: float = 0, stale_if_error_hours: float = 0,
+                 encoder: ResponseEncoder | None = None):
         """
-        Initialize cache with TTL (Time To Live) in hours.
+        Initialize cache with TTL (Time To Live) in hours and size budgets.
+        
+        Entries are kept in least-recently-used order and evicted once either
+        budget is exceeded. Because every entry has the same TTL, the expiry
+        queue is kept in timestamp order (entries promoted from the backend are
+        placed by their original timestamp), so expired entries are always at
+        the front of it and can be removed without scanning the whole cache.
+        
+        When a backend is given, the in-memory cache acts as an L1 in front of
+        it: misses fall through to the backend and writes go to both.
+        
+        Expired entries are kept for another revalidate_hours together with
+        their upstream validators (ETag, Last-Modified, content hash), so a
+        refresh can reuse them when upstream content has not changed. During
+        the first stale_while_revalidate_hours of that they are still served
+        (marked stale) while being refreshed, and during the first
+        stale_if_error_hours they are served when the refresh fails.
+        
+        With an encoder, each in-memory entry also keeps its response body
+        serialized and compressed (see payload()), so hits are served without
+        re-encoding; the size budget then counts the body and its compressed variants.
         
         Args:
             ttl_hours: How long to keep cached entries (default: 24 hours)
+            max_entries: Maximum number of entries before LRU eviction
+            max_bytes: Maximum total (serialized) size of cached data before LRU eviction
+            backend: Optional persistent second-level store
+            revalidate_hours: How long expired entries are kept for revalidation
+            stale_while_revalidate_hours: How long expired entries are served while refreshed
+            stale_if_error_hours: How long expired entries are served when a refresh fails
+            encoder: Encodes entries as HTTP response payloads when they are stored
         """
-        self.cache: Dict[str, Dict] = {}
+        self.cache: OrderedDict[str, Dict] = OrderedDict()  # LRU order, least recent first
+        self._expiry_queue: OrderedDict[str, datetime] = OrderedDict()  # Oldest entry first
         self.ttl_hours = ttl_hours
+        self.revalidate_hours = revalidate_hours
+        self.stale_while_revalidate_hours = stale_while_revalidate_hours
+        self.stale_if_error_hours = stale_if_error_hours
+        # Expired entries are kept as long as any of the windows needs them
+        self.retain_hours = max(revalidate_hours, stale_while_revalidate_hours, stale_if_error_hours)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.backend = backend
+        self.encoder = encoder
+        
+        # Counters reported by /cache/stats
+        self.hits = 0
+        self.backend_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
     
     def _generate_cache_key(self, url: str) -> str:
         """Generate a unique cache key for a URL."""
-        # Normalize URL by removing common variations
-        normalized_url = url.lower().strip()
-        # Remove trailing slashes and common URL parameters that don't affect content
-        normalized_url = re.sub(r'[/?#&]$', '', normalized_url)
-        normalized_url = re.sub(r'[?&]utm_[^&]*', '', normalized_url)  # Remove UTM parameters
+        # Every URL form of an article (PMC host variants, PubMed, DOI) shares its
+        # canonical ID; other URLs are normalized by removing common variations
+        canonical_id = identity_resolver.canonical_id(url)
         
-        # Create hash of the normalized URL for consistent key generation
-        return hashlib.md5(normalized_url.encode('utf-8')).hexdigest()
+        # Create hash of the canonical ID for consistent key generation
+        return hashlib.md5(canonical_id.encode('utf-8')).hexdigest()
     
     def _is_expired(self, timestamp: datetime) -> bool:
         """Check if a cache entry has expired."""
         expiry_time = timestamp + timedelta(hours=self.ttl_hours)
         return datetime.now() > expiry_time
     
+    def _is_past_retention(self, timestamp: datetime) -> bool:
+        """Check if an expired entry is no longer kept for revalidation."""
+        return not self._is_within(timestamp, self.retain_hours)
+    
+    def _is_within(self, timestamp: datetime, stale_hours: float) -> bool:
+        """Check if an entry is fresh or expired less than stale_hours ago."""
+        return datetime.now() <= timestamp + timedelta(hours=self.ttl_hours + stale_hours)
+    
+    @staticmethod
+    def _estimate_size(data: Dict[str, Any]) -> int:
+        """Approximate memory footprint of an entry by its serialized size."""
+        return len(json.dumps(data, default=str).encode('utf-8'))
+    
+    def _remove(self, cache_key: str) -> None:
+        """Remove an entry and update size accounting."""
+        entry = self.cache.pop(cache_key, None)
+        self._expiry_queue.pop(cache_key, None)
+        if entry:
+            self.total_bytes -= entry['size']
+    
+    def _evict_to_budget(self) -> None:
+        """Evict least recently used entries until both budgets are met."""
+        while self.cache and (len(self.cache) > self.max_entries or self.total_bytes > self.max_bytes):
+            lru_key = next(iter(self.cache))
+            logger.debug("Evicting LRU cache entry for URL: %s", self.cache[lru_key]['url'])
+            self._remove(lru_key)
+            self.evictions += 1
+    
     def get(self, url: str) -> Dict[str, Any] | None:
         """
         Retrieve cached response for a URL.
@@ -73,85 +402,705 @@ class SummarizationCache:
         Returns:
             Cached response data or None if not found/expired
         """
-        cache_key = self._generate_cache_key(url)
+        entry = self.lookup(url, allow_stale=False)
+        return entry.data if entry else None
+    
+    def lookup(self, url: str, allow_stale: bool = True) -> CacheEntry | None:
+        """
+        Retrieve a cached response with its age.
         
-        if cache_key not in self.cache:
-            print(f"DEBUG: Cache miss for URL: {url}")
-            return None
+        With allow_stale, an entry that expired less than
+        stale_while_revalidate_hours ago is returned marked stale; the caller
+        serves it right away and refreshes it in the background.
+        
+        Args:
+            url: The URL to look up
+            allow_stale: Whether to return entries in the stale-while-revalidate window
+            
+        Returns:
+            The cached entry, or None if not found/expired
+        """
+        cache_key = self._generate_cache_key(url)
+        allow_stale = allow_stale and self.stale_while_revalidate_hours > 0
+        
+        entry = self.cache.get(cache_key)
+        
+        # Check if entry has expired (it stays in memory for revalidation until the sweeper drops it)
+        if entry and self._is_expired(entry['timestamp']):
+            if allow_stale and self._is_within(entry['timestamp'], self.stale_while_revalidate_hours):
+                logger.debug("Serving stale cache entry for URL: %s", url)
+                self.cache.move_to_end(cache_key)
+                self.stale_hits += 1
+                return self._entry(entry['data'], entry['timestamp'], entry['validators'], stale=True)
+            logger.debug("Cache entry expired for URL: %s", url)
+            if self._is_past_retention(entry['timestamp']):
+                self._remove(cache_key)
+                self.expirations += 1
+            entry = None
+        
+        if entry is None:
+            stored = self._backend_get(cache_key, stale=allow_stale)
+            if stored is not None:
+                data, stored_at, validators = stored
+                timestamp = datetime.fromtimestamp(stored_at)
+                stale = self._is_expired(timestamp)
+                if stale and not self._is_within(timestamp, self.stale_while_revalidate_hours):
+                    stored = None
+            if stored is None:
+                logger.debug("Cache miss for URL: %s", url)
+                self.misses += 1
+                return None
+            
+            # Promote to the in-memory layer, keeping the original timestamp for TTL
+            logger.debug("Persistent cache %shit for URL: %s", 'stale ' if stale else '', url)
+            self._store(cache_key, url, data, timestamp, validators)
+            self.backend_hits += 1
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return self._entry(data, timestamp, validators, stale=stale)
         
-        entry = self.cache[cache_key]
+        logger.debug("Cache hit for URL: %s", url)
+        self.cache.move_to_end(cache_key)
+        self.hits += 1
+        return self._entry(entry['data'], entry['timestamp'], entry['validators'], stale=False)
+    
+    def get_stale(self, url: str, max_stale_hours: float | None = None) -> CacheEntry | None:
+        """
+        Retrieve an entry for revalidation, even if it has expired.
         
-        # Check if entry has expired
-        if self._is_expired(entry['timestamp']):
-            print(f"DEBUG: Cache entry expired for URL: {url}")
-            del self.cache[cache_key]
+        Args:
+            url: The URL to look up
+            max_stale_hours: Only return entries that expired less than this long ago
+                (default: any entry still retained)
+            
+        Returns:
+            A fresh or retained entry, or None
+        """
+        cache_key = self._generate_cache_key(url)
+        timestamp = None
+        entry = self.cache.get(cache_key)
+        if entry and not self._is_past_retention(entry['timestamp']):
+            data, timestamp, validators = entry['data'], entry['timestamp'], entry['validators']
+        elif self.backend:
+            try:
+                stored = self.backend.get_stale(cache_key)
+            except Exception as e:
+                logger.error("Error reading from persistent cache: %s", e)
+                stored = None
+            if stored is not None:
+                data, stored_at, validators = stored
+                timestamp = datetime.fromtimestamp(stored_at)
+        
+        if timestamp is None:
             return None
-        
-        print(f"DEBUG: Cache hit for URL: {url}")
-        return entry['data']
+        if max_stale_hours is not None and not self._is_within(timestamp, max_stale_hours):
+            return None
+        return self._entry(data, timestamp, validators, stale=self._is_expired(timestamp))
+    
+    @staticmethod
+    def _entry(data: Dict[str, Any], timestamp: datetime, validators: Dict[str, Any] | None, stale: bool) -> CacheEntry:
+        age = max((datetime.now() - timestamp).total_seconds(), 0.0)
+        return CacheEntry(data, validators or {}, age, stale)
     
-    def set(self, url: str, data: Dict[str, Any]) -> None:
+    def set(self, url: str, data: Dict[str, Any], validators: Dict[str, Any] | None = None) -> None:
         """
         Store response data in cache.
         
         Args:
             url: The URL to cache
             data: The response data to store
+            validators: Upstream ETag/Last-Modified and content hash used to revalidate the entry
         """
         cache_key = self._generate_cache_key(url)
+        timestamp = datetime.now()
+        
+        self._store(cache_key, url, data, timestamp, validators)
+        if self.backend:
+            try:
+                expires_at = timestamp + timedelta(hours=self.ttl_hours)
+                retain_until = expires_at + timedelta(hours=self.retain_hours)
+                self.backend.set(cache_key, url, data, timestamp.timestamp(), expires_at.timestamp(),
+                                 validators=validators, retain_until=retain_until.timestamp())
+            except Exception as e:
+                logger.error("Error writing to persistent cache: %s", e)
+        
+        logger.debug("Cached response for URL: %s", url)
+    
+    def _store(self, cache_key: str, url: str, data: Dict[str, Any], timestamp: datetime,
+               validators: Dict[str, Any] | None = None) -> None:
+        """Insert an entry into the in-memory layer and enforce the budgets."""
+        payload = self.encoder.payload(data) if self.encoder else None
+        size = payload.size if payload else self._estimate_size(data)
+        
+        self._remove(cache_key)
+        if size > self.max_bytes:
+            logger.debug("Response for URL %s (%s bytes) exceeds cache budget, not caching", url, size)
+            return
         
         self.cache[cache_key] = {
             'data': data,
-            'timestamp': datetime.now(),
-            'url': url  # Store original URL for debugging
+            'timestamp': timestamp,
+            'size': size,
+            'url': url,  # Store original URL for debugging
+            'validators': validators,
+            'payload': payload
         }
+        self._enqueue_expiry(cache_key, timestamp)
+        self.total_bytes += size
+        self._evict_to_budget()
+    
+    def _enqueue_expiry(self, cache_key: str, timestamp: datetime) -> None:
+        """
+        Queue an entry for expiry by its own timestamp, keeping the queue oldest first.
+        
+        New entries go to the end. Entries promoted from the backend are older
+        than the newest queued ones; the entries newer than the promoted one
+        are moved behind it, so only those are visited.
+        """
+        newer = []
+        for queued_key, queued_at in reversed(self._expiry_queue.items()):
+            if queued_at <= timestamp:
+                break
+            newer.append(queued_key)
+        self._expiry_queue[cache_key] = timestamp
+        for queued_key in reversed(newer):
+            self._expiry_queue.move_to_end(queued_key)
+    
+    def payload(self, url: str, data: Dict[str, Any]) -> EncodedPayload:
+        """
+        The encoded response payload of cached data, as stored with its entry.
         
-        print(f"DEBUG: Cached response for URL: {url}")
+        Data that is not (or no longer) the in-memory entry for the URL, e.g.
+        a stale entry read from the backend after an error, is encoded now.
+        """
+        entry = self.cache.get(self._generate_cache_key(url))
+        if entry and entry['data'] is data and entry.get('payload'):
+            return entry['payload']
+        return (self.encoder or response_encoder).payload(data)
+    
+    def _backend_get(self, cache_key: str, stale: bool = False) -> Tuple[Dict[str, Any], float, Dict[str, Any] | None] | None:
+        """Look up the persistent layer (including retained expired entries if stale), treating backend errors as misses."""
+        if not self.backend:
+            return None
+        try:
+            return self.backend.get_stale(cache_key) if stale else self.backend.get(cache_key)
+        except Exception as e:
+            logger.error("Error reading from persistent cache: %s", e)
+            return None
     
     def clear_expired(self) -> int:
         """
-        Remove all expired entries from cache.
+        Remove all expired entries that are past their revalidation window.
+        
+        Only the expired prefix of the expiry queue is visited.
         
         Returns:
             Number of entries removed
         """
-        expired_keys = []
-        
-        for key, entry in self.cache.items():
-            if self._is_expired(entry['timestamp']):
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.cache[key]
-        
-        if expired_keys:
-            print(f"DEBUG: Cleared {len(expired_keys)} expired cache entries")
-        
-        return len(expired_keys)
+        removed = 0
+        while self._expiry_queue:
+            cache_key, timestamp = next(iter(self._expiry_queue.items()))
+            if not self._is_past_retention(timestamp):
+                break
+            self._remove(cache_key)
+            removed += 1
+        
+        self.expirations += removed
+        if removed:
+            logger.debug("Cleared %s expired cache entries", removed)
+        
+        if self.backend:
+            try:
+                self.backend.clear_expired()
+            except Exception as e:
+                logger.error("Error clearing expired persistent cache entries: %s", e)
+        
+        return removed
+    
+    async def run_sweeper(self, interval_seconds: float) -> None:
+        """Periodically clear expired entries until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.clear_expired()
+            except Exception as e:
+                logger.error("Error sweeping expired cache entries: %s", e)
+    
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered from the cache, fresh or stale."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         total_entries = len(self.cache)
         expired_count = 0
         
-        for entry in self.cache.values():
-            if self._is_expired(entry['timestamp']):
-                expired_count += 1
+        # Expired entries form a prefix of the expiry queue
+        for timestamp in self._expiry_queue.values():
+            if not self._is_expired(timestamp):
+                break
+            expired_count += 1
         
         return {
             'total_entries': total_entries,
             'expired_entries': expired_count,
             'active_entries': total_entries - expired_count,
-            'ttl_hours': self.ttl_hours
+            'ttl_hours': self.ttl_hours,
+            'revalidate_hours': self.revalidate_hours,
+            'stale_while_revalidate_hours': self.stale_while_revalidate_hours,
+            'stale_if_error_hours': self.stale_if_error_hours,
+            'max_entries': self.max_entries,
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'backend_hits': self.backend_hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hit_ratio, 4),
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'backend': self._backend_stats()
         }
+    
+    def _backend_stats(self) -> Dict[str, Any] | None:
+        """Statistics of the persistent layer, if configured."""
+        if not self.backend:
+            return None
+        try:
+            return self.backend.get_stats()
+        except Exception as e:
+            return {'backend': self.backend.name, 'error': str(e)}
+
+# Cache size budgets and background sweep interval (seconds; 0 disables the sweeper)
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1000'))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(100 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL = float(os.getenv('CACHE_SWEEP_INTERVAL', '300'))
+# How long expired entries are kept so they can be revalidated against upstream
+CACHE_REVALIDATE_HOURS = float(os.getenv('CACHE_REVALIDATE_HOURS', '168'))
+# How long after expiry a summary is still served while it is refreshed in the background,
+# and how long it is served when refreshing it fails
+CACHE_STALE_WHILE_REVALIDATE_HOURS = float(os.getenv('CACHE_STALE_WHILE_REVALIDATE_HOURS', '24'))
+CACHE_STALE_IF_ERROR_HOURS = float(os.getenv('CACHE_STALE_IF_ERROR_HOURS', '168'))
+# Background refreshes of stale summaries: concurrent workers and queue bound
+CACHE_REFRESH_CONCURRENCY = int(os.getenv('CACHE_REFRESH_CONCURRENCY', '2'))
+CACHE_REFRESH_QUEUE_SIZE = int(os.getenv('CACHE_REFRESH_QUEUE_SIZE', '100'))
+
+# Persistent second-level cache shared by all workers: "memory" (none) or "sqlite"
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory').lower()
+CACHE_DB_PATH = os.getenv('CACHE_DB_PATH', os.path.join(os.path.dirname(__file__), "cache.sqlite3"))
+# How long a backend call on the event loop waits for another worker's write lock before it counts as a miss
+CACHE_DB_BUSY_TIMEOUT_MS = float(os.getenv('CACHE_DB_BUSY_TIMEOUT_MS', '5'))
+
+def initialize_cache_backend(kind: str = CACHE_BACKEND, table: str = "summaries") -> CacheBackend | None:
+    """Create the configured persistent cache backend."""
+    if kind == 'sqlite':
+        try:
+            return SQLiteCacheBackend(CACHE_DB_PATH, table=table, busy_timeout=CACHE_DB_BUSY_TIMEOUT_MS / 1000)
+        except Exception as e:
+            logger.error("Error initializing SQLite cache at %s: %s", CACHE_DB_PATH, e)
+            return None
+    if kind != 'memory':
+        logger.warning("Unknown cache backend '%s', using in-memory cache only", kind)
+    return None
+
+# Responses of at least COMPRESS_MIN_BYTES are sent gzip (or brotli) compressed
+response_encoder = ResponseEncoder(min_size=int(os.getenv('COMPRESS_MIN_BYTES', '1024')))
 
 # Initialize global cache instance
-summarization_cache = SummarizationCache(ttl_hours=24)
+summarization_cache = SummarizationCache(
+    ttl_hours=24,
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    backend=initialize_cache_backend(),
+    revalidate_hours=CACHE_REVALIDATE_HOURS,
+    stale_while_revalidate_hours=CACHE_STALE_WHILE_REVALIDATE_HOURS,
+    stale_if_error_hours=CACHE_STALE_IF_ERROR_HOURS,
+    encoder=response_encoder
+)
+
+class LLMResponseCache(SummarizationCache):
+    """
+    Content-addressed cache of model responses, keyed by (model name, prompt hash).
+    
+    Prompts are built deterministically from paper text and user questions,
+    so the same abstract reached through different URLs, or a popular chat
+    question, produces the same prompt and can reuse an earlier answer.
+    Shares TTL, LRU budgets and the optional persistent backend with
+    SummarizationCache; entries are {'text', 'prompt_tokens', 'output_tokens'}.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prompt_tokens_saved = 0
+        self.output_tokens_saved = 0
+    
+    @staticmethod
+    def prompt_key(model_name: str, prompt: str) -> str:
+        """Cache key for a prompt sent to a model."""
+        return f"{model_name}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}"
+    
+    def _generate_cache_key(self, key: str) -> str:
+        # Keys are already content hashes (see prompt_key)
+        return key
+    
+    def get_response(self, model_name: str, prompt: str) -> str | None:
+        """Return the cached response text for a prompt, or None."""
+        entry = self.get(self.prompt_key(model_name, prompt))
+        if entry is None:
+            return None
+        self.prompt_tokens_saved += entry.get('prompt_tokens', 0)
+        self.output_tokens_saved += entry.get('output_tokens', 0)
+        return entry['text']
+    
+    def set_response(self, model_name: str, prompt: str, text: str,
+                     prompt_tokens: int | None = None, output_tokens: int | None = None) -> None:
+        """Cache a model response; token counts are estimated when the model did not report them."""
+        self.set(self.prompt_key(model_name, prompt), {
+            'text': text,
+            'prompt_tokens': prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt),
+            'output_tokens': output_tokens if output_tokens is not None else estimate_tokens(text),
+        })
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        stats = super().get_cache_stats()
+        stats.update({
+            'prompt_tokens_saved': self.prompt_tokens_saved,
+            'output_tokens_saved': self.output_tokens_saved,
+            'tokens_saved': self.prompt_tokens_saved + self.output_tokens_saved,
+        })
+        return stats
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+# Model response cache: enabled by default, persisted in the same database as the summaries
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', CACHE_BACKEND).lower()
+llm_cache = LLMResponseCache(
+    ttl_hours=float(os.getenv('LLM_CACHE_TTL_HOURS', '168')),
+    max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000')),
+    max_bytes=int(os.getenv('LLM_CACHE_MAX_BYTES', str(50 * 1024 * 1024))),
+    backend=initialize_cache_backend(LLM_CACHE_BACKEND, table="llm_responses")
+) if LLM_CACHE_ENABLED else None
+
+# Outcomes of refreshing expired entries, reported by /cache/stats
+revalidation_stats = {'revalidations': 0, 'not_modified': 0, 'unchanged_content': 0, 'changed_content': 0, 'llm_calls_saved': 0}
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical requests into a single in-flight computation.
+    
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task instead of repeating it.
+    The task is shielded, so a disconnecting client does not cancel the work
+    for everyone else. The run may carry a context object (e.g. progress that
+    later callers can follow), set by the caller that started it.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Label used in statistics
+        """
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._contexts: Dict[str, Any] = {}
+        # Callers currently awaiting each task
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+    
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished task so the next caller starts fresh work."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            self._contexts.pop(key, None)
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+    
+    def do(self, key: str, func: Callable[[], Awaitable[Any]], context: Any = None) -> Awaitable[Any]:
+        """
+        Run func() for key, or join the run already in flight.
+        
+        The run is started or joined when do() is called, not when the result is
+        awaited, so a caller can look up the run's context right after.
+        
+        Args:
+            key: Deduplication key
+            func: Zero-argument coroutine function doing the work
+            context: Kept with the run if this call starts it (see context())
+            
+        Returns:
+            An awaitable of the (shared) result of func()
+        """
+        task = self._in_flight.get(key)
+        coalesced = task is not None
+        if coalesced:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            if context is not None:
+                self._contexts[key] = context
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+        return self._wait(task, coalesced)
+    
+    async def _wait(self, task: asyncio.Task, coalesced: bool) -> Any:
+        waiters = self._waiters[task] = self._waiters.get(task, 0) + 1
+        if coalesced:
+            self.max_waiters = max(self.max_waiters, waiters)
+            logger.debug("Coalescing %s request onto in-flight work (%s waiters)", self.name, waiters)
+        try:
+            return await asyncio.shield(task)
+        finally:
+            # Callers that leave early (cancelled, client gone) stop counting right away
+            remaining = self._waiters[task] - 1
+            if remaining:
+                self._waiters[task] = remaining
+            else:
+                del self._waiters[task]
+    
+    def context(self, key: str) -> Any:
+        """The context of the run in flight for key, or None."""
+        return self._contexts.get(key)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics."""
+        return {
+            'in_flight': len(self._in_flight),
+            'waiting': sum(self._waiters.values()),
+            'executions': self.executions,
+            'coalesced_waiters': self.coalesced,
+            'max_waiters': self.max_waiters
+        }
+
+# In-flight deduplication for summarization (keyed by cache key) and chat (keyed by message)
+summarize_flights = SingleFlight("summarize")
+chat_flights = SingleFlight("chat")
+
+class SummaryProgress:
+    """
+    The sections and summary chunks of a streamed summarization as they arrive.
+    
+    The stream that starts a summarization passes one along (as the run's
+    SingleFlight context); streams joining the run replay what has arrived so
+    far and then follow it live.
+    """
+    
+    def __init__(self):
+        self.sections: Dict[str, Any] | None = None
+        self.chunks: List[str] = []
+        self.finished = False
+        self._changed = asyncio.Event()
+    
+    def _notify(self) -> None:
+        # Wake the current followers; later waits use a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    def set_sections(self, sections: Dict[str, Any]) -> None:
+        self.sections = sections
+        self._notify()
+    
+    def add_chunk(self, text: str) -> None:
+        self.chunks.append(text)
+        self._notify()
+    
+    def finish(self) -> None:
+        self.finished = True
+        self._notify()
+    
+    async def follow(self) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ("sections", sections) and then ("token", text) events from the start until finished."""
+        sent_sections = False
+        sent_chunks = 0
+        while True:
+            changed = self._changed
+            if not sent_sections and self.sections is not None:
+                sent_sections = True
+                yield "sections", self.sections
+            while sent_sections and sent_chunks < len(self.chunks):
+                sent_chunks += 1
+                yield "token", self.chunks[sent_chunks - 1]
+            if self.finished:
+                return
+            await changed.wait()
+
+class RefreshQueue:
+    """
+    Bounded queue of background cache refreshes.
+    
+    Stale entries are served right away and their URLs queued here; a fixed
+    number of workers refresh them, so background work never takes more than
+    that concurrency from foreground requests. A key already queued or being
+    refreshed is not queued twice, and when the queue is full new refreshes
+    are dropped (the entry is queued again by a later request).
+    """
+    
+    def __init__(self, name: str, refresh: Callable[[str], Awaitable[Any]], workers: int = 2, max_size: int = 100):
+        """
+        Args:
+            name: Label used in logs
+            refresh: Coroutine function refreshing one URL
+            workers: Number of concurrent refreshes
+            max_size: Maximum queued refreshes
+        """
+        self.name = name
+        self.refresh = refresh
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self._queue: asyncio.Queue | None = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending: set = set()
+        self.queued = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+    
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self) -> None:
+        """Cancel the workers, dropping queued refreshes."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+    
+    def submit(self, url: str, key: str | None = None) -> bool:
+        """
+        Queue a background refresh of url.
+        
+        Args:
+            url: URL to refresh
+            key: Deduplication key (default: the URL)
+            
+        Returns:
+            True if the refresh was queued or is already pending
+        """
+        key = key or url
+        if key in self._pending:
+            self.deduplicated += 1
+            return True
+        if self._queue is None or self._queue.full():
+            self.dropped += 1
+            return False
+        self._pending.add(key)
+        self._queue.put_nowait((key, url))
+        self.queued += 1
+        return True
+    
+    async def _worker(self) -> None:
+        while True:
+            key, url = await self._queue.get()
+            try:
+                await self.refresh(url)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning("Background %s refresh failed for URL %s: %s", self.name, url, e)
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get refresh queue statistics."""
+        return {
+            'workers': self.workers,
+            'max_size': self.max_size,
+            'pending': len(self._pending),
+            'queued': self.queued,
+            'deduplicated': self.deduplicated,
+            'dropped': self.dropped,
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+# Worker processes for PMC XML/HTML parsing and the sequence chat engine (see parse_pool.py);
+# PARSE_WORKERS=0 parses on the event loop
+parse_pool = ParsePool(
+    workers=int(os.getenv('PARSE_WORKERS', str(min(4, os.cpu_count() or 1)))),
+    max_pending=int(os.getenv('PARSE_MAX_PENDING', '16')),
+    inline_max_bytes=int(os.getenv('PARSE_INLINE_MAX_BYTES', '16384'))
+)
+
+# Upstream hosts tracked individually in /upstream/stats and /metrics; hosts of other
+# user-supplied URLs share bounded state (HTTP_MAX_TRACKED_HOSTS) and the "other" metrics label.
+# The E-utilities and ID converter hosts are added once their base URLs are configured.
+KNOWN_UPSTREAM_HOSTS = (
+    'eutils.ncbi.nlm.nih.gov', 'www.ncbi.nlm.nih.gov', 'pmc.ncbi.nlm.nih.gov', 'pubmed.ncbi.nlm.nih.gov',
+    'europepmc.org', 'www.ebi.ac.uk', 'doi.org', 'dx.doi.org',
+    'www.nature.com', 'link.springer.com', 'www.sciencedirect.com', 'journals.plos.org',
+    'www.frontiersin.org', 'www.mdpi.com', 'academic.oup.com', 'onlinelibrary.wiley.com',
+    'www.cell.com', 'www.science.org', 'journals.physiology.org', 'www.pnas.org',
+)
+
+# Shared connection pool for upstream fetches (E-utilities and publisher pages)
+http_pool = UpstreamClientPool(
+    max_connections=int(os.getenv('HTTP_MAX_CONNECTIONS', '100')),
+    max_keepalive_connections=int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20')),
+    keepalive_expiry=float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30')),
+    per_host_limit=int(os.getenv('HTTP_PER_HOST_LIMIT', '10')),
+    http2=os.getenv('HTTP2_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    known_hosts=KNOWN_UPSTREAM_HOSTS + tuple(
+        host.strip().lower() for host in os.getenv('UPSTREAM_KNOWN_HOSTS', '').split(',') if host.strip()
+    ),
+    max_hosts=int(os.getenv('HTTP_MAX_TRACKED_HOSTS', '256'))
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the paper corpus on startup and start background maintenance tasks."""
+    corpus_manager.reload_if_changed()
+    await http_pool.start()
+    await parse_pool.start()
+    
+    background_tasks = []
+    if CORPUS_RELOAD_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(corpus_manager.watch(CORPUS_RELOAD_INTERVAL)))
+    summary_refresh_queue.start()
+    if CACHE_SWEEP_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(summarization_cache.run_sweeper(CACHE_SWEEP_INTERVAL)))
+        if llm_cache is not None:
+            background_tasks.append(asyncio.create_task(llm_cache.run_sweeper(CACHE_SWEEP_INTERVAL)))
+    
+    yield
+    
+    await corpus_ingestor.cancel()
+    await summary_refresh_queue.stop()
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    
+    await http_pool.close()
+    await parse_pool.shutdown()
+    llm_executor.shutdown(wait=False)
+    if summarization_cache.backend:
+        summarization_cache.backend.close()
+    if llm_cache is not None and llm_cache.backend:
+        llm_cache.backend.close()
 
 app = FastAPI(
     title="Paper Summarizer API",
     description="API for summarizing research papers from URLs with AI-powered summarization",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware to allow requests from Flutter app
@@ -162,12 +1111,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the cache status of summaries and the request ID
+    expose_headers=["Age", "ETag", "X-Cache", "X-Corpus-Version", "X-Request-ID"],
+)
+
+# Compress responses not already served precompressed (cached summaries are, see ResponseEncoder)
+app.add_middleware(CompressionMiddleware, encoder=response_encoder)
+
+# Per-route request counts, latency and in-flight requests (scrapes of /metrics are not counted)
+app.add_middleware(
+    MetricsMiddleware,
+    requests=http_requests_total,
+    latency=http_request_duration_seconds,
+    in_flight=http_requests_in_flight,
+    excluded_paths=["/metrics"],
 )
 
+# Outermost, so every log record of a request carries its ID (X-Request-ID)
+app.add_middleware(RequestIdMiddleware)
+
 # Request model
 class SummarizeRequest(BaseModel):
     url: HttpUrl
 
+class BatchSummarizeRequest(BaseModel):
+    urls: List[HttpUrl] = Field(..., min_length=1, max_length=100)
+
 # Response model
 class SummarizeResponse(BaseModel):
     title: str
@@ -179,22 +1148,6 @@ class SummarizeResponse(BaseModel):
     discussion: str
     simplified_ai_version: str
 
-def extract_text_content(soup):
-    """Extract clean text content from BeautifulSoup object."""
-    # Remove script and style elements
-    for script in soup(["script", "style"]):
-        script.extract()
-    
-    # Get text and clean it up
-    text = soup.get_text()
-    # Break into lines and remove leading/trailing space
-    lines = (line.strip() for line in text.splitlines())
-    # Break multi-headlines into a line each
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    # Drop blank lines
-    text = ' '.join(chunk for chunk in chunks if chunk)
-    return text
-
 def extract_keywords_from_text(text, max_keywords=10):
     """Extract simple keywords from text (basic implementation)."""
     # This is a very basic keyword extraction
@@ -246,16 +1199,16 @@ async def generate_ai_summary_and_keywords(text_content):
         """
         
         # Generate content using AI
-        response = ai_model.generate_content(prompt)
+        response = await generate_model_content(prompt)
         
         # Check if response is empty or invalid
         if not response or not hasattr(response, 'text') or not response.text:
-            print("Warning: AI model returned empty response")
+            logger.warning("AI model returned empty response")
             return None, None
             
         ai_text = response.text.strip()
         if not ai_text:
-            print("Warning: AI model returned empty text")
+            logger.warning("AI model returned empty text")
             return None, None
         
         # Parse the response
@@ -279,30 +1232,26 @@ async def generate_ai_summary_and_keywords(text_content):
         
         # Validate results
         if not summary or not keywords:
-            print(f"Warning: Failed to parse AI response properly. Summary: {bool(summary)}, Keywords: {len(keywords)}")
+            logger.warning("Failed to parse AI response properly. Summary: %s, Keywords: %s", bool(summary), len(keywords))
             return None, None
         
         return summary, keywords
         
     except Exception as e:
-        print(f"Error generating AI summary: {e}")
+        logger.error("Error generating AI summary: %s", e)
         return None, None
 
-async def generate_simplified_summary(abstract, introduction, materials_methods, results, discussion):
-    """Generate simplified summary using AI."""
-    if not ai_model:
-        return "AI summarization not available."
+def build_simplified_summary_prompt(abstract, introduction, materials_methods, results, discussion) -> str:
+    """Build the prompt for a simplified, non-expert summary of a paper."""
+    # Combine all sections
+    combined_text = f"Abstract: {abstract}"
+    # combined_text = f"Abstract: {abstract}\n\nIntroduction: {introduction}\n\nMaterials and Methods: {materials_methods}\n\nResults: {results}\n\nDiscussion: {discussion}"
     
-    try:
-        # Combine all sections
-        combined_text = f"Abstract: {abstract}"
-        # combined_text = f"Abstract: {abstract}\n\nIntroduction: {introduction}\n\nMaterials and Methods: {materials_methods}\n\nResults: {results}\n\nDiscussion: {discussion}"
-        
-        # Truncate if too long
-        if len(combined_text) > 3000:
-            combined_text = combined_text[:3000]
-        
-        prompt = f"""
+    # Truncate if too long
+    if len(combined_text) > 3000:
+        combined_text = combined_text[:3000]
+    
+    return f"""
         Please create a simplified summary of this scientific paper for non-experts. 
         Explain the research in simple terms that anyone can understand.
         
@@ -317,352 +1266,399 @@ async def generate_simplified_summary(abstract, introduction, materials_methods,
         
         Use simple language and avoid technical jargon. Keep it under 300 words. Start directly with the subject.
         """
+
+async def generate_simplified_summary(abstract, introduction, materials_methods, results, discussion):
+    """Generate simplified summary using AI."""
+    if not ai_model:
+        return "AI summarization not available."
+    
+    try:
+        prompt = build_simplified_summary_prompt(abstract, introduction, materials_methods, results, discussion)
         
         # Generate content using AI
-        response = ai_model.generate_content(prompt)
+        response = await generate_model_content(prompt)
         
         if response and hasattr(response, 'text') and response.text:
             return response.text.strip()
         else:
             return "AI could not generate summary."
             
+    except UpstreamUnavailable:
+        # Not a summary: let the caller serve a stale entry or answer 503 instead of caching it
+        raise
     except Exception as e:
-        print(f"Error generating simplified summary: {e}")
+        logger.error("Error generating simplified summary: %s", e)
         return f"Error generating simplified summary: {str(e)}"
 
+async def stream_simplified_summary(abstract, introduction, materials_methods, results, discussion) -> AsyncIterator[str]:
+    """Stream a simplified summary chunk by chunk, with the same fallbacks as generate_simplified_summary."""
+    if not ai_model:
+        yield "AI summarization not available."
+        return
+    
+    produced = False
+    try:
+        prompt = build_simplified_summary_prompt(abstract, introduction, materials_methods, results, discussion)
+        async for text in stream_model_content(prompt):
+            produced = True
+            yield text
+        if not produced:
+            yield "AI could not generate summary."
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        logger.error("Error streaming simplified summary: %s", e)
+        if not produced:
+            yield f"Error generating simplified summary: {str(e)}"
+
+# PMC XML parser: "lxml" (single streaming pass) or "bs4" (BeautifulSoup tree)
+PMC_PARSER = os.getenv('PMC_PARSER', 'lxml').lower()
+
+async def parse_pmc_sections(xml_content: bytes, wait: bool = False) -> Dict[str, str]:
+    """
+    Extract the sections of PMC XML in the parse pool (see sections.extract_pmc_sections).
+    
+    Args:
+        xml_content: Raw efetch response body
+        wait: Queue for a pool slot instead of failing fast when the pool is saturated
+        
+    Raises:
+        ParsePoolSaturated: All pool slots are taken and wait is False
+    """
+    with stage_seconds.time("parse"):
+        return await parse_pool.run(extract_pmc_sections, xml_content, PMC_PARSER, size=len(xml_content), wait=wait)
+
 async def parse_pmc_xml_content(xml_content, original_url):
     """Parse PMC XML content from E-utilities API."""
     try:
-        print("DEBUG: Parsing PMC XML content...")
-        
-        # Parse XML with BeautifulSoup
-        soup = BeautifulSoup(xml_content, 'xml')
-        
-        # Extract title
-        title = "Untitled PMC Article"
-        title_group = soup.find('title-group')
-        if title_group:
-            article_title = title_group.find('article-title')
-            if article_title:
-                title = article_title.get_text().strip()
-        
-        print(f"DEBUG: Extracted title: {title}")
-        
-        # Extract abstract
-        abstract = ""
-        abstract_element = soup.find('abstract')
-        if abstract_element:
-            # Remove any nested tags and get clean text
-            for tag in abstract_element(['title', 'label']):
-                tag.decompose()
-            abstract = abstract_element.get_text().strip()
-        
-        print(f"DEBUG: Extracted abstract length: {len(abstract)} chars")
-        
-        # Extract specific sections
-        introduction = ""
-        materials_methods = ""
-        results = ""
-        discussion = ""
-        
-        # Look for sections in the body
-        body = soup.find('body')
-        if body:
-            # Find sections by title
-            sections = body.find_all('sec')
-            
-            for section in sections:
-                # Get section title
-                section_title = ""
-                title_element = section.find('title')
-                if title_element:
-                    section_title = title_element.get_text().strip().lower()
-                
-                # Remove title from section content
-                section_copy = section.__copy__()
-                if section_copy.find('title'):
-                    section_copy.find('title').decompose()
-                
-                # Remove references, figures, tables
-                for unwanted in section_copy(['ref-list', 'fig', 'table-wrap', 'fn-group', 'ref']):
-                    unwanted.decompose()
-                
-                section_text = section_copy.get_text().strip()
-                section_text = ' '.join(section_text.split())  # Normalize whitespace
-                
-                # Categorize sections
-                if any(keyword in section_title for keyword in ['introduction', 'background', 'intro']):
-                    introduction = section_text
-                    print(f"DEBUG: Found introduction section: {len(introduction)} chars")
-                elif any(keyword in section_title for keyword in ['material', 'method', 'procedure', 'experimental']):
-                    materials_methods = section_text
-                    print(f"DEBUG: Found materials/methods section: {len(materials_methods)} chars")
-                elif any(keyword in section_title for keyword in ['result', 'finding', 'outcome']):
-                    results = section_text
-                    print(f"DEBUG: Found results section: {len(results)} chars")
-                elif any(keyword in section_title for keyword in ['discussion', 'conclusion', 'implication']):
-                    discussion = section_text
-                    print(f"DEBUG: Found discussion section: {len(discussion)} chars")
-        
-        # If sections not found by title, try to extract from paragraphs
-        if not introduction or not materials_methods or not results or not discussion:
-            print("DEBUG: Attempting to extract sections from paragraph content...")
-            all_paragraphs = body.find_all('p') if body else []
-            
-            for para in all_paragraphs:
-                para_text = para.get_text().strip()
-                
-                # Simple heuristics to identify sections
-                if not introduction and len(para_text) > 100:
-                    introduction = para_text
-                elif not materials_methods and any(word in para_text.lower()[:50] for word in ['material', 'method', 'procedure', 'protocol']):
-                    materials_methods = para_text
-                elif not results and any(word in para_text.lower()[:50] for word in ['result', 'finding', 'observed', 'measured']):
-                    results = para_text
-                elif not discussion and any(word in para_text.lower()[:50] for word in ['discussion', 'conclusion', 'suggest', 'implication']):
-                    discussion = para_text
+        sections = await parse_pmc_sections(xml_content)
         
         # Generate simplified summary using AI
-        simplified_summary = await generate_simplified_summary(abstract, introduction, materials_methods, results, discussion)
+        simplified_summary = await generate_simplified_summary(
+            sections['abstract'], sections['introduction'], sections['materials_methods'],
+            sections['results'], sections['discussion']
+        )
         
         response_data = SummarizeResponse(
-            title=title,
             link=original_url,
-            abstract=abstract,
-            introduction=introduction,
-            materials_methods=materials_methods,
-            results=results,
-            discussion=discussion,
-            simplified_ai_version=simplified_summary
+            simplified_ai_version=simplified_summary,
+            **sections
         )
         
-        print(f"DEBUG: PMC XML parsing completed successfully")
+        logger.debug("PMC XML parsing completed successfully")
         return response_data
         
     except Exception as e:
-        print(f"DEBUG: Error parsing PMC XML: {e}")
+        logger.error("Error parsing PMC XML: %s", e)
         raise HTTPException(status_code=500, detail=f"Error parsing PMC content: {str(e)}")
 
-@app.post("/summarize", response_model=SummarizeResponse)
-async def summarize_paper(request: SummarizeRequest):
+# Publisher HTML parser: "lxml" (single traversal) or "bs4" (BeautifulSoup html.parser)
+HTML_PARSER = os.getenv('HTML_PARSER', 'lxml').lower()
+
+async def parse_html_sections(html_content: bytes, wait: bool = False) -> Dict[str, str]:
     """
-    Summarize a research paper from the provided URL.
+    Extract the sections of a publisher HTML page in the parse pool (see sections.extract_html_sections).
     
     Args:
-        request: JSON object containing the URL of the paper to summarize
+        html_content: Raw response body
+        wait: Queue for a pool slot instead of failing fast when the pool is saturated
         
-    Returns:
-        JSON response with paper title, link, summary, keywords, and abstract
+    Raises:
+        ParsePoolSaturated: All pool slots are taken and wait is False
     """
-    try:
-        print(f"DEBUG: Attempting to fetch URL: {request.url}")
+    with stage_seconds.time("extract"):
+        return await parse_pool.run(extract_html_sections, html_content, HTML_PARSER, size=len(html_content), wait=wait)
+
+# NCBI E-utilities endpoint (overridable to point at a local stand-in)
+EUTILS_BASE_URL = os.getenv('EUTILS_BASE_URL', 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils').rstrip('/')
+EUTILS_HEADERS = {
+    'User-Agent': 'AstroLens-PaperSummarizer/1.0 (contact@example.com)',
+    'Accept': 'application/xml, text/xml, */*',
+}
+# Maximum PMC IDs per multi-ID efetch request
+EUTILS_BATCH_SIZE = int(os.getenv('EUTILS_BATCH_SIZE', '20'))
+
+# NCBI allows 10 requests/second with an API key; E-utilities and the ID converter share the budget
+ncbi_upstream = build_upstream('ncbi', float(os.getenv('NCBI_REQUESTS_PER_SECOND', '10')), (httpx.TransportError, ConnectionError))
+
+# Canonical article identity (PMC ID, PMID, DOI) shared by the cache, request coalescing and fetch routing
+identity_resolver = IdentityResolver()
+
+# NCBI PMC ID converter endpoint (overridable to point at a local stand-in)
+IDCONV_BASE_URL = os.getenv('IDCONV_BASE_URL', 'https://www.ncbi.nlm.nih.gov/pmc/utils/idconv/v1.0/')
+# Maximum IDs per ID converter request (NCBI limit)
+IDCONV_BATCH_SIZE = 200
+http_pool.add_known_hosts(httpx.URL(EUTILS_BASE_URL).host, httpx.URL(IDCONV_BASE_URL).host)
+
+async def populate_identity_table(ids: List[str]) -> Dict[str, int]:
+    """
+    Bulk-load PMID/DOI -> PMC ID mappings from the NCBI ID converter.
+    
+    Args:
+        ids: PMC IDs, PMIDs or DOIs (see IdentityResolver.converter_ids)
         
-        # Try multiple strategies for PMC access
-        url_str = str(request.url)
+    Returns:
+        Dict with the number of IDs requested, converter requests made, records added and failed requests
+    """
+    stats = {'requested': len(ids), 'requests': 0, 'records_added': 0, 'failed_requests': 0}
+    for start in range(0, len(ids), IDCONV_BATCH_SIZE):
+        chunk = ids[start:start + IDCONV_BATCH_SIZE]
+        params = {'ids': ','.join(chunk), 'format': 'json', 'tool': 'astrolens', 'email': 'contact@example.com'}
+        if os.getenv('NCBI_API_KEY'):
+            params['api_key'] = os.getenv('NCBI_API_KEY')
+        try:
+            stats['requests'] += 1
+            idconv_url = str(httpx.URL(IDCONV_BASE_URL, params=params))
+            with stage_seconds.time("fetch"):
+                response = await ncbi_upstream.call(lambda: http_pool.get(idconv_url, headers=EUTILS_HEADERS, timeout=60.0))
+            response.raise_for_status()
+            stats['records_added'] += identity_resolver.load_records(response.json().get('records', []))
+        except Exception as e:
+            stats['failed_requests'] += 1
+            logger.warning("ID converter request failed for %s IDs: %s", len(chunk), e)
+    return stats
+
+def split_pmc_articleset(xml_content: bytes) -> Dict[str, bytes]:
+    """
+    Split a multi-article efetch response into one XML document per article.
+    
+    Args:
+        xml_content: <pmc-articleset> XML returned by efetch for several IDs
+        
+    Returns:
+        Mapping of PMC ID (e.g. "PMC4095884") to that article's XML
+    """
+    parser = etree.XMLParser(recover=True, resolve_entities=False, no_network=True, huge_tree=True)
+    root = etree.fromstring(xml_content, parser)
+    if root is None:
+        return {}
+    
+    articles: Dict[str, bytes] = {}
+    candidates = [root] if etree.QName(root).localname == 'article' else root.iter('article')
+    for article in candidates:
+        pmc_id = None
+        for article_id in article.iterfind('.//article-meta/article-id'):
+            if article_id.get('pub-id-type') in ('pmc', 'pmcid', 'pmc-uid') and article_id.text:
+                digits = re.sub(r'\D', '', article_id.text)
+                if digits:
+                    pmc_id = f"PMC{digits}"
+                    break
+        if pmc_id:
+            articles[pmc_id] = etree.tostring(article)
+    return articles
+
+async def fetch_pmc_articles(pmc_ids: List[str], api_key: str) -> Tuple[Dict[str, bytes], int]:
+    """
+    Fetch many PMC articles with as few efetch round trips as possible.
+    
+    IDs are grouped into comma-separated efetch requests of EUTILS_BATCH_SIZE,
+    rate limited to respect NCBI limits. Articles missing from the responses
+    (or whose request failed) are simply absent from the result.
+    
+    Returns:
+        Tuple of (PMC ID -> article XML, number of efetch requests made)
+    """
+    articles: Dict[str, bytes] = {}
+    requests_made = 0
+    for start in range(0, len(pmc_ids), EUTILS_BATCH_SIZE):
+        chunk = pmc_ids[start:start + EUTILS_BATCH_SIZE]
+        eutils_url = f"{EUTILS_BASE_URL}/efetch.fcgi?db=pmc&id={','.join(chunk)}&rettype=full&retmode=xml&api_key={api_key}"
+        logger.debug("Batch efetch for %s PMC IDs", len(chunk))
+        try:
+            requests_made += 1
+            with stage_seconds.time("fetch"):
+                response = await ncbi_upstream.call(lambda: http_pool.get(eutils_url, headers=EUTILS_HEADERS, timeout=120.0))
+            response.raise_for_status()
+            articles.update(split_pmc_articleset(response.content))
+        except Exception as e:
+            logger.warning("Batch efetch failed for %s PMC IDs: %s", len(chunk), e)
+    return articles, requests_made
+
+# Fields whose text makes up the content hash of a paper
+SECTION_FIELDS = ('title', 'abstract', 'introduction', 'materials_methods', 'results', 'discussion')
+
+def section_content_hash(sections: Dict[str, str]) -> str:
+    """Hash of the extracted section text, used to detect unchanged upstream content."""
+    content = json.dumps([sections.get(field, '') for field in SECTION_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def conditional_headers(validators: Dict[str, Any] | None, source: str) -> Dict[str, str]:
+    """If-None-Match/If-Modified-Since headers for revalidating a response from the given source."""
+    if not validators or validators.get('source') != source:
+        return {}
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+def response_validators(response: httpx.Response, source: str) -> Dict[str, Any]:
+    """Upstream validators of a response."""
+    return {
+        'source': source,
+        'etag': response.headers.get('etag'),
+        'last_modified': response.headers.get('last-modified'),
+    }
+
+async def fetch_paper_sections(url_str: str) -> Dict[str, str]:
+    """
+    Fetch a paper and extract its sections, without AI summarization.
+    
+    Args:
+        url_str: URL of the paper
         
-        # Initialize response variable
-        response = None
+    Returns:
+        Dict with title, link, abstract, introduction, materials_methods, results and discussion
+    """
+    sections, _ = await fetch_paper_sections_conditional(url_str)
+    return sections
+
+async def fetch_paper_sections_conditional(url_str: str, validators: Dict[str, Any] | None = None) -> Tuple[Dict[str, str] | None, Dict[str, Any]]:
+    """
+    Fetch a paper and extract its sections, revalidating a previous fetch.
+    
+    PMC articles are fetched as XML through NCBI E-utilities when possible;
+    everything else is fetched as HTML and parsed heuristically. When
+    validators from an earlier fetch are given, the request is conditional.
+    
+    Args:
+        url_str: URL of the paper
+        validators: Validators of the cached entry (see response_validators)
         
-        # PMC E-utilities API strategy
-        if 'pmc.ncbi.nlm.nih.gov' in url_str:
-            print("DEBUG: Detected PMC URL, using NCBI E-utilities API...")
-            
-            # Extract PMC ID from URL
-            pmc_id_match = re.search(r'/PMC(\d+)', url_str)
-            if pmc_id_match:
-                pmc_id = f"PMC{pmc_id_match.group(1)}"
-                print(f"DEBUG: Extracted PMC ID: {pmc_id}")
-                
-                # Get NCBI API key from environment
-                ncbi_api_key = os.getenv('NCBI_API_KEY')
-                if ncbi_api_key:
-                    print(f"DEBUG: Using NCBI API key: {ncbi_api_key[:8]}...")
-                    
-                    # Build E-utilities URL
-                    eutils_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=pmc&id={pmc_id}&rettype=full&retmode=xml&api_key={ncbi_api_key}"
-                    
-                    print(f"DEBUG: E-utilities URL: {eutils_url}")
-                    
-                    try:
-                        headers = {
-                            'User-Agent': 'AstroLens-PaperSummarizer/1.0 (contact@example.com)',
-                            'Accept': 'application/xml, text/xml, */*',
-                        }
-                        
-                        async with httpx.AsyncClient(timeout=60.0) as client:
-                            pmc_response = await client.get(eutils_url, headers=headers)
-                            
-                            print(f"DEBUG: E-utilities response status: {pmc_response.status_code}")
-                            print(f"DEBUG: E-utilities content length: {len(pmc_response.content)} bytes")
-                            print(f"DEBUG: E-utilities content preview: {pmc_response.text[:500]}")
-                            
-                            if pmc_response.status_code == 200 and len(pmc_response.content) > 100:
-                                print("DEBUG: SUCCESS! Got PMC content via E-utilities API")
-                                # Parse XML content instead of HTML
-                                return await parse_pmc_xml_content(pmc_response.content, str(request.url))
-                            else:
-                                print("DEBUG: E-utilities failed, falling back to generic approach")
-                                
-                    except Exception as e:
-                        print(f"DEBUG: E-utilities failed with error: {e}")
-                else:
-                    print("DEBUG: No NCBI_API_KEY found in environment, skipping E-utilities")
-            else:
-                print("DEBUG: Could not extract PMC ID from URL")
-        
-        # Generic approach for non-PMC URLs or if PMC strategies failed
-        if response is None:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
+    Returns:
+        Tuple of (sections including link, or None if upstream answered 304 Not Modified;
+        validators of this response, including the section content hash)
+    """
+    logger.debug("Attempting to fetch URL: %s", url_str)
+    
+    # Initialize response variable
+    response = None
+    
+    # PMC E-utilities API strategy, for any URL form that resolves to a PMC article
+    identity = identity_resolver.resolve(url_str)
+    if identity.pmcid:
+        logger.debug("Resolved %s to %s, using NCBI E-utilities API...", url_str, identity.pmcid)
+        pmc_id = identity.pmcid
+        
+        # Get NCBI API key from environment
+        ncbi_api_key = os.getenv('NCBI_API_KEY')
+        if ncbi_api_key:
+            # Build E-utilities URL
+            eutils_url = f"{EUTILS_BASE_URL}/efetch.fcgi?db=pmc&id={pmc_id}&rettype=full&retmode=xml&api_key={ncbi_api_key}"
             
-            print(f"DEBUG: Using generic approach for: {url_str}")
+            # The URL carries the API key, so it is not logged
+            logger.debug("E-utilities efetch for %s from %s", pmc_id, EUTILS_BASE_URL)
             
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url_str, headers=headers)
+            try:
+                with stage_seconds.time("fetch"):
+                    pmc_response = await ncbi_upstream.call(lambda: http_pool.get(
+                        eutils_url, headers={**EUTILS_HEADERS, **conditional_headers(validators, 'eutils')}, timeout=60.0
+                    ))
                 
-                print(f"DEBUG: Response status: {response.status_code}")
-                print(f"DEBUG: Content length: {len(response.content)} bytes")
-        
-        print(f"DEBUG: Final response preview (first 500 chars): {response.text[:500]}")
-        response.raise_for_status()
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title = "Untitled Document"
-        title_tag = soup.find('title')
-        if title_tag:
-            title = title_tag.get_text().strip()
-        
-        # Look for meta title as backup
-        if not title or title == "Untitled Document":
-            meta_title = soup.find('meta', property='og:title')
-            if meta_title:
-                title = meta_title.get('content', '').strip()
-        
-        # Extract abstract - try multiple approaches
-        abstract = ""
-        
-        # Method 1: Look for meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc:
-            abstract = meta_desc.get('content', '').strip()
-        
-        # Method 2: Look for OpenGraph description
-        if not abstract:
-            og_desc = soup.find('meta', property='og:description')
-            if og_desc:
-                abstract = og_desc.get('content', '').strip()
-        
-        # Method 3: Look for abstract section in body
-        if not abstract:
-            abstract_section = soup.find(['div', 'section', 'p'], class_=re.compile(r'abstract', re.I))
-            if abstract_section:
-                abstract = extract_text_content(abstract_section)[:500]
-        
-        # Method 4: Look for abstract by ID
-        if not abstract:
-            abstract_by_id = soup.find(id=re.compile(r'abstract', re.I))
-            if abstract_by_id:
-                abstract = extract_text_content(abstract_by_id)[:500]
-        
-        # Method 5: Look for first paragraph that might be abstract
-        if not abstract:
-            paragraphs = soup.find_all('p')
-            for p in paragraphs[:5]:  # Check first 5 paragraphs
-                text = p.get_text().strip()
-                if len(text) > 100:  # Substantial paragraph
-                    abstract = text[:500]
-                    break
-        
-        # Fallback: Use first 500 characters of body text
-        if not abstract:
-            body_text = extract_text_content(soup)
-            abstract = body_text[:500] if body_text else "No content available"
-        
-        # Extract specific sections from HTML content
-        introduction = ""
-        materials_methods = ""
-        results = ""
-        discussion = ""
-        
-        # Try to find sections by headers or content patterns
-        all_text = extract_text_content(soup)
-        paragraphs = soup.find_all(['p', 'div', 'section'])
-        
-        for element in paragraphs:
-            text = element.get_text().strip()
-            if len(text) < 50:  # Skip short elements
-                continue
+                if pmc_response.status_code == 304 and validators:
+                    logger.debug("E-utilities content not modified")
+                    return None, {**validators, **{k: v for k, v in response_validators(pmc_response, 'eutils').items() if v}}
                 
-            # Check for section indicators
-            text_lower = text.lower()
-            
-            # Look for introduction section
-            if not introduction and any(indicator in text_lower[:100] for indicator in ['introduction', 'background', 'overview']):
-                introduction = text[:1000]  # Limit length
-                print(f"DEBUG: Found introduction section in HTML: {len(introduction)} chars")
-            
-            # Look for materials/methods section
-            elif not materials_methods and any(indicator in text_lower[:100] for indicator in ['materials', 'methods', 'methodology', 'procedure', 'experimental']):
-                materials_methods = text[:1000]
-                print(f"DEBUG: Found materials/methods section in HTML: {len(materials_methods)} chars")
-            
-            # Look for results section
-            elif not results and any(indicator in text_lower[:100] for indicator in ['results', 'findings', 'outcomes', 'data show']):
-                results = text[:1000]
-                print(f"DEBUG: Found results section in HTML: {len(results)} chars")
-            
-            # Look for discussion section
-            elif not discussion and any(indicator in text_lower[:100] for indicator in ['discussion', 'conclusion', 'implications', 'suggest']):
-                discussion = text[:1000]
-                print(f"DEBUG: Found discussion section in HTML: {len(discussion)} chars")
-        
-        # If sections still not found, extract from general content
-        if not introduction or not materials_methods or not results or not discussion:
-            print("DEBUG: Using fallback content extraction for missing sections...")
-            paragraphs_text = [p.get_text().strip() for p in soup.find_all('p') if len(p.get_text().strip()) > 100]
-            
-            if not introduction and len(paragraphs_text) > 0:
-                introduction = paragraphs_text[0][:1000]
-            if not materials_methods and len(paragraphs_text) > 1:
-                materials_methods = paragraphs_text[1][:1000]
-            if not results and len(paragraphs_text) > 2:
-                results = paragraphs_text[2][:1000]
-            if not discussion and len(paragraphs_text) > 3:
-                discussion = paragraphs_text[3][:1000]
+                logger.debug("E-utilities response status: %s", pmc_response.status_code)
+                logger.debug("E-utilities content length: %s bytes", len(pmc_response.content))
+                
+                if pmc_response.status_code == 200 and len(pmc_response.content) > 100:
+                    logger.debug("SUCCESS! Got PMC content via E-utilities API")
+                    # Parse XML content instead of HTML
+                    sections = {'link': url_str, **await parse_pmc_sections(pmc_response.content)}
+                    return sections, {**response_validators(pmc_response, 'eutils'), 'content_hash': section_content_hash(sections)}
+                else:
+                    logger.debug("E-utilities failed, falling back to generic approach")
+                        
+            except UpstreamUnavailable:
+                # NCBI is rate limited or its circuit is open: fail fast rather than scrape the same host
+                raise
+            except ParsePoolSaturated:
+                # The article was fetched; scraping the page would only add more parsing
+                raise
+            except Exception as e:
+                logger.warning("E-utilities failed with error: %s", e)
+        else:
+            logger.debug("No NCBI_API_KEY found in environment, skipping E-utilities")
+    
+    # Generic approach for non-PMC URLs or if PMC strategies failed
+    if response is None:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Upgrade-Insecure-Requests': '1',
+        }
         
-        # Generate simplified summary using AI
-        simplified_summary = await generate_simplified_summary(abstract, introduction, materials_methods, results, discussion)
+        logger.debug("Using generic approach for: %s", url_str)
         
-        response_data = SummarizeResponse(
-            title=title,
-            link=str(request.url),
-            abstract=abstract,
-            introduction=introduction,
-            materials_methods=materials_methods,
-            results=results,
-            discussion=discussion,
-            simplified_ai_version=simplified_summary
+        # Connections are kept alive by the shared pool (no Connection header: it is invalid over HTTP/2)
+        headers.update(conditional_headers(validators, 'generic'))
+        with stage_seconds.time("fetch"):
+            response = await http_pool.get(url_str, headers=headers, timeout=30.0, follow_redirects=True)
+        
+        logger.debug("Response status: %s", response.status_code)
+        logger.debug("Content length: %s bytes", len(response.content))
+        
+        if response.status_code == 304 and validators:
+            logger.debug("Content not modified")
+            return None, {**validators, **{k: v for k, v in response_validators(response, 'generic').items() if v}}
+    
+    response.raise_for_status()
+    
+    sections = {'link': url_str, **await parse_html_sections(response.content)}
+    return sections, {**response_validators(response, 'generic'), 'content_hash': section_content_hash(sections)}
+
+@app.post("/summarize", response_model=SummarizeResponse)
+async def summarize_paper(request: SummarizeRequest):
+    """
+    Summarize a research paper from the provided URL.
+    
+    Args:
+        request: JSON object containing the URL of the paper to summarize
+        
+    Returns:
+        JSON response with paper title, link, summary, keywords, and abstract
+    """
+    try:
+        sections = await fetch_paper_sections(str(request.url))
+        
+        # Generate simplified summary using AI
+        simplified_summary = await generate_simplified_summary(
+            sections['abstract'], sections['introduction'], sections['materials_methods'],
+            sections['results'], sections['discussion']
         )
         
+        response_data = SummarizeResponse(simplified_ai_version=simplified_summary, **sections)
+        
         return response_data
         
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=400, detail=f"HTTP error fetching URL: {e.response.status_code} - {str(e)}")
-    except httpx.TimeoutException as e:
-        raise HTTPException(status_code=400, detail=f"Timeout fetching URL: {str(e)}")
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=400, detail=f"Network error fetching URL: {str(e)}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+        status_code, detail = describe_summarize_error(e)
+        raise HTTPException(status_code=status_code, detail=detail)
+
+def describe_summarize_error(e: Exception) -> Tuple[int, str]:
+    """Map an exception raised while summarizing to an HTTP status code and detail message."""
+    if isinstance(e, UpstreamUnavailable):
+        return 503, f"Upstream temporarily unavailable: {str(e)}"
+    if isinstance(e, ParsePoolSaturated):
+        return 503, f"Server busy: {str(e)}"
+    if isinstance(e, httpx.HTTPStatusError):
+        return 400, f"HTTP error fetching URL: {e.response.status_code} - {str(e)}"
+    if isinstance(e, httpx.TimeoutException):
+        return 400, f"Timeout fetching URL: {str(e)}"
+    if isinstance(e, httpx.RequestError):
+        return 400, f"Network error fetching URL: {str(e)}"
+    return 500, f"Error processing request: {str(e)}"
+
+# Headers for Server-Sent Events responses (disable proxy buffering so chunks flush immediately)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @app.get("/")
 async def root():
@@ -673,9 +1669,21 @@ async def root():
         "endpoints": {
             "/summarize": "POST - Summarize a research paper from URL",
             "/summarize-get": "GET - Summarize a research paper from URL (browser-friendly, with caching)",
+            "/summarize-get/stream": "GET - Stream sections and summary of a research paper as Server-Sent Events",
+            "/summarize/batch": "POST - Summarize many papers at once, batching PMC fetches",
             "/chat": "GET - Chat endpoint that finds relevant papers based on user query",
+            "/chat/stream": "GET - Stream the chat answer as Server-Sent Events",
+            "/search": "GET - Ranked, paginated search over the paper corpus with category facets",
+            "/corpus": "GET - The paper corpus (precompressed, versioned, per category or as a delta since a version)",
+            "/corpus/stats": "GET - Get paper corpus statistics",
+            "/ingest/start": "POST - Start pre-summarizing every paper in the corpus",
+            "/ingest/status": "GET - Get corpus ingestion progress",
+            "/identity/resolve": "GET - Resolve a paper URL to its canonical article ID",
+            "/identity/populate": "POST - Load PMID/DOI mappings for the corpus from the NCBI ID converter",
+            "/upstream/stats": "GET - Get upstream connection pool, parse pool, rate limiter and circuit breaker statistics",
             "/cache/stats": "GET - Get cache statistics",
-            "/cache/clear": "POST - Clear expired cache entries"
+            "/cache/clear": "POST - Clear expired cache entries",
+            "/metrics": "GET - Prometheus metrics (request latency, stage timings, cache and upstream counters)"
         },
         "cache_info": {
             "enabled": True,
@@ -685,10 +1693,13 @@ async def root():
     }
 
 @app.get("/summarize-get")
-async def summarize_paper_get(url: str):
+async def summarize_paper_get(url: str, request: Request):
     """
     Browser-friendly GET endpoint for summarizing papers with caching.
     
+    Responses carry a strong ETag of the summary; a request whose
+    If-None-Match matches it gets 304 Not Modified without a body.
+    
     Usage: http://localhost:8000/summarize-get?url=https://example.com/paper
     """
     try:
@@ -699,32 +1710,352 @@ async def summarize_paper_get(url: str):
         except ValidationError:
             raise HTTPException(status_code=422, detail="Invalid URL format")
         
-        # Check cache first
-        cached_response = summarization_cache.get(str(validated_url))
-        if cached_response:
-            print(f"DEBUG: Returning cached response for URL: {url}")
-            return cached_response
-        
-        # Cache miss - process the request
-        print(f"DEBUG: Cache miss - processing URL: {url}")
-        
-        # Create request object and use the existing logic
-        request = SummarizeRequest(url=validated_url)
-        response_data = await summarize_paper(request)
-        
-        # Convert Pydantic model to dict for caching
-        response_dict = response_data.dict() if hasattr(response_data, 'dict') else response_data
-        
-        # Store in cache
-        summarization_cache.set(str(validated_url), response_dict)
-        
-        return response_data
+        # Check cache first; a stale entry is served as is and refreshed in the background
+        entry = summarization_cache.lookup(str(validated_url))
+        if entry:
+            logger.debug("Returning %s response for URL: %s", 'stale' if entry.stale else 'cached', url)
+            if entry.stale:
+                schedule_refresh(str(validated_url))
+            payload = summarization_cache.payload(str(validated_url), entry.data)
+            return response_encoder.response(payload, request.headers, cache_status_headers(entry))
+        
+        # Cache miss - process the request, sharing the work with identical concurrent requests
+        logger.debug("Cache miss - processing URL: %s", url)
+        entry = await refresh_summary(str(validated_url))
+        payload = summarization_cache.payload(str(validated_url), entry.data)
+        return response_encoder.response(payload, request.headers, cache_status_headers(entry, miss=True))
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+def cache_status_headers(entry: CacheEntry, miss: bool = False) -> Dict[str, str]:
+    """Age and X-Cache (HIT, STALE or MISS) headers for a summary response."""
+    status = 'STALE' if entry.stale else ('MISS' if miss else 'HIT')
+    return {'X-Cache': status, 'Age': str(int(entry.age_seconds))}
+
+async def summarize_and_cache(validated_url: HttpUrl) -> Dict[str, Any]:
+    """Summarize a URL and cache the result (see refresh_summary)."""
+    return (await refresh_summary(str(validated_url))).data
+
+async def refresh_summary(url_str: str) -> CacheEntry:
+    """
+    Summarize a URL and cache the result, coalescing identical concurrent requests.
+    
+    An expired entry still kept for revalidation is refreshed with a
+    conditional fetch; its summary is reused if upstream answers 304 or the
+    extracted content is unchanged. If the refresh fails, the expired entry
+    may be served instead (see serve_stale_or_raise).
+    
+    Returns:
+        The new entry, or the stale one served on error
+    """
+    return await summary_flight(url_str)
+
+def summary_flight(url_str: str, progress: SummaryProgress | None = None) -> Awaitable[CacheEntry]:
+    """
+    Start summarizing a URL, or join the summarization of it already in flight (see refresh_summary).
+    
+    Args:
+        url_str: Paper URL
+        progress: If this call starts the work, the summary is streamed from the
+            model and its sections and chunks are published here as they arrive
+    
+    Returns:
+        An awaitable of the new entry, or of the stale one served on error
+    """
+    async def run() -> CacheEntry:
+        stale = summarization_cache.get_stale(url_str)
+        try:
+            sections, validators = await fetch_paper_sections_conditional(url_str, stale.validators if stale else None)
+            response_dict = await summarize_sections(url_str, sections, validators, stale, progress)
+            return CacheEntry(response_dict, validators, 0.0, False)
+        except Exception as e:
+            return serve_stale_or_raise(url_str, stale, e)
+        finally:
+            if progress is not None:
+                progress.finish()
+    
+    cache_key = summarization_cache._generate_cache_key(url_str)
+    return summarize_flights.do(cache_key, run, context=progress)
+
+# Background refreshes of summaries served stale
+summary_refresh_queue = RefreshQueue("summary", refresh_summary, workers=CACHE_REFRESH_CONCURRENCY,
+                                     max_size=CACHE_REFRESH_QUEUE_SIZE)
+
+def schedule_refresh(url: str) -> bool:
+    """Queue a background refresh of a summary that was served stale."""
+    return summary_refresh_queue.submit(url, summarization_cache._generate_cache_key(url))
+
+# Requests answered from an expired entry because refreshing it failed, and failures without one
+outage_stats = {'stale_served': 0, 'unavailable_errors': 0}
+
+def is_transient_error(e: Exception) -> bool:
+    """Whether a summarize failure may be temporary (anything but a 4xx answer from the paper's host)."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return True
+
+def serve_stale_or_raise(url: str, stale: CacheEntry | None, e: Exception) -> CacheEntry:
+    """
+    Fall back to the expired summary when refreshing it failed (stale-if-error).
+    
+    Transient failures qualify, including an upstream refused by its rate
+    limiter or circuit breaker, if the entry expired less than
+    CACHE_STALE_IF_ERROR_HOURS ago. Otherwise the error is raised as an
+    HTTPException (503 with Retry-After for a refused upstream or a saturated
+    parse pool).
+    """
+    stale_if_error_seconds = (summarization_cache.ttl_hours + summarization_cache.stale_if_error_hours) * 3600
+    if stale is not None and is_transient_error(e) and stale.age_seconds <= stale_if_error_seconds:
+        logger.warning("%s; serving stale summary for URL: %s", e, url)
+        outage_stats['stale_served'] += 1
+        return stale._replace(stale=True)
+    
+    status_code, detail = describe_summarize_error(e)
+    if not isinstance(e, (UpstreamUnavailable, ParsePoolSaturated)):
+        raise HTTPException(status_code=status_code, detail=detail)
+    outage_stats['unavailable_errors'] += 1
+    retry_after = max(1, round(e.retry_after)) if e.retry_after else None
+    raise HTTPException(status_code=status_code, detail=detail,
+                        headers={'Retry-After': str(retry_after)} if retry_after else None)
+
+async def summarize_sections(url: str, sections: Dict[str, str] | None, validators: Dict[str, Any],
+                             stale: CacheEntry | None = None, progress: SummaryProgress | None = None) -> Dict[str, Any]:
+    """
+    Build and cache the summary response for freshly fetched sections.
+    
+    Args:
+        url: Paper URL (cache key)
+        sections: Extracted sections including link, or None if upstream answered 304
+        validators: Validators of the fetch, including the section content hash
+        stale: The expired cache entry being refreshed, if any
+        progress: Stream the summary from the model, publishing the sections and chunks here
+        
+    Returns:
+        The summary response as a dict
+    """
+    if stale is not None:
+        revalidation_stats['revalidations'] += 1
+        stale_data, stale_validators = stale.data, stale.validators
+        if sections is None:
+            logger.debug("Upstream not modified, reusing summary for URL: %s", url)
+            revalidation_stats['not_modified'] += 1
+            revalidation_stats['llm_calls_saved'] += 1
+            summarization_cache.set(url, stale_data, validators)
+            return stale_data
+        if validators.get('content_hash') and validators['content_hash'] == stale_validators.get('content_hash'):
+            logger.debug("Content unchanged, reusing summary for URL: %s", url)
+            revalidation_stats['unchanged_content'] += 1
+            revalidation_stats['llm_calls_saved'] += 1
+            summarization_cache.set(url, stale_data, validators)
+            return stale_data
+        revalidation_stats['changed_content'] += 1
+    elif sections is None:
+        raise RuntimeError("Upstream answered 304 Not Modified without a cached entry")
+    
+    # Generate simplified summary using AI
+    section_texts = (sections['abstract'], sections['introduction'], sections['materials_methods'],
+                     sections['results'], sections['discussion'])
+    if progress is None:
+        simplified_summary = await generate_simplified_summary(*section_texts)
+    else:
+        progress.set_sections(sections)
+        async for text in stream_simplified_summary(*section_texts):
+            progress.add_chunk(text)
+        simplified_summary = "".join(progress.chunks).strip()
+    response_dict = SummarizeResponse(simplified_ai_version=simplified_summary, **sections).model_dump()
+    summarization_cache.set(url, response_dict, validators)
+    return response_dict
+
+@app.get("/summarize-get/stream")
+async def summarize_paper_stream(url: str):
+    """
+    Streaming variant of /summarize-get using Server-Sent Events.
+    
+    The extracted sections are sent as soon as the paper is fetched and parsed,
+    then the simplified summary is streamed as the model generates it.
+    Concurrent requests for the same paper (streamed or not) share one
+    summarization: a stream joining one started by another stream follows its
+    progress, otherwise it waits for the shared result and then sends it.
+    
+    Events:
+        sections: Title, link, abstract and section texts
+        token: A chunk of simplified_ai_version ({"text": ...})
+        done: The complete /summarize-get response (also cached)
+        error: Fetching or parsing failed ({"status_code": ..., "detail": ...})
+    """
+    from pydantic import ValidationError
+    try:
+        validated_url = str(HttpUrl(url))
+    except ValidationError:
+        raise HTTPException(status_code=422, detail="Invalid URL format")
+    
+    # A stale entry is streamed as is and refreshed in the background
+    entry = summarization_cache.lookup(validated_url)
+    if entry and entry.stale:
+        schedule_refresh(validated_url)
+    
+    async def event_stream():
+        if entry:
+            cached_response = entry.data
+            logger.debug("Streaming %s response for URL: %s", 'stale' if entry.stale else 'cached', url)
+            yield sse_event("sections", {k: v for k, v in cached_response.items() if k != 'simplified_ai_version'})
+            yield sse_event("token", {"text": cached_response.get('simplified_ai_version', '')})
+            yield sse_event("done", cached_response)
+            return
+        
+        # Start the summarization, or join the one in flight and follow it if it is streamed
+        flight = asyncio.ensure_future(summary_flight(validated_url, SummaryProgress()))
+        progress = summarize_flights.context(summarization_cache._generate_cache_key(validated_url))
+        sent_sections = sent_tokens = False
+        try:
+            if progress is not None:
+                async for event, data in progress.follow():
+                    sent_sections = True
+                    sent_tokens = sent_tokens or event == "token"
+                    yield sse_event(event, {"text": data} if event == "token" else data)
+            response_dict = (await flight).data
+        except Exception as e:
+            if isinstance(e, HTTPException):
+                status_code, detail = e.status_code, e.detail
+            else:
+                status_code, detail = describe_summarize_error(e)
+            yield sse_event("error", {"status_code": status_code, "detail": detail})
+            return
+        finally:
+            # A client that went away stops waiting; the shared work goes on
+            flight.cancel()
+        
+        # Reused or joined summaries arrive complete
+        if not sent_sections:
+            yield sse_event("sections", {k: v for k, v in response_dict.items() if k != 'simplified_ai_version'})
+        if not sent_tokens:
+            yield sse_event("token", {"text": response_dict.get('simplified_ai_version', '')})
+        yield sse_event("done", response_dict)
+    
+    status_headers = cache_status_headers(entry) if entry else {'X-Cache': 'MISS', 'Age': '0'}
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={**SSE_HEADERS, **status_headers})
+
+# Maximum concurrent non-PMC fetches per batch request
+BATCH_FETCH_CONCURRENCY = int(os.getenv('BATCH_FETCH_CONCURRENCY', '5'))
+
+@app.post("/summarize/batch")
+async def summarize_batch(request: BatchSummarizeRequest):
+    """
+    Summarize many papers in one request.
+    
+    Cached URLs are answered from the cache. PMC articles are fetched together
+    with multi-ID efetch requests (EUTILS_BATCH_SIZE IDs per round trip) and
+    parsed per article; other URLs, and PMC articles missing from the efetch
+    response, go through the regular /summarize-get path. One failing URL does
+    not fail the batch.
+    
+    Returns:
+        results: One entry per requested URL, in request order, with status
+            "ok" (and data) or "error" (and status_code/detail)
+        stats: Counts of cache hits, efetch round trips and failures
+    """
+    results, stats = await summarize_urls([str(url) for url in request.urls])
+    return {'results': results, 'stats': stats}
+
+async def summarize_urls(urls: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Summarize and cache a list of URLs, batching PMC fetches (see /summarize/batch).
+    
+    Returns:
+        Tuple of (per-URL results in order, with duplicates removed; batch statistics)
+    """
+    urls = list(dict.fromkeys(urls))
+    results: Dict[str, Dict[str, Any]] = {}
+    stats = {'requested': len(urls), 'cached': 0, 'efetch_requests': 0, 'pmc_batched': 0, 'fetched_individually': 0, 'failed': 0}
+    
+    def record_error(url: str, e: Exception) -> None:
+        if isinstance(e, HTTPException):
+            status_code, detail = e.status_code, e.detail
+        else:
+            status_code, detail = describe_summarize_error(e)
+        results[url] = {'url': url, 'status': 'error', 'status_code': status_code, 'detail': detail}
+        stats['failed'] += 1
+    
+    # Serve what we can from the cache, refreshing stale entries in the background
+    pending: List[str] = []
+    for url in urls:
+        entry = summarization_cache.lookup(url)
+        if entry:
+            results[url] = {'url': url, 'status': 'ok', 'cached': True, 'stale': entry.stale, 'data': entry.data}
+            stats['cached'] += 1
+            if entry.stale:
+                schedule_refresh(url)
+        else:
+            pending.append(url)
+    
+    # Group PMC articles into multi-ID efetch requests
+    ncbi_api_key = os.getenv('NCBI_API_KEY')
+    pmc_urls: Dict[str, List[str]] = {}
+    individual: List[str] = []
+    for url in pending:
+        # URL variants of the same article (PMC hosts, mapped PMIDs/DOIs) share one fetch and summary
+        pmc_id = identity_resolver.resolve(url).pmcid
+        if pmc_id and ncbi_api_key:
+            pmc_urls.setdefault(pmc_id, []).append(url)
+        else:
+            individual.append(url)
+    
+    if pmc_urls:
+        articles, stats['efetch_requests'] = await fetch_pmc_articles(list(pmc_urls), ncbi_api_key)
+        
+        async def summarize_article(article_urls: List[str], article_xml: bytes) -> None:
+            url = article_urls[0]
+            
+            async def run() -> CacheEntry:
+                stale = summarization_cache.get_stale(url)
+                try:
+                    # Batch work queues for a parse slot instead of being refused
+                    sections = {'link': url, **await parse_pmc_sections(article_xml, wait=True)}
+                    validators = {'source': 'eutils', 'content_hash': section_content_hash(sections)}
+                    response_dict = await summarize_sections(url, sections, validators, stale)
+                    return CacheEntry(response_dict, validators, 0.0, False)
+                except Exception as e:
+                    return serve_stale_or_raise(url, stale, e)
+            
+            try:
+                # Shared with concurrent requests for the same article (which may already be fetching it)
+                response_dict = (await summarize_flights.do(summarization_cache._generate_cache_key(url), run)).data
+                for article_url in article_urls:
+                    results[article_url] = {'url': article_url, 'status': 'ok', 'cached': False, 'data': response_dict}
+            except Exception as e:
+                for article_url in article_urls:
+                    record_error(article_url, e)
+        
+        batched = []
+        for pmc_id, pmc_id_urls in pmc_urls.items():
+            if pmc_id in articles:
+                batched.append(summarize_article(pmc_id_urls, articles[pmc_id]))
+            else:
+                # Missing from the efetch response: fall back to the single-URL path
+                individual.extend(pmc_id_urls)
+        stats['pmc_batched'] = sum(len(pmc_id_urls) for pmc_id, pmc_id_urls in pmc_urls.items() if pmc_id in articles)
+        # Concurrency is bounded by the LLM semaphore
+        await asyncio.gather(*batched)
+    
+    if individual:
+        fetch_semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+        
+        async def summarize_individually(url: str) -> None:
+            async with fetch_semaphore:
+                try:
+                    response_dict = await summarize_and_cache(HttpUrl(url))
+                    results[url] = {'url': url, 'status': 'ok', 'cached': False, 'data': response_dict}
+                except Exception as e:
+                    record_error(url, e)
+        
+        stats['fetched_individually'] = len(individual)
+        await asyncio.gather(*(summarize_individually(url) for url in individual))
+    
+    return [results[url] for url in urls], stats
+
 @app.get("/favicon.ico")
 async def favicon():
     """Favicon endpoint to prevent 404 errors."""
@@ -735,6 +2066,11 @@ async def summarize_options():
     """Handle preflight OPTIONS request for CORS."""
     return {}
 
+PAPERS_PATH = os.getenv('PAPERS_PATH', os.path.join(os.path.dirname(__file__), "../assets/papers.json"))
+
+# How often (seconds) to check papers.json for changes; 0 disables hot reload
+CORPUS_RELOAD_INTERVAL = float(os.getenv('CORPUS_RELOAD_INTERVAL', '5'))
+
 def load_papers() -> List[Dict[str, Any]]:
     """Load papers from local JSON file.
 
@@ -743,119 +2079,108 @@ def load_papers() -> List[Dict[str, Any]]:
     - Categorized: a top-level dict where each key is a category and the value is a list of paper objects.
 
     The function flattens either structure into a single List[Dict[str, Any]] so the API
-    can work with papers regardless of categories. If a paper item does not include a
-    'category' field, the loader will set it from the surrounding category (helpful for
-    downstream debugging), but the rest of the API will ignore categories.
+    can work with papers regardless of categories. Request handlers should use
+    ``corpus_manager.snapshot`` instead, which parses the file once and caches the result.
     """
     try:
-        papers_path = os.path.join(os.path.dirname(__file__), "../assets/papers.json")
-        with open(papers_path, "r", encoding="utf-8") as file:
+        with open(PAPERS_PATH, "r", encoding="utf-8") as file:
             data = json.load(file)
-
-        papers: List[Dict[str, Any]] = []
-
-        # Legacy format: top-level list of paper objects
-        if isinstance(data, list):
-            for item in data:
-                if isinstance(item, dict):
-                    papers.append(item)
-
-        # Categorized format: top-level dict mapping category -> list of papers
-        elif isinstance(data, dict):
-            for category, items in data.items():
-                if not isinstance(items, list):
-                    continue
-                for item in items:
-                    if isinstance(item, dict):
-                        # Preserve category on the item if not present; API will not depend on it.
-                        if "category" not in item:
-                            try:
-                                item["category"] = str(category)
-                            except Exception:
-                                pass
-                        papers.append(item)
-        else:
-            print("Warning: Unexpected papers.json structure — expected list or dict")
-
-        return papers
+        return flatten_papers(data)
     except FileNotFoundError:
-        print("Warning: papers.json file not found")
+        logger.warning("papers.json file not found")
         return []
     except json.JSONDecodeError as e:
-        print(f"Error parsing papers.json: {e}")
+        logger.error("Error parsing papers.json: %s", e)
         return []
     except Exception as e:
-        print(f"Error loading papers: {e}")
+        logger.error("Error loading papers: %s", e)
         return []
 
 def calculate_similarity(text1: str, text2: str) -> float:
     """Calculate similarity between two strings using SequenceMatcher."""
     return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
 
-def find_most_relevant_paper(query: str, papers: List[Dict[str, Any]]) -> tuple[Dict[str, Any], float]:
-    """Find the most relevant paper based on comprehensive string similarity matching."""
-    if not papers:
-        return None, 0.0
+# Retrieval engines available to /chat: the vectorized NumPy term matrix, the
+# BM25 inverted index and the legacy SequenceMatcher scorer (kept selectable for comparison)
+RETRIEVAL_ENGINES = ("numpy", "bm25", "sequence")
+DEFAULT_RETRIEVAL_ENGINE = os.getenv('RETRIEVAL_ENGINE', 'numpy').lower()
+if DEFAULT_RETRIEVAL_ENGINE not in RETRIEVAL_ENGINES:
+    logger.warning("Unknown RETRIEVAL_ENGINE '%s', falling back to 'numpy'", DEFAULT_RETRIEVAL_ENGINE)
+    DEFAULT_RETRIEVAL_ENGINE = "numpy"
+if DEFAULT_RETRIEVAL_ENGINE == "sequence":
+    # Every chat message ranks in the parse pool: the workers load the corpus when they start
+    parse_pool.corpus_path = PAPERS_PATH
+
+# Client payloads of the corpus served by /corpus, with the versions remembered for deltas
+corpus_feed_builder = CorpusFeedBuilder(response_encoder, max_versions=int(os.getenv('CORPUS_HISTORY_VERSIONS', '20')))
+
+# Parsed once and kept as an immutable snapshot; the search indexes and the
+# /corpus payloads are rebuilt together with each new snapshot when papers.json changes
+corpus_manager = CorpusManager(
+    PAPERS_PATH,
+    index_builders={"numpy": MatrixIndex, "bm25": BM25Index, "categories": CategoryIndex, "feed": corpus_feed_builder}
+)
+
+# Minimum retrieval score for a paper to count as relevant to a chat message
+CHAT_MIN_SCORE = 0.1
+# Maximum number of candidate papers passed to the model for a chat message
+CHAT_MAX_CANDIDATES = int(os.getenv('CHAT_MAX_CANDIDATES', '3'))
+
+async def retrieve_relevant_papers(query: str, engine: str, snapshot: CorpusSnapshot, top_k: int = 1) -> List[Tuple[Dict[str, Any], float]]:
+    """
+    Find the most relevant papers using the requested retrieval engine.
     
-    query_lower = query.lower().strip()
-    best_paper = None
-    best_score = 0.0
+    The index engines answer in well under a millisecond and run inline; the
+    "sequence" engine compares the query against every paper and runs in the parse pool.
+    The workers keep their own copy of the corpus per content version, so a job only
+    sends the query and the snapshot's content hash.
     
-    for paper in papers:
-        # Get paper content
-        title = paper.get('title', '').lower()
-        summary = paper.get('summary', '').lower()
-        keywords = [kw.lower() for kw in paper.get('keywords', [])]
-        
-        # Combine all text content for comprehensive matching
-        combined_text = f"{title} {summary} {' '.join(keywords)}"
-        
-        # Calculate primary similarity using SequenceMatcher
-        primary_score = SequenceMatcher(None, query_lower, combined_text).ratio()
-        
-        # Calculate individual field similarities
-        title_similarity = SequenceMatcher(None, query_lower, title).ratio()
-        summary_similarity = SequenceMatcher(None, query_lower, summary).ratio()
+    Args:
+        query: User query string
+        engine: One of RETRIEVAL_ENGINES
+        snapshot: Corpus snapshot to search
+        top_k: Maximum number of papers to return (the legacy "sequence" engine only returns one)
         
-        # Calculate keyword similarities
-        keyword_similarities = [
-            SequenceMatcher(None, query_lower, keyword).ratio() 
-            for keyword in keywords
-        ]
-        max_keyword_similarity = max(keyword_similarities) if keyword_similarities else 0.0
-        
-        # Calculate word-level matches for bonus scoring
-        query_words = set(query_lower.split())
-        paper_words = set(combined_text.split())
-        word_overlap = len(query_words.intersection(paper_words)) / len(query_words) if query_words else 0.0
-        
-        # Weighted final score combining different similarity measures
-        final_score = (
-            primary_score * 0.4 +           # Overall similarity: 40%
-            title_similarity * 0.25 +       # Title similarity: 25%
-            summary_similarity * 0.2 +      # Summary similarity: 20%
-            max_keyword_similarity * 0.1 +  # Best keyword match: 10%
-            word_overlap * 0.05            # Word overlap bonus: 5%
-        )
+    Returns:
+        List of (paper, score) tuples, best first
         
-        if final_score > best_score:
-            best_score = final_score
-            best_paper = paper
-    
-    return best_paper, best_score
+    Raises:
+        ParsePoolSaturated: The "sequence" engine was requested and the parse pool is saturated
+    """
+    with stage_seconds.time("retrieval"):
+        if engine == "sequence":
+            if not snapshot.papers:
+                return []
+            result = None
+            if parse_pool.enabled:
+                result = await parse_pool.run(find_most_relevant_in_corpus, query, corpus_manager.path,
+                                              snapshot.content_hash)
+            if result is None:
+                # Ranked inline, or papers.json changed after this snapshot: the snapshot's papers are sent along
+                result = await parse_pool.run(find_most_relevant_paper, query, snapshot.papers)
+            paper, score = result
+            return [(paper, score)] if paper else []
+        return snapshot.indexes[engine].search(query, top_k=top_k)
 
-async def generate_conversational_response(user_query: str, paper_summary: str, paper_title: str) -> str:
-    """Generate conversational AI response based on user query and paper content."""
-    if not ai_model:
-        return f"Based on your question about '{user_query}', I found this relevant research: {paper_summary}"
+def build_conversational_prompt(user_query: str, paper_summary: str, paper_title: str,
+                                related_papers: List[Dict[str, Any]] | None = None) -> str:
+    """Build the chat prompt anchored on the best-matching paper."""
+    related_text = ""
+    if related_papers:
+        related_lines = [
+            f'- "{paper.get("title", "Unknown Title")}": {paper.get("summary", "")}'
+            for paper in related_papers
+        ]
+        related_text = "Other related papers:\n" + "\n".join(related_lines)
     
-    try:
-        prompt = f"""
+    return f"""
         User asked: "{user_query}"
         
         Based on this research paper: "{paper_title}"
         Summary: {paper_summary}
         
+        {related_text}
+        
         Please provide a conversational response that:
         1. Directly addresses the user's question
         2. Uses the paper's findings to answer their query
@@ -865,9 +2190,22 @@ async def generate_conversational_response(user_query: str, paper_summary: str,
         
         Answer in simple conversational language as if you're having a friendly chat about science.
         """
+
+async def generate_conversational_response(user_query: str, paper_summary: str, paper_title: str,
+                                           related_papers: List[Dict[str, Any]] | None = None) -> str:
+    """Generate conversational AI response based on user query and paper content.
+    
+    ``related_papers`` are further candidate papers from retrieval; the model may
+    draw on them, but the answer is anchored on the best-matching paper.
+    """
+    if not ai_model:
+        return f"Based on your question about '{user_query}', I found this relevant research: {paper_summary}"
+    
+    try:
+        prompt = build_conversational_prompt(user_query, paper_summary, paper_title, related_papers)
         
         # Generate content using AI
-        response = ai_model.generate_content(prompt)
+        response = await generate_model_content(prompt)
         
         if response and hasattr(response, 'text') and response.text:
             return response.text.strip()
@@ -876,63 +2214,459 @@ async def generate_conversational_response(user_query: str, paper_summary: str,
             return f"Based on your question about '{user_query}', I found this relevant research: {paper_summary}"
             
     except Exception as e:
-        print(f"Error generating conversational response: {e}")
+        logger.error("Error generating conversational response: %s", e)
         # Fallback response
         return f"Based on your question about '{user_query}', I found this relevant research: {paper_summary}"
 
+async def stream_conversational_response(user_query: str, paper_summary: str, paper_title: str,
+                                         related_papers: List[Dict[str, Any]] | None = None) -> AsyncIterator[str]:
+    """Stream a conversational response chunk by chunk, with the same fallbacks as generate_conversational_response."""
+    fallback = f"Based on your question about '{user_query}', I found this relevant research: {paper_summary}"
+    if not ai_model:
+        yield fallback
+        return
+    
+    produced = False
+    try:
+        prompt = build_conversational_prompt(user_query, paper_summary, paper_title, related_papers)
+        async for text in stream_model_content(prompt):
+            produced = True
+            yield text
+        if not produced:
+            yield fallback
+    except Exception as e:
+        logger.error("Error streaming conversational response: %s", e)
+        if not produced:
+            yield fallback
+
+async def answer_chat_message(message: str, engine: str) -> Dict[str, Any]:
+    """
+    Retrieve relevant papers for a chat message and generate the response.
+    
+    Args:
+        message: User query string
+        engine: One of RETRIEVAL_ENGINES
+        
+    Returns:
+        Chat response payload
+    """
+    candidates, fallback_response = await select_chat_candidates(message, engine)
+    if fallback_response:
+        return {"response": fallback_response, "link": None, "engine": engine}
+    
+    relevant_paper = candidates[0][0]
+    related_papers = [paper for paper, _ in candidates[1:]]
+    
+    # Extract paper details
+    paper_title = relevant_paper.get('title', 'Unknown Title')
+    paper_summary = relevant_paper.get('summary', 'No summary available')
+    
+    # Generate AI-powered conversational response
+    ai_response = await generate_conversational_response(message, paper_summary, paper_title, related_papers)
+    
+    return {
+        "response": ai_response,
+        **chat_paper_links(candidates),
+        "engine": engine
+    }
+
+async def select_chat_candidates(message: str, engine: str) -> Tuple[List[Tuple[Dict[str, Any], float]], str | None]:
+    """
+    Pick the candidate papers for a chat message.
+    
+    Returns:
+        Tuple of (candidates best first, fallback response). The fallback
+        response is set when the corpus is empty or nothing is relevant enough.
+    """
+    # Use one snapshot for the whole request, even if a reload happens meanwhile
+    snapshot = corpus_manager.snapshot
+    
+    if not snapshot.papers:
+        return [], "I'm sorry, but I couldn't load the research papers database. Please try again later."
+    
+    # Find the most relevant papers using the selected retrieval engine
+    candidates = [
+        (paper, score)
+        for paper, score in await retrieve_relevant_papers(message, engine, snapshot, top_k=CHAT_MAX_CANDIDATES)
+        if score >= CHAT_MIN_SCORE
+    ]
+    
+    # Check if we found a good match (minimum threshold)
+    if not candidates:
+        return [], "Hmm, I couldn't find any papers that closely match your query. Could you try asking about topics like bone loss in space, stem cell research in microgravity, or how space affects mice? I have research papers on these space biology topics!"
+    
+    return candidates, None
+
+def chat_paper_links(candidates: List[Tuple[Dict[str, Any], float]]) -> Dict[str, Any]:
+    """Link to the best paper plus the other candidates, as returned by /chat."""
+    return {
+        "link": candidates[0][0].get('link', ''),
+        "related": [
+            {"title": paper.get('title', ''), "link": paper.get('link', ''), "score": round(score, 4)}
+            for paper, score in candidates[1:]
+        ]
+    }
+
+def validate_chat_request(message: str, engine: str | None) -> str:
+    """Validate chat parameters and return the engine to use."""
+    if not message or not message.strip():
+        raise HTTPException(status_code=422, detail="Message parameter is required and cannot be empty")
+    
+    engine = (engine or DEFAULT_RETRIEVAL_ENGINE).lower()
+    if engine not in RETRIEVAL_ENGINES:
+        raise HTTPException(status_code=422, detail=f"Unknown retrieval engine '{engine}'. Available engines: {', '.join(RETRIEVAL_ENGINES)}")
+    return engine
+
 @app.get("/chat")
-async def chat_endpoint(message: str):
+async def chat_endpoint(message: str, engine: str | None = None):
     """
     Chat endpoint that finds the most relevant paper and generates AI-powered conversational responses.
     
+    Concurrent requests with the same message and engine share one retrieval and model call.
+    
     Args:
         message: User query string
+        engine: Optional retrieval engine override ("numpy", "bm25" or "sequence")
         
     Returns:
-        JSON response with AI-generated conversational response and link to most relevant paper
+        JSON response with AI-generated conversational response, link to most relevant paper
+        and the retrieval engine that served the request
     """
     try:
-        if not message or not message.strip():
-            raise HTTPException(status_code=422, detail="Message parameter is required and cannot be empty")
-        
-        # Load papers from JSON file
-        papers = load_papers()
-        
-        if not papers:
-            return {
-                "response": "I'm sorry, but I couldn't load the research papers database. Please try again later.",
-                "link": None
-            }
+        engine = validate_chat_request(message, engine)
         
-        # Find the most relevant paper using enhanced similarity matching
-        relevant_paper, similarity_score = find_most_relevant_paper(message, papers)
+        flight_key = hashlib.md5(f"{engine}:{' '.join(message.lower().split())}".encode('utf-8')).hexdigest()
+        return await chat_flights.do(flight_key, lambda: answer_chat_message(message, engine))
         
-        # Check if we found a good match (minimum threshold)
-        if not relevant_paper or similarity_score < 0.1:
-            return {
-                "response": "Hmm, I couldn't find any papers that closely match your query. Could you try asking about topics like bone loss in space, stem cell research in microgravity, or how space affects mice? I have research papers on these space biology topics!",
-                "link": None
-            }
+    except HTTPException:
+        raise
+    except ParsePoolSaturated as e:
+        raise HTTPException(status_code=503, detail=f"Server busy: {str(e)}",
+                            headers={'Retry-After': str(max(1, round(e.retry_after)))})
+    except Exception as e:
+        logger.error("Error in chat endpoint: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.get("/chat/stream")
+async def chat_stream_endpoint(message: str, engine: str | None = None):
+    """
+    Streaming variant of /chat using Server-Sent Events.
+    
+    Events:
+        papers: Link to the most relevant paper, related candidates and engine
+        token: A chunk of the answer as it is generated ({"text": ...})
+        done: The complete /chat response
+        error: Processing failed ({"detail": ...})
+    """
+    engine = validate_chat_request(message, engine)
+    
+    async def event_stream():
+        try:
+            candidates, fallback_response = await select_chat_candidates(message, engine)
+            if fallback_response:
+                response = {"response": fallback_response, "link": None, "engine": engine}
+                yield sse_event("papers", {"link": None, "related": [], "engine": engine})
+                yield sse_event("token", {"text": fallback_response})
+                yield sse_event("done", response)
+                return
+            
+            links = chat_paper_links(candidates)
+            yield sse_event("papers", {**links, "engine": engine})
+            
+            relevant_paper = candidates[0][0]
+            chunks = []
+            async for text in stream_conversational_response(
+                message,
+                relevant_paper.get('summary', 'No summary available'),
+                relevant_paper.get('title', 'Unknown Title'),
+                [paper for paper, _ in candidates[1:]]
+            ):
+                chunks.append(text)
+                yield sse_event("token", {"text": text})
+            
+            yield sse_event("done", {"response": "".join(chunks).strip(), **links, "engine": engine})
+        except Exception as e:
+            logger.error("Error in chat stream: %s", e)
+            yield sse_event("error", {"detail": f"Internal server error: {str(e)}"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# Search endpoint limits
+SEARCH_DEFAULT_TOP_K = 100
+SEARCH_MAX_TOP_K = 1000
+SEARCH_DEFAULT_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+def _search_fingerprint(q: str, category: str | None, top_k: int, engine: str) -> str:
+    """Short hash identifying a search so cursors cannot be replayed against another query."""
+    raw = json.dumps([q, category, top_k, engine])
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()[:12]
+
+def _encode_search_cursor(version: int, offset: int, fingerprint: str) -> str:
+    """Encode an opaque pagination cursor."""
+    raw = json.dumps({"v": version, "o": offset, "f": fingerprint}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_search_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a pagination cursor, raising 400 if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return {"v": int(data["v"]), "o": int(data["o"]), "f": str(data["f"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _paper_result(paper: Dict[str, Any], score: float | None) -> Dict[str, Any]:
+    """Shape a paper for search results."""
+    return {
+        "id": paper.get('id'),
+        "title": paper.get('title', ''),
+        "summary": paper.get('summary', ''),
+        "keywords": paper.get('keywords', []),
+        "link": paper.get('link', ''),
+        "category": paper.get('category'),
+        "score": round(score, 4) if score is not None else None
+    }
+
+@app.get("/search")
+async def search_papers(
+    q: str = "",
+    category: str | None = None,
+    k: int = SEARCH_DEFAULT_TOP_K,
+    limit: int = SEARCH_DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    engine: str | None = None
+):
+    """
+    Search the paper corpus with ranked, paginated results.
+    
+    Args:
+        q: Free-text query; when empty, papers are listed in corpus order
+        category: Optional category filter
+        k: Number of top-ranked papers to consider (ignored when q is empty)
+        limit: Page size
+        cursor: Opaque cursor from a previous page's next_cursor
+        engine: Optional retrieval engine override ("numpy" or "bm25"; "sequence"
+            searches with "numpy")
         
-        # Extract paper details
-        paper_title = relevant_paper.get('title', 'Unknown Title')
-        paper_summary = relevant_paper.get('summary', 'No summary available')
-        paper_link = relevant_paper.get('link', '')
+    Returns:
+        JSON response with the engine used, one page of results, category facets, the
+        total number of results and a cursor for the next page (null on the last page)
+    """
+    try:
+        # The legacy "sequence" scorer only finds a single best paper, so it cannot rank;
+        # whether requested or configured as the default, "numpy" ranks instead
+        engine = (engine or DEFAULT_RETRIEVAL_ENGINE).lower()
+        if engine == "sequence":
+            engine = "numpy"
+        if engine not in ("numpy", "bm25"):
+            raise HTTPException(status_code=422, detail=f"Unknown retrieval engine '{engine}'. Available engines: numpy, bm25")
+        if not 1 <= k <= SEARCH_MAX_TOP_K:
+            raise HTTPException(status_code=422, detail=f"k must be between 1 and {SEARCH_MAX_TOP_K}")
+        if not 1 <= limit <= SEARCH_MAX_PAGE_SIZE:
+            raise HTTPException(status_code=422, detail=f"limit must be between 1 and {SEARCH_MAX_PAGE_SIZE}")
+        
+        q = q.strip()
+        snapshot = corpus_manager.snapshot
+        fingerprint = _search_fingerprint(q, category, k, engine)
+        
+        offset = 0
+        if cursor:
+            cursor_data = _decode_search_cursor(cursor)
+            if cursor_data["f"] != fingerprint:
+                raise HTTPException(status_code=400, detail="Cursor does not belong to this search")
+            if cursor_data["v"] != snapshot.version:
+                raise HTTPException(status_code=409, detail="The paper corpus changed since this search started; please restart the search")
+            offset = max(cursor_data["o"], 0)
+        
+        if q:
+            with stage_seconds.time("retrieval"):
+                hits: List[Tuple[Dict[str, Any], float | None]] = snapshot.indexes[engine].search(q, top_k=k)
+            facets: Dict[str, int] = {}
+            for paper, _ in hits:
+                paper_category = str(paper.get('category') or 'Uncategorized')
+                facets[paper_category] = facets.get(paper_category, 0) + 1
+            if category:
+                hits = [(paper, score) for paper, score in hits if str(paper.get('category') or 'Uncategorized') == category]
+        else:
+            category_index = snapshot.indexes["categories"]
+            facets = category_index.counts()
+            if category:
+                hits = [(snapshot.papers[doc_id], None) for doc_id in category_index.doc_ids.get(category, [])]
+            else:
+                hits = [(paper, None) for paper in snapshot.papers]
         
-        # Generate AI-powered conversational response
-        ai_response = await generate_conversational_response(message, paper_summary, paper_title)
+        page = hits[offset:offset + limit]
+        next_offset = offset + len(page)
+        next_cursor = _encode_search_cursor(snapshot.version, next_offset, fingerprint) if next_offset < len(hits) else None
         
         return {
-            "response": ai_response,
-            "link": paper_link
+            "query": q,
+            "engine": engine,
+            "snapshot_version": snapshot.version,
+            "total": len(hits),
+            "results": [_paper_result(paper, score) for paper, score in page],
+            "facets": {"category": facets},
+            "next_cursor": next_cursor
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in chat endpoint: {e}")
+        logger.error("Error in search endpoint: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.get("/corpus")
+async def get_corpus(request: Request, category: str | None = None, since: str | None = None):
+    """
+    The paper corpus from the in-memory snapshot, in the papers.json layout.
+    
+    Payloads are precompressed when the snapshot is built and carry a strong
+    ETag; If-None-Match gets 304 Not Modified. The X-Corpus-Version header
+    and the version field hold the content version of the corpus.
+    
+    Args:
+        category: Only the papers of this category
+        since: A version the client has; only papers added or changed since
+            then are returned, with the keys (ids) of removed papers. If the
+            version is no longer known, the full payload is returned (delta: false).
+        
+    Returns:
+        Full or category payload: version, delta (false), paper_count and
+        papers (category -> papers); delta payload: version, delta (true),
+        since, changed (category -> papers) and removed
+    """
+    feed = corpus_manager.snapshot.indexes["feed"]
+    if category is not None and category not in feed.slices:
+        raise HTTPException(status_code=404, detail=f"Unknown category '{category}'. Available categories: {', '.join(feed.categories)}")
+    
+    payload = feed.delta(since, category) if since else None
+    if payload is None:
+        payload = feed.slices[category] if category is not None else feed.full
+    return response_encoder.response(payload, request.headers, {'X-Corpus-Version': feed.version})
+
+@app.get("/corpus/stats")
+async def get_corpus_stats():
+    """
+    Get paper corpus statistics.
+    
+    Returns:
+        JSON response with the snapshot version, paper count, load time
+        and last reload time of the in-memory paper corpus, and the
+        /corpus content versions remembered for deltas
+    """
+    try:
+        return {"corpus_stats": corpus_manager.get_stats(), "feed": corpus_feed_builder.get_stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving corpus stats: {str(e)}")
+
+# Background corpus ingestion (see ingest.py); progress is checkpointed so runs resume
+INGEST_CHECKPOINT_PATH = os.getenv('INGEST_CHECKPOINT_PATH', os.path.join(os.path.dirname(__file__), "ingest_checkpoint.jsonl"))
+corpus_ingestor = CorpusIngestor(
+    summarize_urls,
+    checkpoint_path=INGEST_CHECKPOINT_PATH,
+    workers=int(os.getenv('INGEST_WORKERS', '4')),
+    batch_size=EUTILS_BATCH_SIZE
+)
+
+@app.post("/ingest/start")
+async def start_ingestion(limit: int | None = None, workers: int | None = None):
+    """
+    Start pre-summarizing every paper in the corpus in the background.
+    
+    Args:
+        limit: Process at most this many papers in this run
+        workers: Override the number of concurrent batches (INGEST_WORKERS)
+        
+    Returns:
+        JSON response with the initial ingestion statistics
+    """
+    if corpus_ingestor.running:
+        raise HTTPException(status_code=409, detail="Ingestion is already running")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=422, detail="limit must be at least 1")
+    if workers is not None:
+        if workers < 1:
+            raise HTTPException(status_code=422, detail="workers must be at least 1")
+        corpus_ingestor.workers = workers
+    
+    corpus_ingestor.start(corpus_links(corpus_manager.snapshot.papers), limit=limit)
+    return {"message": "Ingestion started", "ingest_stats": corpus_ingestor.get_stats()}
+
+@app.get("/ingest/status")
+async def get_ingestion_status():
+    """Get progress of the current (or last) corpus ingestion run."""
+    return {"ingest_stats": corpus_ingestor.get_stats()}
+
+@app.get("/identity/resolve")
+async def resolve_identity(url: str):
+    """
+    Resolve a paper URL to its canonical article ID.
+
+    Args:
+        url: Any URL form of a paper (PMC, PubMed, DOI or publisher page)
+
+    Returns:
+        JSON response with the canonical ID, the known PMC ID, PMID and DOI,
+        and whether the paper is fetched through E-utilities
+    """
+    identity = identity_resolver.resolve(url)
+    return {
+        "url": url,
+        "canonical_id": identity.canonical,
+        "pmcid": identity.pmcid,
+        "pmid": identity.pmid,
+        "doi": identity.doi,
+        "eutils": bool(identity.pmcid and os.getenv('NCBI_API_KEY')),
+    }
+
+@app.post("/identity/populate")
+async def populate_identity(limit: int | None = None):
+    """
+    Bulk-load PMID/DOI mappings for the corpus papers from the NCBI ID converter.
+
+    Args:
+        limit: Convert at most this many corpus IDs
+
+    Returns:
+        JSON response with the converter request statistics and mapping table size
+    """
+    ids = identity_resolver.converter_ids(corpus_links(corpus_manager.snapshot.papers))
+    if limit is not None:
+        if limit < 1:
+            raise HTTPException(status_code=422, detail="limit must be at least 1")
+        ids = ids[:limit]
+    populate_stats = await populate_identity_table(ids)
+    return {"populate_stats": populate_stats, "identity_stats": identity_resolver.get_stats()}
+
+@app.get("/upstream/stats")
+async def get_upstream_stats():
+    """
+    Get upstream HTTP connection pool statistics.
+    
+    Returns:
+        JSON response with pool limits, open/idle connections, utilization,
+        per-host request counters, AI model call concurrency, parse pool
+        load, and the rate limiter, retry and circuit breaker state of NCBI and Gemini
+    """
+    try:
+        return {
+            "http_pool": http_pool.get_stats(),
+            "parse_pool": parse_pool.get_stats(),
+            "llm": {
+                **llm_stats,
+                "max_concurrency": LLM_MAX_CONCURRENCY,
+                "timeout_seconds": LLM_TIMEOUT
+            },
+            "resilience": {
+                "ncbi": ncbi_upstream.get_stats(),
+                "gemini": gemini_upstream.get_stats(),
+                "outages": outage_stats
+            }
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving upstream stats: {str(e)}")
+
 @app.get("/cache/stats")
 async def get_cache_stats():
     """
@@ -940,17 +2674,29 @@ async def get_cache_stats():
     
     Returns:
         JSON response with cache statistics including total entries, 
-        expired entries, active entries, and TTL configuration
+        expired entries, active entries, TTL and size budgets, and
+        hit/miss/eviction/byte counters
     """
     try:
         # Clean up expired entries first
         summarization_cache.clear_expired()
+        if llm_cache is not None:
+            llm_cache.clear_expired()
         
         # Get current stats
         stats = summarization_cache.get_cache_stats()
         
         return {
             "cache_stats": stats,
+            "coalescing": {
+                "summarize": summarize_flights.get_stats(),
+                "chat": chat_flights.get_stats()
+            },
+            "revalidation": revalidation_stats,
+            "refresh": summary_refresh_queue.get_stats(),
+            "llm_cache": llm_cache.get_cache_stats() if llm_cache is not None else None,
+            "identity": identity_resolver.get_stats(),
+            "compression": response_encoder.get_stats(),
             "message": f"Cache contains {stats['active_entries']} active entries out of {stats['total_entries']} total entries"
         }
         
@@ -967,6 +2713,8 @@ async def clear_expired_cache():
     """
     try:
         cleared_count = summarization_cache.clear_expired()
+        if llm_cache is not None:
+            cleared_count += llm_cache.clear_expired()
         
         return {
             "message": f"Successfully cleared {cleared_count} expired cache entries",
@@ -977,6 +2725,121 @@ async def clear_expired_cache():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing cache: {str(e)}")
 
+# Metrics read from the existing statistics at scrape time, so the hot path is unchanged
+BREAKER_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+CACHES = {'summary': summarization_cache, 'llm': llm_cache}
+FLIGHTS = {'summarize': summarize_flights, 'chat': chat_flights}
+UPSTREAMS = {'ncbi': ncbi_upstream, 'gemini': gemini_upstream}
+
+def cache_counter(attribute: str) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    """
+    Metric callback reading one counter from each configured cache.
+    
+    The LLM cache is skipped when it is disabled, so its series are absent
+    rather than reported as zero.
+    """
+    return lambda: {(name,): getattr(cache, attribute) for name, cache in CACHES.items() if cache is not None}
+
+metrics_registry.counter_callback("cache_hits_total", "Fresh cache hits", cache_counter('hits'), ["cache"])
+metrics_registry.counter_callback("cache_stale_hits_total", "Stale cache entries served", cache_counter('stale_hits'), ["cache"])
+metrics_registry.counter_callback("cache_misses_total", "Cache misses", cache_counter('misses'), ["cache"])
+metrics_registry.gauge_callback(
+    "cache_hit_ratio", "Share of cache lookups answered from the cache (fresh or stale)",
+    lambda: {(name,): cache.hit_ratio for name, cache in CACHES.items() if cache is not None}, ["cache"]
+)
+metrics_registry.gauge_callback(
+    "coalescing_in_flight", "Distinct computations in flight",
+    lambda: {(name,): flights.get_stats()['in_flight'] for name, flights in FLIGHTS.items()}, ["work"]
+)
+metrics_registry.counter_callback(
+    "coalesced_requests_total", "Requests that joined an in-flight computation",
+    lambda: {(name,): flights.coalesced for name, flights in FLIGHTS.items()}, ["work"]
+)
+metrics_registry.gauge_callback("llm_calls_active", "Model calls in progress", lambda: llm_stats['active'])
+metrics_registry.gauge_callback("llm_calls_waiting", "Model calls waiting for a concurrency slot", lambda: llm_stats['waiting'])
+metrics_registry.counter_callback(
+    "llm_call_errors_total", "Failed model calls by kind",
+    lambda: {('timeout',): llm_stats['timeouts'], ('error',): llm_stats['errors']}, ["kind"]
+)
+metrics_registry.gauge_callback("parse_pool_pending", "Parse jobs running or queued in the worker processes",
+                                lambda: parse_pool.get_stats()['pending'])
+metrics_registry.gauge_callback("parse_pool_waiting", "Batch parse jobs waiting for a pool slot",
+                                lambda: parse_pool.get_stats()['waiting'])
+metrics_registry.counter_callback(
+    "parse_jobs_total", "Parse jobs by where they ran (pool or inline) and jobs refused as the pool was saturated",
+    lambda: {('pool',): parse_pool.submitted, ('inline',): parse_pool.inline, ('rejected',): parse_pool.rejected}, ["mode"]
+)
+metrics_registry.counter_callback(
+    "responses_compressed_total", "Responses sent compressed, from a stored payload (cached) or compressed per request (dynamic)",
+    lambda: {key: count for key, count in response_encoder.compressed.items()}, ["encoding", "source"]
+)
+metrics_registry.counter_callback("responses_compression_saved_bytes_total", "Response bytes saved by compression",
+                                  lambda: response_encoder.bytes_saved)
+metrics_registry.counter_callback("responses_not_modified_total", "Requests answered 304 Not Modified (If-None-Match)",
+                                  lambda: response_encoder.not_modified)
+metrics_registry.gauge_callback("refresh_queue_pending", "Background summary refreshes queued or running",
+                                lambda: summary_refresh_queue.get_stats()['pending'])
+metrics_registry.counter_callback(
+    "upstream_calls_total", "Calls to each upstream API", lambda: {(name,): upstream.calls for name, upstream in UPSTREAMS.items()}, ["upstream"]
+)
+metrics_registry.counter_callback(
+    "upstream_attempts_total", "Attempts sent to each upstream API, including retries",
+    lambda: {(name,): upstream.attempts for name, upstream in UPSTREAMS.items()}, ["upstream"]
+)
+metrics_registry.counter_callback(
+    "upstream_failures_total", "Attempts that failed with a retriable status, transport error or timeout",
+    lambda: {(name,): upstream.failures for name, upstream in UPSTREAMS.items()}, ["upstream"]
+)
+metrics_registry.counter_callback(
+    "upstream_rejected_total", "Calls refused by the rate limiter or an open circuit breaker",
+    lambda: {(name, reason): count for name, upstream in UPSTREAMS.items()
+             for reason, count in (('rate_limited', upstream.limiter.rejected), ('circuit_open', upstream.breaker.rejected))},
+    ["upstream", "reason"]
+)
+metrics_registry.gauge_callback(
+    "upstream_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    lambda: {(name,): BREAKER_STATE_VALUES[upstream.breaker.state] for name, upstream in UPSTREAMS.items()}, ["upstream"]
+)
+
+def upstream_host_counts(field: str) -> Dict[Tuple[str], int]:
+    """
+    Per-host pool counts, with hosts outside the known set summed as "other".
+    
+    Hosts come from user-supplied URLs, so only known hosts get a label of
+    their own. Known hosts are never dropped from the pool and dropped hosts'
+    counts move to evicted_hosts, so every series only grows.
+    """
+    stats = http_pool.get_stats()
+    counts = {("other",): stats['evicted_hosts'][field]}
+    for host, host_stats in stats['hosts'].items():
+        label = (host if host in http_pool.known_hosts else "other",)
+        counts[label] = counts.get(label, 0) + host_stats[field]
+    return counts
+
+metrics_registry.counter_callback(
+    "upstream_host_requests_total", "Requests through the shared HTTP pool by host ('other' for unknown hosts)",
+    lambda: upstream_host_counts('requests'), ["host"]
+)
+metrics_registry.counter_callback(
+    "upstream_host_errors_total", "Failed requests through the shared HTTP pool by host ('other' for unknown hosts)",
+    lambda: upstream_host_counts('errors'), ["host"]
+)
+metrics_registry.counter_callback(
+    "log_records_dropped_total", "Log records dropped because the logging queue was full",
+    lambda: logging_state.handler.dropped
+)
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics in the text exposition format.
+    
+    Returns:
+        Per-route request counts and latency histograms, per-stage timings,
+        cache hit ratios, in-flight work and upstream error counters
+    """
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
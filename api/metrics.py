@@ -0,0 +1,275 @@
+"""
+Prometheus-style metrics without extra dependencies.
+
+``MetricsRegistry`` holds counters and histograms updated on the hot path
+(a dict lookup and an addition per update) and callback metrics that read
+existing statistics (cache counters, in-flight work, upstream errors) only
+when ``/metrics`` is scraped. ``render()`` produces the Prometheus text
+exposition format (version 0.0.4).
+
+``MetricsMiddleware`` is a plain ASGI middleware recording request counts,
+latency and in-flight requests per route template, and ``Histogram.time()``
+times a stage of a request::
+
+    with stage_seconds.time("fetch"):
+        response = await http_pool.get(url)
+"""
+import logging
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Default latency buckets in seconds, from cache hits to slow model calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger("astrolens.metrics")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) - amount
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labelvalues, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramValues:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labelvalues', 'start')
+
+    def __init__(self, histogram: "Histogram", labelvalues: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], _HistogramValues] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        values = self._values.get(labelvalues)
+        if values is None:
+            values = self._values[labelvalues] = _HistogramValues(len(self.buckets) + 1)
+        # Per-bucket counts; cumulated when rendered
+        values.counts[bisect_left(self.buckets, value)] += 1
+        values.sum += value
+        values.count += 1
+
+    def time(self, *labelvalues: str) -> _Timer:
+        """Context manager observing the wall time of its block."""
+        return _Timer(self, labelvalues)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, values in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(values.sum)}")
+            lines.append(f"{self.name}_count{labels} {values.count}")
+        return lines
+
+
+class CallbackMetric:
+    """A gauge or counter whose samples are read from existing statistics at scrape time."""
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Iterable[str],
+                 callback: Callable[[], float | Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        samples = self.callback()
+        if not isinstance(samples, dict):
+            samples = {(): samples}
+        for labelvalues, value in sorted(samples.items()):
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = ""):
+        """
+        Args:
+            namespace: Prefix added to every metric name
+        """
+        self.namespace = namespace
+        self._metrics: List[Any] = []
+        self.scrape_errors = 0
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(self._name(name), documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        metric = Gauge(self._name(name), documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(self._name(name), documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge_callback(self, name: str, documentation: str, callback: Callable[[], Any],
+                       labelnames: Iterable[str] = ()) -> CallbackMetric:
+        metric = CallbackMetric(self._name(name), documentation, "gauge", labelnames, callback)
+        self._metrics.append(metric)
+        return metric
+
+    def counter_callback(self, name: str, documentation: str, callback: Callable[[], Any],
+                         labelnames: Iterable[str] = ()) -> CallbackMetric:
+        metric = CallbackMetric(self._name(name), documentation, "counter", labelnames, callback)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format. A failing callback only drops its own metric."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.collect())
+            except Exception as e:
+                self.scrape_errors += 1
+                logger.error("Error collecting metric %s: %s", metric.name, e)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request counts, latency and in-flight requests.
+
+    Routes are labelled by their path template (e.g. ``/summarize-get``), so
+    query strings and path parameters do not create new series; requests
+    that match no route are labelled ``unmatched``. Latency runs until the
+    response body is complete, including streamed responses.
+    """
+
+    def __init__(self, app, requests: Counter, latency: Histogram, in_flight: Gauge,
+                 excluded_paths: Iterable[str] = ()):
+        """
+        Args:
+            app: ASGI application
+            requests: Counter labelled (route, method, status)
+            latency: Histogram labelled (route, method)
+            in_flight: Unlabelled gauge of requests being served
+            excluded_paths: Paths not recorded (e.g. the metrics endpoint itself)
+        """
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+        self.in_flight = in_flight
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            self.requests.inc(path, method, str(status_code))
+            self.latency.observe(time.perf_counter() - start, path, method)
@@ -0,0 +1,217 @@
+"""
+Process pool for CPU-bound parsing (PMC XML, publisher HTML, sequence ranking).
+
+Parsing a large article takes tens of milliseconds of pure Python/lxml work,
+and the SequenceMatcher chat engine seconds; run on the event loop, either
+blocks every other request. ``ParsePool`` runs such jobs in worker processes
+instead. Jobs are module-level functions taking bytes or plain data and
+returning plain dicts, so only the raw document crosses the process boundary.
+
+Workers are spawned (not forked: the app has threads running) and pre-warmed
+when the pool starts: each imports the parsers and parses a tiny document, so
+the first real request does not pay for the imports. Given a ``corpus_path``,
+each worker also loads the paper corpus for the sequence engine
+(``retrieval.find_most_relevant_in_corpus``), so ranking jobs need not carry it. Documents smaller than
+``inline_max_bytes`` are parsed on the event loop, where that is cheaper than
+the round trip to a worker.
+
+At most ``max_pending`` jobs are submitted to the pool at a time (running and
+queued in the executor). Beyond that, interactive callers get
+``ParsePoolSaturated`` (served as 503 with Retry-After), while batch callers
+may ``wait`` for a slot.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger("astrolens.parse_pool")
+
+WARMUP_XML = (
+    b'<article><front><article-meta><title-group><article-title>Warm-up</article-title></title-group>'
+    b'<abstract><p>Warm-up abstract.</p></abstract></article-meta></front>'
+    b'<body><sec><title>Introduction</title><p>Warm-up paragraph.</p></sec></body></article>'
+)
+WARMUP_HTML = b'<html><head><title>Warm-up</title></head><body><p>Introduction: warm-up paragraph.</p></body></html>'
+
+
+class ParsePoolSaturated(Exception):
+    """A job was refused because every slot of the parse pool is taken."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _warm_worker(corpus_path: str | None = None) -> None:
+    """Worker initializer: route logs through the queue handler and load the parsers (and corpus)."""
+    from logging_setup import configure_logging
+    configure_logging()
+
+    import retrieval
+    if corpus_path:
+        try:
+            retrieval.load_worker_corpus(corpus_path)
+        except Exception as e:
+            # Loaded by the first ranking job instead
+            logger.warning("Parse worker could not preload the corpus: %s", e)
+    import sections
+    sections.extract_pmc_sections(WARMUP_XML)
+    sections.extract_pmc_sections(WARMUP_XML, "bs4")
+    sections.extract_html_sections(WARMUP_HTML)
+    sections.extract_html_sections(WARMUP_HTML, "bs4")
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class ParsePool:
+    def __init__(self, workers: int = 2, max_pending: int = 8, inline_max_bytes: int = 16384,
+                 corpus_path: str | None = None):
+        """
+        Configure the pool. The worker processes are started by start().
+
+        Args:
+            workers: Worker processes (0 runs every job on the event loop)
+            max_pending: Jobs submitted to the workers at a time
+            inline_max_bytes: Documents smaller than this are parsed on the event loop
+            corpus_path: papers.json, preloaded by every worker for the sequence engine
+        """
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.inline_max_bytes = inline_max_bytes
+        self.corpus_path = corpus_path
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._pending = 0
+        self._waiting = 0
+        # Moving average of job wall time, used for Retry-After
+        self._average_seconds = 0.0
+        self.submitted = 0
+        self.inline = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(self.corpus_path,),
+        )
+
+    async def start(self) -> None:
+        """Start the worker processes and wait until every one is warm."""
+        if self.workers == 0:
+            return
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._executor = self._create_executor()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        # Submitted together, so each job gets a worker of its own and all of them start now
+        pids = await asyncio.gather(*(loop.run_in_executor(self._executor, _worker_pid) for _ in range(self.workers)))
+        logger.info("Parse pool started %s workers in %.2fs (pids %s)", len(set(pids)),
+                    time.perf_counter() - started, sorted(set(pids)))
+
+    async def shutdown(self) -> None:
+        """Stop the worker processes, cancelling queued jobs."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    def retry_after(self) -> float:
+        """Estimated seconds until the queued jobs have been worked off."""
+        return max(1.0, math.ceil(self._pending * self._average_seconds / max(1, self.workers)))
+
+    async def run(self, func: Callable[..., Any], *args: Any, size: int | None = None, wait: bool = False) -> Any:
+        """
+        Run func(*args) in a worker process.
+
+        Args:
+            func: Module-level function (it is pickled by reference)
+            args: Picklable arguments
+            size: Document size in bytes; smaller than inline_max_bytes runs on the event loop
+            wait: Queue for a slot instead of raising when the pool is saturated
+
+        Returns:
+            func's result
+
+        Raises:
+            ParsePoolSaturated: Every slot is taken and wait is False
+        """
+        if self._executor is None or (size is not None and size < self.inline_max_bytes):
+            self.inline += 1
+            return func(*args)
+
+        if self._slots.locked() and not wait:
+            self.rejected += 1
+            raise ParsePoolSaturated(
+                f"parse pool saturated ({self._pending} jobs pending)", retry_after=self.retry_after()
+            )
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._pending += 1
+        self.submitted += 1
+        executor = self._executor
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            self.failed += 1
+            self._restart(executor)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.submitted == 1:
+                self._average_seconds = elapsed
+            else:
+                self._average_seconds += 0.1 * (elapsed - self._average_seconds)
+            self._pending -= 1
+            self._slots.release()
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a pool whose worker died (once, however many jobs saw it break)."""
+        if self._executor is not broken:
+            return
+        logger.error("A parse worker died; restarting the parse pool")
+        self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get parse pool statistics."""
+        return {
+            'workers': self.workers if self.enabled else 0,
+            'max_pending': self.max_pending,
+            'inline_max_bytes': self.inline_max_bytes,
+            'pending': self._pending,
+            'waiting': self._waiting,
+            'submitted': self.submitted,
+            'inline': self.inline,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'failed': self.failed,
+            'restarts': self.restarts,
+            'average_job_ms': round(self._average_seconds * 1000, 2),
+        }
@@ -0,0 +1,242 @@
+"""
+Single-pass section extractor for PMC (JATS) XML.
+
+The BeautifulSoup path in ``sections.py`` builds a full tree, deep-copies every
+``<sec>`` and decomposes unwanted subtrees before extracting text, so nested
+sections are copied and walked once per ancestor. This module feeds the XML
+through an lxml parser target instead: no tree is built, text is routed to
+every open section, abstract, title and paragraph as it is parsed, and
+reference lists, figures and tables are skipped with a counter rather than
+removed from a copy. The extracted fields are identical to the BeautifulSoup
+path.
+"""
+from typing import List, Dict, Tuple
+
+from lxml import etree
+
+# Subtrees whose text is excluded from section content
+UNWANTED_SECTION_TAGS = frozenset({'ref-list', 'fig', 'table-wrap', 'fn-group', 'ref'})
+
+# Tags excluded from the abstract text
+ABSTRACT_SKIP_TAGS = frozenset({'title', 'label'})
+
+# Section title keywords, checked in order
+SECTION_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('introduction', ('introduction', 'background', 'intro')),
+    ('materials_methods', ('material', 'method', 'procedure', 'experimental')),
+    ('results', ('result', 'finding', 'outcome')),
+    ('discussion', ('discussion', 'conclusion', 'implication')),
+)
+
+
+def classify_section(section_title: str) -> str | None:
+    """Map a lowercased section title to a response field, or None."""
+    for field, keywords in SECTION_KEYWORDS:
+        if any(keyword in section_title for keyword in keywords):
+            return field
+    return None
+
+
+class _Text:
+    """Character data collected for one element, minus skipped subtrees."""
+    __slots__ = ('depth', 'parts', 'skip')
+
+    def __init__(self, depth: int):
+        self.depth = depth
+        self.parts: List[str] | None = []
+        self.skip = 0
+
+    def add(self, data: str) -> None:
+        if not self.skip and self.parts is not None:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        return ''.join(self.parts or ())
+
+
+class _Section(_Text):
+    """An open <sec>: its content text plus the text of its first <title>."""
+    __slots__ = ('index', 'title', 'field')
+
+    def __init__(self, depth: int, index: int):
+        super().__init__(depth)
+        self.index = index
+        self.title: _Text | None = None
+        self.field: str | None = None
+
+
+class _JATSTarget:
+    """lxml parser target collecting the fields extract_pmc_sections returns."""
+
+    def __init__(self):
+        self.depth = 0
+        self._open_tags: List[str] = []
+        self.title: str | None = None
+        self.abstract: str | None = None
+        self.sections: List[Tuple[str, str] | None] = []
+        self.paragraphs: List[str | None] = []
+        self.found_body = False
+
+        self._title_group: int | None = None
+        self._title_group_done = False
+        self._article_title: _Text | None = None
+        self._abstract: _Text | None = None
+        self._body: int | None = None
+        self._open_sections: List[_Section] = []
+        self._open_paragraphs: List[Tuple[int, _Text]] = []
+
+    def start(self, tag, attrib, nsmap=None) -> None:
+        self.depth += 1
+        depth = self.depth
+        name = tag.rpartition('}')[2] if isinstance(tag, str) else ''
+        self._open_tags.append(name)
+
+        # Title: first <article-title> inside the first <title-group>
+        if name == 'title-group' and not self._title_group_done and self._title_group is None:
+            self._title_group = depth
+        elif name == 'article-title' and self._title_group is not None and self.title is None and self._article_title is None:
+            self._article_title = _Text(depth)
+
+        # Abstract: first <abstract>, without its titles and labels
+        if self._abstract is not None:
+            if name in ABSTRACT_SKIP_TAGS:
+                self._abstract.skip += 1
+        elif name == 'abstract' and self.abstract is None:
+            self._abstract = _Text(depth)
+
+        # Sections and paragraphs inside the first <body>
+        if self._body is None:
+            if name == 'body' and not self.found_body:
+                self._body = depth
+                self.found_body = True
+            return
+
+        if name == 'title':
+            for section in self._open_sections:
+                if section.title is None:
+                    # The first <title> anywhere in a section is its title
+                    section.title = _Text(depth)
+                    section.skip += 1
+        if name in UNWANTED_SECTION_TAGS:
+            for section in self._open_sections:
+                section.skip += 1
+        if name == 'sec':
+            self._open_sections.append(_Section(depth, len(self.sections)))
+            self.sections.append(None)
+        elif name == 'p':
+            self._open_paragraphs.append((len(self.paragraphs), _Text(depth)))
+            self.paragraphs.append(None)
+
+    def end(self, tag) -> None:
+        depth = self.depth
+        self.depth -= 1
+        name = self._open_tags.pop()
+
+        if self._article_title is not None and self._article_title.depth == depth:
+            self.title = self._article_title.text().strip()
+            self._article_title = None
+        if self._title_group == depth:
+            self._title_group = None
+            self._title_group_done = True
+
+        if self._abstract is not None:
+            if self._abstract.depth == depth:
+                self.abstract = self._abstract.text().strip()
+                self._abstract = None
+            elif name in ABSTRACT_SKIP_TAGS:
+                self._abstract.skip -= 1
+
+        if self._body is None:
+            return
+        if self._body == depth:
+            self._body = None
+            return
+
+        if name == 'sec' and self._open_sections and self._open_sections[-1].depth == depth:
+            section = self._open_sections.pop()
+            # Untitled sections never match a field
+            if section.field is not None:
+                self.sections[section.index] = (section.field, ' '.join(section.text().split()))
+            return
+        if name in UNWANTED_SECTION_TAGS:
+            for section in self._open_sections:
+                section.skip -= 1
+        if name == 'title':
+            for section in self._open_sections:
+                if section.title is not None and section.title.depth == depth:
+                    section.skip -= 1
+                    section.field = classify_section(section.title.text().strip().lower())
+                    # Stop collecting the title, and the content of sections no field will use
+                    section.title.depth = -1
+                    if section.field is None:
+                        section.parts = None
+        if name == 'p' and self._open_paragraphs and self._open_paragraphs[-1][1].depth == depth:
+            index, paragraph = self._open_paragraphs.pop()
+            self.paragraphs[index] = paragraph.text().strip()
+
+    def data(self, data: str) -> None:
+        if self._article_title is not None:
+            self._article_title.parts.append(data)
+        if self._abstract is not None:
+            self._abstract.add(data)
+        for section in self._open_sections:
+            section.add(data)
+            if section.title is not None and section.title.depth != -1:
+                section.title.parts.append(data)
+        for _, paragraph in self._open_paragraphs:
+            paragraph.parts.append(data)
+
+    def close(self) -> '_JATSTarget':
+        # Truncated documents: close whatever is still open, as a tree builder would
+        while self._open_tags:
+            self.end(self._open_tags[-1])
+        return self
+
+
+def extract_pmc_sections(xml_content: bytes | str) -> Dict[str, str]:
+    """
+    Extract title, abstract and main sections from PMC XML (E-utilities efetch)
+    in a single streaming pass.
+
+    Returns:
+        Dict with title, abstract, introduction, materials_methods, results and discussion
+    """
+    parser = etree.XMLParser(target=_JATSTarget(), strip_cdata=False, recover=True)
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode('utf-8')
+    parser.feed(xml_content)
+    target: _JATSTarget = parser.close()
+
+    fields = {'introduction': "", 'materials_methods': "", 'results': "", 'discussion': ""}
+    for section in target.sections:
+        if section is not None:
+            field, section_text = section
+            fields[field] = section_text
+
+    introduction = fields['introduction']
+    materials_methods = fields['materials_methods']
+    results = fields['results']
+    discussion = fields['discussion']
+
+    # If sections not found by title, try to extract from paragraph content
+    if not introduction or not materials_methods or not results or not discussion:
+        for para_text in target.paragraphs:
+            if para_text is None:
+                continue
+            if not introduction and len(para_text) > 100:
+                introduction = para_text
+            elif not materials_methods and any(word in para_text.lower()[:50] for word in ['material', 'method', 'procedure', 'protocol']):
+                materials_methods = para_text
+            elif not results and any(word in para_text.lower()[:50] for word in ['result', 'finding', 'observed', 'measured']):
+                results = para_text
+            elif not discussion and any(word in para_text.lower()[:50] for word in ['discussion', 'conclusion', 'suggest', 'implication']):
+                discussion = para_text
+
+    return {
+        'title': target.title if target.title is not None else "Untitled PMC Article",
+        'abstract': target.abstract or "",
+        'introduction': introduction,
+        'materials_methods': materials_methods,
+        'results': results,
+        'discussion': discussion,
+    }
@@ -0,0 +1,355 @@
+"""
+Rate limiting, retries and circuit breaking for upstream APIs.
+
+Each upstream (NCBI E-utilities, Gemini) gets a ``ResilientUpstream`` that
+wraps every call in:
+
+- a ``TokenBucket`` limiting the request rate. Callers queue for a token in
+  FIFO order, and a caller that could not get one before its deadline fails
+  at once instead of timing out later;
+- a ``RetryPolicy`` retrying 429/5xx answers and transport errors with
+  jittered exponential backoff, honoring ``Retry-After``;
+- a ``CircuitBreaker`` that opens after consecutive failures and rejects
+  calls until a trial call succeeds, so callers can fail fast or serve stale
+  cache entries while the upstream is degraded.
+
+Calls that are refused without reaching the upstream raise
+``UpstreamUnavailable``.
+"""
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, TypeVar
+
+T = TypeVar('T')
+
+# Status codes worth retrying: rate limited or transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamUnavailable(Exception):
+    """A call was refused before reaching the upstream (rate limit queue or open circuit)."""
+
+    def __init__(self, upstream: str, message: str, retry_after: float | None = None):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class RateLimitExceeded(UpstreamUnavailable):
+    """No rate limit token would be available before the caller's deadline."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """The upstream's circuit breaker is open."""
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, burst: float | None = None):
+        """
+        Initialize a token bucket.
+
+        Args:
+            name: Upstream name, used in errors
+            rate: Tokens added per second (0 disables limiting)
+            burst: Bucket capacity, i.e. requests allowed back to back (defaults to rate)
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self.tokens = self.capacity
+        self._updated: float | None = None
+
+        self.acquired = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.queued = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, deadline: float | None = None) -> float:
+        """
+        Take one token, waiting for it if the bucket is empty.
+
+        Tokens are reserved at call time, so waiters are served in arrival
+        order and each knows its wait up front.
+
+        Args:
+            deadline: time.monotonic() (event loop clock) value by which the token must be available
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitExceeded: If the token would only be available after the deadline
+        """
+        if self.rate <= 0:
+            self.acquired += 1
+            return 0.0
+        now = time.monotonic()
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        if deadline is not None and now + wait > deadline:
+            self.rejected += 1
+            raise RateLimitExceeded(self.name, f"rate limited, next request slot in {wait:.1f}s", retry_after=wait)
+        # Reserve the token now; the balance goes negative while callers are queued
+        self.tokens -= 1
+        self.acquired += 1
+        if wait > 0:
+            self.delayed += 1
+            self.queued += 1
+            self.total_wait_seconds += wait
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.queued -= 1
+        return wait
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics."""
+        if self._updated is not None:
+            self._refill(time.monotonic())
+        return {
+            'rate_per_second': self.rate,
+            'burst': self.capacity,
+            'available_tokens': round(max(self.tokens, 0.0), 2),
+            'queued': self.queued,
+            'acquired': self.acquired,
+            'delayed': self.delayed,
+            'rejected': self.rejected,
+            'avg_wait_seconds': round(self.total_wait_seconds / self.delayed, 4) if self.delayed else 0.0,
+        }
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Initialize a circuit breaker.
+
+        Args:
+            name: Upstream name, used in errors
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a trial call is let through
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Check that a call may proceed.
+
+        Raises:
+            CircuitOpenError: While open, or half-open with a trial call already in flight
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.rejected += 1
+        retry_after = max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0.0)
+        raise CircuitOpenError(self.name, "circuit breaker is open", retry_after=retry_after or self.recovery_timeout)
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.opened += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """End a call that neither succeeded nor failed (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker statistics."""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'failure_threshold': self.failure_threshold,
+            'recovery_timeout_seconds': self.recovery_timeout,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 retry_statuses: Iterable[int] = RETRY_STATUSES):
+        """
+        Initialize a retry policy.
+
+        Args:
+            max_attempts: Attempts per call, including the first
+            base_delay: Backoff ceiling of the first retry in seconds (doubled per retry)
+            max_delay: Maximum backoff ceiling in seconds
+            retry_statuses: HTTP status codes that are retried
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def backoff(self, retry: int, retry_after: float | None = None) -> float:
+        """Full-jitter delay before the given retry (0-based), at least Retry-After if the upstream sent one."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+        return max(delay, retry_after or 0.0)
+
+
+def status_of(value: Any) -> int | None:
+    """HTTP status of a response or error (httpx responses and errors, Google API errors)."""
+    status = getattr(value, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(value, 'response', None), 'status_code', None)
+    if status is None:
+        code = getattr(value, 'code', None)
+        status = code if isinstance(code, int) else None
+    return status
+
+
+def retry_after_of(value: Any) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds form only)."""
+    headers = getattr(value, 'headers', None) or getattr(getattr(value, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientUpstream:
+    def __init__(self, name: str, limiter: TokenBucket, breaker: CircuitBreaker, retry: RetryPolicy,
+                 max_wait: float = 10.0, transient_errors: tuple = (ConnectionError,)):
+        """
+        Initialize an upstream guard.
+
+        Args:
+            name: Upstream name
+            limiter: Request rate limiter
+            breaker: Circuit breaker
+            retry: Retry policy
+            max_wait: Default seconds a call may spend queued for a token or backing off
+            transient_errors: Exception types that are retried (besides errors carrying a retriable status)
+        """
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retry = retry
+        self.max_wait = max_wait
+        self.transient_errors = transient_errors
+
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _is_failure(self, status: int | None, error: BaseException | None) -> bool:
+        """Whether an attempt counts against the upstream's health."""
+        if status is not None:
+            return status in self.retry.retry_statuses
+        return isinstance(error, self.transient_errors + (asyncio.TimeoutError,))
+
+    def _is_retriable(self, status: int | None, error: BaseException | None) -> bool:
+        if status is not None:
+            return status in self.retry.retry_statuses
+        return isinstance(error, self.transient_errors)
+
+    async def call(self, operation: Callable[[], Awaitable[T]], deadline: float | None = None) -> T:
+        """
+        Run an upstream operation under the rate limiter, retry policy and breaker.
+
+        Retriable responses are retried until attempts run out or the next
+        backoff would pass the deadline; the last response is then returned
+        (and the last error raised) as is.
+
+        Args:
+            operation: Coroutine function performing one attempt
+            deadline: time.monotonic() (event loop clock) value after which no token wait or backoff is started
+                (defaults to max_wait seconds from now)
+
+        Raises:
+            UpstreamUnavailable: If the breaker is open or no token is available in time
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.max_wait
+        self.calls += 1
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                await self.limiter.acquire(deadline)
+            except BaseException:
+                self.breaker.release()
+                raise
+
+            self.attempts += 1
+            result = error = None
+            try:
+                result = await operation()
+            except Exception as e:
+                error = e
+            except BaseException:
+                self.breaker.release()
+                raise
+
+            status = status_of(result if error is None else error)
+            if self._is_failure(status, error):
+                self.failures += 1
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+            attempt += 1
+            if self._is_retriable(status, error) and attempt < self.retry.max_attempts:
+                delay = self.retry.backoff(attempt - 1, retry_after_of(result if error is None else error))
+                if time.monotonic() + delay <= deadline:
+                    self.retries += 1
+                    await asyncio.sleep(delay)
+                    continue
+            if error is not None:
+                raise error
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call, retry, limiter and breaker statistics."""
+        return {
+            'calls': self.calls,
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'failures': self.failures,
+            'max_attempts': self.retry.max_attempts,
+            'max_wait_seconds': self.max_wait,
+            'rate_limiter': self.limiter.get_stats(),
+            'circuit_breaker': self.breaker.get_stats(),
+        }
@@ -0,0 +1,502 @@
+"""
+Retrieval engines for matching user queries against the paper corpus.
+
+The indexes are built once per corpus snapshot and answer queries by touching
+only the postings of the query terms, instead of comparing the query against
+every paper on every request. ``BM25Index`` walks Python postings lists;
+``MatrixIndex`` stores the same BM25 weights as a sparse NumPy term matrix and
+scores a query with a single vectorized matrix-vector product.
+
+``find_most_relevant_paper`` is the legacy SequenceMatcher scorer (the
+"sequence" chat engine), which compares the query against every paper. It is
+CPU-bound for seconds on large corpora, so the API runs it in the parse pool.
+The workers load papers.json themselves (``load_worker_corpus``) and keep it
+for as long as its content hash is current, so a job sends only the query and
+the hash instead of pickling the whole corpus.
+"""
+import hashlib
+import json
+import math
+import re
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from corpus import flatten_papers
+
+# Common stop words that carry no retrieval signal
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'between', 'among', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
+    'what', 'which', 'who', 'how', 'why', 'when', 'where', 'it', 'its', 'me', 'my',
+    'i', 'you', 'your', 'we', 'our', 'they', 'their', 'tell', 'any', 'some',
+}
+
+# Field weights mirroring the blend used by the SequenceMatcher scorer:
+# overall similarity 40%, title 25%, summary 20%, keywords 10%.
+FIELD_WEIGHTS = {
+    'combined': 0.4,
+    'title': 0.25,
+    'summary': 0.2,
+    'keywords': 0.1,
+}
+# Fraction of query terms present anywhere in the paper: 5%
+OVERLAP_WEIGHT = 0.05
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into index terms, dropping stop words."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def paper_fields(paper: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Tokenize the searchable fields of a paper."""
+    title = tokenize(paper.get('title', '') or '')
+    summary = tokenize(paper.get('summary', '') or '')
+    keywords: List[str] = []
+    for keyword in paper.get('keywords', []) or []:
+        keywords.extend(tokenize(str(keyword)))
+
+    return {
+        'combined': title + summary + keywords,
+        'title': title,
+        'summary': summary,
+        'keywords': keywords,
+    }
+
+
+def build_postings(papers: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, List[Tuple[int, int]]]], Dict[str, List[int]]]:
+    """
+    Tokenize all papers into per-field postings.
+
+    Returns:
+        Tuple of (field -> term -> list of (doc index, term frequency),
+        field -> per-document token counts)
+    """
+    postings: Dict[str, Dict[str, List[Tuple[int, int]]]] = {field: {} for field in FIELD_WEIGHTS}
+    doc_lengths: Dict[str, List[int]] = {field: [] for field in FIELD_WEIGHTS}
+
+    for doc_id, paper in enumerate(papers):
+        for field, tokens in paper_fields(paper).items():
+            doc_lengths[field].append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            field_postings = postings[field]
+            for token, tf in counts.items():
+                field_postings.setdefault(token, []).append((doc_id, tf))
+
+    return postings, doc_lengths
+
+
+def bm25_idf(doc_count: int, df: int) -> float:
+    """BM25 inverse document frequency for a term appearing in df documents."""
+    return math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+
+
+class BM25Index:
+    """
+    Field-weighted BM25 inverted index over title, summary and keywords.
+
+    Each field is scored independently with BM25 and normalized by the best
+    score the query could reach in that field, so the blended result stays in
+    the same 0..1 range as the SequenceMatcher scorer and existing thresholds
+    keep their meaning.
+    """
+
+    name = "bm25"
+
+    def __init__(self, papers: List[Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            papers: Flattened list of paper dictionaries
+            k1: BM25 term frequency saturation parameter
+            b: BM25 length normalization parameter
+        """
+        self.papers = papers
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(papers)
+
+        # field -> term -> list of (doc index, term frequency), field -> per-document token counts
+        self.postings, self.doc_lengths = build_postings(papers)
+        self.avg_lengths: Dict[str, float] = {}
+
+        for field, lengths in self.doc_lengths.items():
+            self.avg_lengths[field] = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    def idf(self, field: str, term: str) -> float:
+        """Inverse document frequency of a term within a field."""
+        return bm25_idf(self.doc_count, len(self.postings[field].get(term, ())))
+
+    def score(self, query: str) -> Dict[int, float]:
+        """
+        Score every paper that shares at least one term with the query.
+
+        Args:
+            query: Free-text user query
+
+        Returns:
+            Mapping of document index to blended score (0..1)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.doc_count:
+            return {}
+
+        scores: Dict[int, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            field_postings = self.postings[field]
+            lengths = self.doc_lengths[field]
+            avg_length = self.avg_lengths[field] or 1.0
+
+            idfs = {term: self.idf(field, term) for term in terms}
+            # Best achievable score for this query in this field
+            max_score = sum(idfs.values()) * (self.k1 + 1)
+            if max_score <= 0:
+                continue
+            scale = weight / max_score
+
+            for term in terms:
+                idf = idfs[term]
+                for doc_id, tf in field_postings.get(term, ()):
+                    norm = self.k1 * (1 - self.b + self.b * lengths[doc_id] / avg_length)
+                    contribution = idf * tf * (self.k1 + 1) / (tf + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + contribution * scale
+
+        # Word overlap bonus: fraction of query terms present in the paper
+        overlap_step = OVERLAP_WEIGHT / len(terms)
+        combined_postings = self.postings['combined']
+        for term in terms:
+            for doc_id, _ in combined_postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + overlap_step
+
+        return scores
+
+    def search(self, query: str, top_k: int = 1) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Return the top-k papers for a query, best first.
+
+        Args:
+            query: Free-text user query
+            top_k: Maximum number of results
+
+        Returns:
+            List of (paper, score) tuples
+        """
+        scores = self.score(query)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [(self.papers[doc_id], score) for doc_id, score in ranked]
+
+    def find_most_relevant_paper(self, query: str) -> Tuple[Dict[str, Any] | None, float]:
+        """Return the single best paper and its score, or (None, 0.0)."""
+        results = self.search(query, top_k=1)
+        if not results:
+            return None, 0.0
+        return results[0]
+
+
+class MatrixIndex:
+    """
+    NumPy-backed BM25 scorer over a precomputed sparse term-weight matrix.
+
+    The matrix has one row per paper and one column per (block, term), with
+    separate column blocks for the combined text, title, summary and keywords
+    holding the BM25-saturated term weights, plus a presence block for the
+    word overlap bonus. It is stored column-compressed (CSC), so a query is
+    scored as one sparse matrix-vector product: the columns of the query terms
+    are gathered, scaled by the query vector and summed per paper with
+    ``np.bincount``. Top-k selection uses ``np.argpartition``.
+
+    Scores are identical to ``BM25Index``; only the execution strategy differs.
+    """
+
+    name = "numpy"
+    PRESENCE_BLOCK = "presence"
+
+    def __init__(self, papers: List[Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        """
+        Build the term-weight matrix.
+
+        Args:
+            papers: Flattened list of paper dictionaries
+            k1: BM25 term frequency saturation parameter
+            b: BM25 length normalization parameter
+        """
+        self.papers = papers
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(papers)
+
+        postings, doc_lengths = build_postings(papers)
+
+        # block -> term -> column index
+        self.columns: Dict[str, Dict[str, int]] = {}
+        # block -> term -> document frequency (for idf)
+        self.document_frequencies: Dict[str, Dict[str, int]] = {}
+        indptr = [0]
+        indices_parts: List[np.ndarray] = []
+        data_parts: List[np.ndarray] = []
+        column = 0
+
+        for field in FIELD_WEIGHTS:
+            lengths = np.asarray(doc_lengths[field], dtype=np.float64)
+            avg_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+            # Per-document BM25 length normalization for this field
+            norms = k1 * (1 - b + b * lengths / avg_length)
+
+            field_columns: Dict[str, int] = {}
+            field_dfs: Dict[str, int] = {}
+            for term, term_postings in postings[field].items():
+                docs = np.fromiter((doc_id for doc_id, _ in term_postings), dtype=np.int32, count=len(term_postings))
+                tfs = np.fromiter((tf for _, tf in term_postings), dtype=np.float64, count=len(term_postings))
+                idf = bm25_idf(self.doc_count, len(term_postings))
+                weights = idf * tfs * (k1 + 1) / (tfs + norms[docs])
+
+                field_columns[term] = column
+                field_dfs[term] = len(term_postings)
+                indices_parts.append(docs)
+                data_parts.append(weights)
+                indptr.append(indptr[-1] + len(docs))
+                column += 1
+            self.columns[field] = field_columns
+            self.document_frequencies[field] = field_dfs
+
+        # Presence block: 1.0 wherever a term occurs anywhere in the paper
+        presence_columns: Dict[str, int] = {}
+        for term, term_postings in postings['combined'].items():
+            docs = np.fromiter((doc_id for doc_id, _ in term_postings), dtype=np.int32, count=len(term_postings))
+            presence_columns[term] = column
+            indices_parts.append(docs)
+            data_parts.append(np.ones(len(docs), dtype=np.float64))
+            indptr.append(indptr[-1] + len(docs))
+            column += 1
+        self.columns[self.PRESENCE_BLOCK] = presence_columns
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.concatenate(indices_parts) if indices_parts else np.zeros(0, dtype=np.int32)
+        self.data = np.concatenate(data_parts) if data_parts else np.zeros(0, dtype=np.float64)
+        self.shape = (self.doc_count, column)
+
+    def query_vector(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the sparse query vector.
+
+        Returns:
+            Tuple of (column indices, weights) for the non-zero query entries
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.doc_count:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        query_columns: List[int] = []
+        query_weights: List[float] = []
+        for field, weight in FIELD_WEIGHTS.items():
+            field_dfs = self.document_frequencies[field]
+            # Best achievable score for this query in this field
+            max_score = sum(bm25_idf(self.doc_count, field_dfs.get(term, 0)) for term in terms) * (self.k1 + 1)
+            if max_score <= 0:
+                continue
+            field_columns = self.columns[field]
+            for term in terms:
+                if term in field_columns:
+                    query_columns.append(field_columns[term])
+                    query_weights.append(weight / max_score)
+
+        presence_columns = self.columns[self.PRESENCE_BLOCK]
+        for term in terms:
+            if term in presence_columns:
+                query_columns.append(presence_columns[term])
+                query_weights.append(OVERLAP_WEIGHT / len(terms))
+
+        return np.asarray(query_columns, dtype=np.int64), np.asarray(query_weights, dtype=np.float64)
+
+    def score_vector(self, query: str) -> np.ndarray:
+        """
+        Score every paper against the query in one sparse matrix-vector product.
+
+        Returns:
+            Dense array of blended scores (0..1), one per paper
+        """
+        query_columns, query_weights = self.query_vector(query)
+        if not len(query_columns):
+            return np.zeros(self.doc_count, dtype=np.float64)
+
+        starts = self.indptr[query_columns]
+        ends = self.indptr[query_columns + 1]
+        counts = ends - starts
+        # Flat positions of every stored entry in the selected columns
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        weights = self.data[offsets] * np.repeat(query_weights, counts)
+        return np.bincount(self.indices[offsets], weights=weights, minlength=self.doc_count)
+
+    def score(self, query: str) -> Dict[int, float]:
+        """Score papers sharing at least one term with the query (same contract as BM25Index.score)."""
+        scores = self.score_vector(query)
+        matched = np.flatnonzero(scores > 0)
+        return {int(doc_id): float(scores[doc_id]) for doc_id in matched}
+
+    def top_k(self, query: str, top_k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Select the top-k documents with argpartition.
+
+        Returns:
+            Tuple of (document indices, scores), best first, only positive scores
+        """
+        scores = self.score_vector(query)
+        if top_k <= 0 or not self.doc_count:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        if top_k < self.doc_count:
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(self.doc_count)
+        # Order candidates by score descending, then by document index
+        order = np.lexsort((candidates, -scores[candidates]))
+        candidates = candidates[order]
+        candidates = candidates[scores[candidates] > 0]
+        return candidates, scores[candidates]
+
+    def search(self, query: str, top_k: int = 1) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Return the top-k papers for a query, best first.
+
+        Args:
+            query: Free-text user query
+            top_k: Maximum number of results
+
+        Returns:
+            List of (paper, score) tuples
+        """
+        doc_ids, scores = self.top_k(query, top_k)
+        return [(self.papers[int(doc_id)], float(score)) for doc_id, score in zip(doc_ids, scores)]
+
+    def find_most_relevant_paper(self, query: str) -> Tuple[Dict[str, Any] | None, float]:
+        """Return the single best paper and its score, or (None, 0.0)."""
+        results = self.search(query, top_k=1)
+        if not results:
+            return None, 0.0
+        return results[0]
+
+
+class CategoryIndex:
+    """Category -> document indexes lookup used for search facets and filtering."""
+
+    name = "categories"
+
+    def __init__(self, papers: List[Dict[str, Any]]):
+        """
+        Build the category lookup.
+
+        Args:
+            papers: Flattened list of paper dictionaries
+        """
+        self.papers = papers
+        self.doc_ids: Dict[str, List[int]] = {}
+        for doc_id, paper in enumerate(papers):
+            category = str(paper.get('category') or 'Uncategorized')
+            self.doc_ids.setdefault(category, []).append(doc_id)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of papers per category."""
+        return {category: len(doc_ids) for category, doc_ids in self.doc_ids.items()}
+
+
+def find_most_relevant_paper(query: str, papers: List[Dict[str, Any]]) -> Tuple[Dict[str, Any] | None, float]:
+    """Find the most relevant paper based on comprehensive string similarity matching."""
+    if not papers:
+        return None, 0.0
+    
+    query_lower = query.lower().strip()
+    best_paper = None
+    best_score = 0.0
+    
+    for paper in papers:
+        # Get paper content
+        title = paper.get('title', '').lower()
+        summary = paper.get('summary', '').lower()
+        keywords = [kw.lower() for kw in paper.get('keywords', [])]
+        
+        # Combine all text content for comprehensive matching
+        combined_text = f"{title} {summary} {' '.join(keywords)}"
+        
+        # Calculate primary similarity using SequenceMatcher
+        primary_score = SequenceMatcher(None, query_lower, combined_text).ratio()
+        
+        # Calculate individual field similarities
+        title_similarity = SequenceMatcher(None, query_lower, title).ratio()
+        summary_similarity = SequenceMatcher(None, query_lower, summary).ratio()
+        
+        # Calculate keyword similarities
+        keyword_similarities = [
+            SequenceMatcher(None, query_lower, keyword).ratio() 
+            for keyword in keywords
+        ]
+        max_keyword_similarity = max(keyword_similarities) if keyword_similarities else 0.0
+        
+        # Calculate word-level matches for bonus scoring
+        query_words = set(query_lower.split())
+        paper_words = set(combined_text.split())
+        word_overlap = len(query_words.intersection(paper_words)) / len(query_words) if query_words else 0.0
+        
+        # Weighted final score combining different similarity measures
+        final_score = (
+            primary_score * 0.4 +           # Overall similarity: 40%
+            title_similarity * 0.25 +       # Title similarity: 25%
+            summary_similarity * 0.2 +      # Summary similarity: 20%
+            max_keyword_similarity * 0.1 +  # Best keyword match: 10%
+            word_overlap * 0.05            # Word overlap bonus: 5%
+        )
+        
+        if final_score > best_score:
+            best_score = final_score
+            best_paper = paper
+    
+    return best_paper, best_score
+
+
+# The corpus of this (parse pool worker) process for find_most_relevant_in_corpus: (content hash, papers)
+_worker_corpus: Tuple[str | None, List[Dict[str, Any]]] = (None, [])
+
+
+def load_worker_corpus(path: str, expected_hash: str | None = None) -> str:
+    """
+    Load papers.json into this process's corpus, unless its content is already loaded.
+
+    Args:
+        path: Path to papers.json
+        expected_hash: Only load the file if it has this content hash
+
+    Returns:
+        The SHA-256 content hash of the file, as in CorpusSnapshot.content_hash
+    """
+    global _worker_corpus
+    with open(path, "rb") as file:
+        raw = file.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash != _worker_corpus[0] and expected_hash in (None, content_hash):
+        _worker_corpus = (content_hash, flatten_papers(json.loads(raw)))
+    return content_hash
+
+
+def find_most_relevant_in_corpus(query: str, path: str,
+                                 content_hash: str) -> Tuple[Dict[str, Any] | None, float] | None:
+    """
+    find_most_relevant_paper over the corpus at path, as loaded by load_worker_corpus.
+
+    The file is only read again when content_hash differs from the loaded version.
+
+    Returns:
+        (paper, score) as find_most_relevant_paper, or None if the file no longer
+        has the requested content (it changed since the caller's snapshot was loaded)
+    """
+    if content_hash != _worker_corpus[0] and load_worker_corpus(path, content_hash) != content_hash:
+        return None
+    return find_most_relevant_paper(query, _worker_corpus[1])
@@ -0,0 +1,308 @@
+"""
+Section extraction for PMC XML and publisher HTML pages.
+
+``extract_pmc_sections`` and ``extract_html_sections`` run the single-pass
+lxml extractors (pmc_parser.py, html_sections.py) and fall back to the
+BeautifulSoup implementations below if lxml fails, or use BeautifulSoup
+directly when asked to. They take the raw response bytes and return plain
+dicts, and this module imports nothing from the app, so the parse pool's
+worker processes can run them (see parse_pool.py).
+"""
+import logging
+import re
+from typing import Dict
+
+from bs4 import BeautifulSoup
+
+from pmc_parser import extract_pmc_sections as extract_pmc_sections_streaming
+from html_sections import extract_html_sections as extract_html_sections_single_pass
+
+logger = logging.getLogger("astrolens.sections")
+
+# Parsers selectable with PMC_PARSER and HTML_PARSER
+PARSERS = ("lxml", "bs4")
+
+
+def extract_pmc_sections(xml_content: bytes | str, parser: str = "lxml") -> Dict[str, str]:
+    """
+    Extract title, abstract and main sections from PMC XML (E-utilities efetch).
+    
+    Uses the streaming lxml parser unless parser is "bs4"; falls back to
+    BeautifulSoup if the streaming parser fails.
+    
+    Returns:
+        Dict with title, abstract, introduction, materials_methods, results and discussion
+    """
+    if parser == 'lxml':
+        try:
+            sections = extract_pmc_sections_streaming(xml_content)
+            logger.debug("Parsed PMC XML with lxml: %s", sections['title'])
+            return sections
+        except Exception as e:
+            logger.debug("Streaming PMC parser failed, falling back to BeautifulSoup: %s", e)
+    return extract_pmc_sections_bs4(xml_content)
+
+
+def extract_html_sections(html_content: bytes | str, parser: str = "lxml") -> Dict[str, str]:
+    """
+    Extract title, abstract and main sections from a publisher HTML page.
+    
+    Uses the single-pass lxml extractor unless parser is "bs4"; falls back to
+    BeautifulSoup if lxml fails.
+    
+    Returns:
+        Dict with title, abstract, introduction, materials_methods, results and discussion
+    """
+    if parser == 'lxml':
+        try:
+            return extract_html_sections_single_pass(html_content)
+        except Exception as e:
+            logger.debug("lxml HTML extraction failed, falling back to BeautifulSoup: %s", e)
+    return extract_html_sections_bs4(html_content)
+
+
+def extract_text_content(soup):
+    """Extract clean text content from BeautifulSoup object."""
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.extract()
+    
+    # Get text and clean it up
+    text = soup.get_text()
+    # Break into lines and remove leading/trailing space
+    lines = (line.strip() for line in text.splitlines())
+    # Break multi-headlines into a line each
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    # Drop blank lines
+    text = ' '.join(chunk for chunk in chunks if chunk)
+    return text
+
+
+def extract_pmc_sections_bs4(xml_content) -> Dict[str, str]:
+    """
+    Extract title, abstract and main sections from PMC XML with BeautifulSoup.
+    
+    Returns:
+        Dict with title, abstract, introduction, materials_methods, results and discussion
+    """
+    logger.debug("Parsing PMC XML content...")
+    
+    # Parse XML with BeautifulSoup
+    soup = BeautifulSoup(xml_content, 'xml')
+    
+    # Extract title
+    title = "Untitled PMC Article"
+    title_group = soup.find('title-group')
+    if title_group:
+        article_title = title_group.find('article-title')
+        if article_title:
+            title = article_title.get_text().strip()
+    
+    logger.debug("Extracted title: %s", title)
+    
+    # Extract abstract
+    abstract = ""
+    abstract_element = soup.find('abstract')
+    if abstract_element:
+        # Remove any nested tags and get clean text
+        for tag in abstract_element(['title', 'label']):
+            tag.decompose()
+        abstract = abstract_element.get_text().strip()
+    
+    logger.debug("Extracted abstract length: %s chars", len(abstract))
+    
+    # Extract specific sections
+    introduction = ""
+    materials_methods = ""
+    results = ""
+    discussion = ""
+    
+    # Look for sections in the body
+    body = soup.find('body')
+    if body:
+        # Find sections by title
+        sections = body.find_all('sec')
+        
+        for section in sections:
+            # Get section title
+            section_title = ""
+            title_element = section.find('title')
+            if title_element:
+                section_title = title_element.get_text().strip().lower()
+            
+            # Remove title from section content
+            section_copy = section.__copy__()
+            if section_copy.find('title'):
+                section_copy.find('title').decompose()
+            
+            # Remove references, figures, tables
+            for unwanted in section_copy(['ref-list', 'fig', 'table-wrap', 'fn-group', 'ref']):
+                unwanted.decompose()
+            
+            section_text = section_copy.get_text().strip()
+            section_text = ' '.join(section_text.split())  # Normalize whitespace
+            
+            # Categorize sections
+            if any(keyword in section_title for keyword in ['introduction', 'background', 'intro']):
+                introduction = section_text
+                logger.debug("Found introduction section: %s chars", len(introduction))
+            elif any(keyword in section_title for keyword in ['material', 'method', 'procedure', 'experimental']):
+                materials_methods = section_text
+                logger.debug("Found materials/methods section: %s chars", len(materials_methods))
+            elif any(keyword in section_title for keyword in ['result', 'finding', 'outcome']):
+                results = section_text
+                logger.debug("Found results section: %s chars", len(results))
+            elif any(keyword in section_title for keyword in ['discussion', 'conclusion', 'implication']):
+                discussion = section_text
+                logger.debug("Found discussion section: %s chars", len(discussion))
+    
+    # If sections not found by title, try to extract from paragraphs
+    if not introduction or not materials_methods or not results or not discussion:
+        logger.debug("Attempting to extract sections from paragraph content...")
+        all_paragraphs = body.find_all('p') if body else []
+        
+        for para in all_paragraphs:
+            para_text = para.get_text().strip()
+            
+            # Simple heuristics to identify sections
+            if not introduction and len(para_text) > 100:
+                introduction = para_text
+            elif not materials_methods and any(word in para_text.lower()[:50] for word in ['material', 'method', 'procedure', 'protocol']):
+                materials_methods = para_text
+            elif not results and any(word in para_text.lower()[:50] for word in ['result', 'finding', 'observed', 'measured']):
+                results = para_text
+            elif not discussion and any(word in para_text.lower()[:50] for word in ['discussion', 'conclusion', 'suggest', 'implication']):
+                discussion = para_text
+    
+    return {
+        'title': title,
+        'abstract': abstract,
+        'introduction': introduction,
+        'materials_methods': materials_methods,
+        'results': results,
+        'discussion': discussion
+    }
+
+
+def extract_html_sections_bs4(html_content) -> Dict[str, str]:
+    """
+    Extract title, abstract and main sections from a publisher HTML page with BeautifulSoup.
+    
+    Returns:
+        Dict with title, abstract, introduction, materials_methods, results and discussion
+    """
+    # Parse the HTML content
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # Extract title
+    title = "Untitled Document"
+    title_tag = soup.find('title')
+    if title_tag:
+        title = title_tag.get_text().strip()
+    
+    # Look for meta title as backup
+    if not title or title == "Untitled Document":
+        meta_title = soup.find('meta', property='og:title')
+        if meta_title:
+            title = meta_title.get('content', '').strip()
+    
+    # Extract abstract - try multiple approaches
+    abstract = ""
+    
+    # Method 1: Look for meta description
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc:
+        abstract = meta_desc.get('content', '').strip()
+    
+    # Method 2: Look for OpenGraph description
+    if not abstract:
+        og_desc = soup.find('meta', property='og:description')
+        if og_desc:
+            abstract = og_desc.get('content', '').strip()
+    
+    # Method 3: Look for abstract section in body
+    if not abstract:
+        abstract_section = soup.find(['div', 'section', 'p'], class_=re.compile(r'abstract', re.I))
+        if abstract_section:
+            abstract = extract_text_content(abstract_section)[:500]
+    
+    # Method 4: Look for abstract by ID
+    if not abstract:
+        abstract_by_id = soup.find(id=re.compile(r'abstract', re.I))
+        if abstract_by_id:
+            abstract = extract_text_content(abstract_by_id)[:500]
+    
+    # Method 5: Look for first paragraph that might be abstract
+    if not abstract:
+        paragraphs = soup.find_all('p')
+        for p in paragraphs[:5]:  # Check first 5 paragraphs
+            text = p.get_text().strip()
+            if len(text) > 100:  # Substantial paragraph
+                abstract = text[:500]
+                break
+    
+    # Fallback: Use first 500 characters of body text
+    if not abstract:
+        body_text = extract_text_content(soup)
+        abstract = body_text[:500] if body_text else "No content available"
+    
+    # Extract specific sections from HTML content
+    introduction = ""
+    materials_methods = ""
+    results = ""
+    discussion = ""
+    
+    # Try to find sections by headers or content patterns
+    all_text = extract_text_content(soup)
+    paragraphs = soup.find_all(['p', 'div', 'section'])
+    
+    for element in paragraphs:
+        text = element.get_text().strip()
+        if len(text) < 50:  # Skip short elements
+            continue
+            
+        # Check for section indicators
+        text_lower = text.lower()
+        
+        # Look for introduction section
+        if not introduction and any(indicator in text_lower[:100] for indicator in ['introduction', 'background', 'overview']):
+            introduction = text[:1000]  # Limit length
+            logger.debug("Found introduction section in HTML: %s chars", len(introduction))
+        
+        # Look for materials/methods section
+        elif not materials_methods and any(indicator in text_lower[:100] for indicator in ['materials', 'methods', 'methodology', 'procedure', 'experimental']):
+            materials_methods = text[:1000]
+            logger.debug("Found materials/methods section in HTML: %s chars", len(materials_methods))
+        
+        # Look for results section
+        elif not results and any(indicator in text_lower[:100] for indicator in ['results', 'findings', 'outcomes', 'data show']):
+            results = text[:1000]
+            logger.debug("Found results section in HTML: %s chars", len(results))
+        
+        # Look for discussion section
+        elif not discussion and any(indicator in text_lower[:100] for indicator in ['discussion', 'conclusion', 'implications', 'suggest']):
+            discussion = text[:1000]
+            logger.debug("Found discussion section in HTML: %s chars", len(discussion))
+    
+    # If sections still not found, extract from general content
+    if not introduction or not materials_methods or not results or not discussion:
+        logger.debug("Using fallback content extraction for missing sections...")
+        paragraphs_text = [p.get_text().strip() for p in soup.find_all('p') if len(p.get_text().strip()) > 100]
+        
+        if not introduction and len(paragraphs_text) > 0:
+            introduction = paragraphs_text[0][:1000]
+        if not materials_methods and len(paragraphs_text) > 1:
+            materials_methods = paragraphs_text[1][:1000]
+        if not results and len(paragraphs_text) > 2:
+            results = paragraphs_text[2][:1000]
+        if not discussion and len(paragraphs_text) > 3:
+            discussion = paragraphs_text[3][:1000]
+    
+    return {
+        'title': title,
+        'abstract': abstract,
+        'introduction': introduction,
+        'materials_methods': materials_methods,
+        'results': results,
+        'discussion': discussion
+    }
@@ -0,0 +1,69 @@
+import asyncio
+import importlib
+import os
+import sys
+
+import pytest
+
+# The API modules are imported as top-level modules (``import main``), as when run from api/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes import FakeGenerativeModel, start_fake_eutils  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def fake_eutils():
+    """A fake E-utilities server shared by the session; main is configured to use it."""
+    server = start_fake_eutils()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(scope="session")
+def api(fake_eutils):
+    """
+    The API module, configured for offline tests before its first import.
+
+    main reads its configuration at import time, so everything is set here:
+    the fake E-utilities server, in-memory caches, no rate limits, parsing on
+    the event loop and no background reload or sweep tasks.
+    """
+    os.environ.update({
+        'EUTILS_BASE_URL': fake_eutils.base_url,
+        'IDCONV_BASE_URL': fake_eutils.idconv_url,
+        'NCBI_API_KEY': 'test-key',
+        'NCBI_REQUESTS_PER_SECOND': '0',
+        'GEMINI_REQUESTS_PER_SECOND': '0',
+        'CACHE_BACKEND': 'memory',
+        'LLM_CACHE_BACKEND': 'memory',
+        'PARSE_WORKERS': '0',
+        'CORPUS_RELOAD_INTERVAL': '0',
+        'CACHE_SWEEP_INTERVAL': '0',
+        'LOG_LEVEL': 'WARNING',
+    })
+    os.environ.pop('GOOGLE_API_KEY', None)
+    api = importlib.import_module("main")
+    api.ai_model = FakeGenerativeModel()
+    return api
+
+
+@pytest.fixture
+def fake_model(api):
+    """A fresh fake model (with its own call counter) installed for one test."""
+    model = FakeGenerativeModel()
+    api.ai_model = model
+    return model
+
+
+@pytest.fixture
+def run_api(api):
+    """Run a coroutine with the upstream HTTP client pool started, as the app lifespan does."""
+    def run(coro_func, *args, **kwargs):
+        async def main():
+            await api.http_pool.start()
+            try:
+                return await coro_func(*args, **kwargs)
+            finally:
+                await api.http_pool.close()
+        return asyncio.run(main())
+    return run
@@ -0,0 +1,41 @@
+from fakes import FAKE_DOI_PREFIX, FAKE_PMID_OFFSET
+
+
+def doi_page_url(server, number):
+    """A publisher URL carrying the DOI of a fake PMC article, served by the fake server."""
+    return server.page_url(f"doi/{FAKE_DOI_PREFIX}{number}")
+
+
+def test_idconv_requests_are_batched(api, fake_eutils, run_api):
+    ids = [f"PMC{number}" for number in range(750001, 750201)]
+    ids += [str(FAKE_PMID_OFFSET + number) for number in range(750201, 750401)]
+    ids += [f"{FAKE_DOI_PREFIX}{number}" for number in range(750401, 750451)]
+    seen = len(fake_eutils.idconv_requests)
+
+    stats = run_api(api.populate_identity_table, ids)
+    assert stats == {'requested': 450, 'requests': 3, 'records_added': 450, 'failed_requests': 0}
+    assert [len(chunk) for chunk in fake_eutils.idconv_requests[seen:]] == [200, 200, 50]
+    assert api.identity_resolver.resolve(f"https://pubmed.ncbi.nlm.nih.gov/{FAKE_PMID_OFFSET + 750300}/").pmcid == "PMC750300"
+    assert api.identity_resolver.resolve(f"https://doi.org/{FAKE_DOI_PREFIX}750450").pmcid == "PMC750450"
+
+
+def test_missing_ids_fall_back_to_single_fetches(api, fake_eutils, fake_model, run_api):
+    numbers = range(760001, 760005)
+    urls = [doi_page_url(fake_eutils, number) for number in numbers]
+    run_api(api.populate_identity_table, api.identity_resolver.converter_ids(urls))
+    fake_eutils.missing_ids.add("PMC760002")
+    seen = len(fake_eutils.requests)
+    try:
+        results, stats = run_api(api.summarize_urls, urls)
+    finally:
+        fake_eutils.missing_ids.discard("PMC760002")
+
+    assert [result['status'] for result in results] == ["ok"] * 4
+    assert stats['efetch_requests'] == 1
+    assert (stats['pmc_batched'], stats['fetched_individually'], stats['failed']) == (3, 1, 0)
+    # One multi-ID efetch, then a single-ID efetch for the article missing from it
+    assert fake_eutils.requests[seen:] == [[f"PMC{number}" for number in numbers], ["PMC760002"]]
+    # ... which then falls back to the publisher page
+    assert f"doi/{FAKE_DOI_PREFIX}760002" in fake_eutils.page_requests
+    assert results[1]['data']['title'].startswith("Synthetic page")
+    assert results[0]['data']['title'].startswith("Synthetic article PMC760001")
@@ -0,0 +1,72 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from cache_backends import CacheBackend, SQLiteCacheBackend
+
+
+def store(backend, key, data):
+    now = time.time()
+    backend.set(key, f"https://example.org/{key}", data, now, now + 3600)
+
+
+def test_locked_database_is_a_miss_not_a_stall(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SQLiteCacheBackend(path, busy_timeout=0.005)
+    store(backend, "a", {'title': 'a'})
+
+    # Another worker process holds the write lock
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        store(backend, "b", {'title': 'b'})
+        backend.delete("a")
+        assert time.perf_counter() - started < 1.0
+        assert backend.busy == 2
+        # WAL readers are not blocked by the writer
+        assert backend.get("a")[0] == {'title': 'a'}
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+    assert backend.get("b") is None
+    assert backend.get_stats()['busy'] == 2
+    backend.close()
+
+
+def test_close_closes_every_thread_connection(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    store(backend, "a", {'title': 'a'})
+    connections = []
+
+    def read():
+        backend.get("a")
+        connections.append(backend._local.connection)
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connections.append(backend._local.connection)
+
+    backend.close()
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+    # The backend stays usable; the calling thread opens a new connection
+    assert backend.get("a")[0] == {'title': 'a'}
+    backend.close()
+
+
+def test_incomplete_backend_fails_when_created():
+    class GetOnlyBackend(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="abstract"):
+        GetOnlyBackend()
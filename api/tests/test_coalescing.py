@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def slow_upstream(fake_eutils, fake_model):
+    """Slow efetch and model calls, so concurrent requests overlap."""
+    fake_eutils.latency = 0.2
+    fake_model.latency = 0.2
+    yield fake_eutils, fake_model
+    fake_eutils.latency = 0.0
+
+
+def article_url(number):
+    return f"https://pmc.ncbi.nlm.nih.gov/articles/PMC{number}/"
+
+
+def sse_events(body):
+    """The (event, data) pairs of a Server-Sent Events body."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def efetches(server, seen, pmc_id):
+    return [ids for ids in server.requests[seen:] if pmc_id in ids]
+
+
+def test_concurrent_requests_share_one_fetch_and_model_call(api, slow_upstream, run_api):
+    server, model = slow_upstream
+    url = article_url(770001)
+    seen = len(server.requests)
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/summarize-get", params={"url": url}) for _ in range(8)))
+
+    responses = run_api(main)
+    assert [response.status_code for response in responses] == [200] * 8
+    assert len({response.content for response in responses}) == 1
+    assert efetches(server, seen, "PMC770001") == [["PMC770001"]]
+    assert model.calls == 1
+    assert api.summarize_flights.get_stats()['waiting'] == 0
+
+
+def test_streams_and_batches_join_the_same_summarization(api, slow_upstream, run_api):
+    server, model = slow_upstream
+    url = article_url(770002)
+    seen = len(server.requests)
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            streams = [client.get("/summarize-get/stream", params={"url": url}) for _ in range(3)]
+            get = client.get("/summarize-get", params={"url": url})
+            return await asyncio.gather(*streams, get, api.summarize_urls([url]))
+
+    *streams, get, (batch_results, _) = run_api(main)
+    summary = get.json()['simplified_ai_version']
+    for response in streams:
+        events = sse_events(response.text)
+        names = [name for name, _ in events]
+        assert names[0] == "sections" and names[-1] == "done"
+        assert set(names[1:-1]) == {"token"}
+        assert "".join(data["text"] for name, data in events if name == "token").strip() == summary
+        assert events[-1][1] == get.json()
+    assert batch_results[0]['data'] == get.json()
+    # The batch fetched the article itself, but joined the summarization in flight
+    assert len(efetches(server, seen, "PMC770002")) == 2
+    assert model.calls == 1
+
+
+def test_joined_streams_follow_the_streamed_summary(api, slow_upstream, run_api):
+    server, model = slow_upstream
+    url = article_url(770003)
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/summarize-get/stream", params={"url": url}) for _ in range(3)))
+
+    streams = [sse_events(response.text) for response in run_api(main)]
+    assert model.calls == 1
+    for events in streams:
+        assert [name for name, _ in events] == ["sections"] + ["token"] * model.stream_chunks + ["done"]
+        assert events == streams[0]
+
+
+def test_waiters_that_leave_stop_counting(api, run_api):
+    flights = api.SingleFlight("test")
+    release = asyncio.Event
+
+    async def main():
+        done = release()
+
+        async def work():
+            await done.wait()
+            return "result"
+
+        leader = asyncio.ensure_future(flights.do("key", work))
+        followers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert flights.get_stats()['waiting'] == 4
+        for follower in followers:
+            follower.cancel()
+        await asyncio.sleep(0.01)
+        waiting_after_cancel = flights.get_stats()['waiting']
+        done.set()
+        return waiting_after_cancel, await leader
+
+    waiting_after_cancel, result = run_api(main)
+    assert waiting_after_cancel == 1
+    assert result == "result"
+    stats = flights.get_stats()
+    assert (stats['waiting'], stats['in_flight'], stats['executions'], stats['coalesced_waiters']) == (0, 0, 1, 3)
+    assert stats['max_waiters'] == 4
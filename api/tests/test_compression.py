@@ -0,0 +1,85 @@
+import gzip
+
+import pytest
+from starlette.testclient import TestClient
+
+from compression import ResponseEncoder, etag_matches, negotiate_encoding
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.1, br;q=0", "gzip"),
+    ("gzip;q=0, *", "br"),
+    ("identity", None),
+    ("GZIP ; q=0.8", "gzip"),
+    ("gzip;q=oops", None),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, ("br", "gzip")) == expected
+
+
+def test_negotiate_encoding_offers_only_supported_codings():
+    assert negotiate_encoding("br", ("gzip",)) is None
+    assert negotiate_encoding("br, *;q=0.5", ("gzip",)) == "gzip"
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    ('"abc"', True),
+    ('"abc-gzip"', True),
+    ('"abc-br"', True),
+    ('W/"abc-gzip"', True),
+    ('"other", "abc-br"', True),
+    ('*', True),
+    ('"abcd"', False),
+    ('"abc-deflate"', False),
+    ('"other-gzip"', False),
+])
+def test_etag_matches_any_variant(if_none_match, expected):
+    assert etag_matches(if_none_match, '"abc"') is expected
+
+
+def test_response_not_modified_for_compressed_variant():
+    encoder = ResponseEncoder(min_size=16)
+    payload = encoder.payload({"text": "microgravity " * 20})
+
+    response = encoder.response(payload, {"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == payload.etag_for("gzip")
+    assert gzip.decompress(response.body) == payload.body
+
+    response = encoder.response(payload, {"accept-encoding": "gzip", "if-none-match": payload.etag_for("gzip")},
+                                {"X-Extra": "1"})
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == payload.etag_for("gzip")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["x-extra"] == "1"
+    assert encoder.not_modified == 1
+
+    # The identity ETag matches too; a changed body does not
+    assert encoder.response(payload, {"if-none-match": payload.etag}).status_code == 304
+    changed = encoder.payload({"text": "radiation " * 20})
+    assert encoder.response(changed, {"if-none-match": payload.etag_for("gzip")}).status_code == 200
+
+
+def test_corpus_endpoint_revalidates(api):
+    client = TestClient(api.app)
+    response = client.get("/corpus", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    response = client.get("/corpus", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["x-corpus-version"]
+    # An identity client revalidating a gzip ETag gets a 304 too
+    assert client.get("/corpus", headers={"Accept-Encoding": "identity", "If-None-Match": etag}).status_code == 304
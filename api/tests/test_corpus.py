@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from corpus import CorpusManager
+
+
+def write_papers(path, papers, mtime_ns):
+    path.write_text(json.dumps(papers), encoding="utf-8")
+    # Explicit mtimes: rewrites within one clock tick would otherwise look unchanged
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def papers_file(tmp_path):
+    path = tmp_path / "papers.json"
+    write_papers(path, {"Biology": [{"title": "Bone loss in microgravity"}]}, 1_000_000_000)
+    return path
+
+
+def test_reload_swaps_snapshot_when_content_changes(papers_file):
+    manager = CorpusManager(str(papers_file), index_builders={"count": len})
+    first = manager.snapshot
+    assert first.version == 1
+    assert first.papers[0]["category"] == "Biology"
+
+    write_papers(papers_file, {"Biology": [{"title": "Bone loss"}, {"title": "Muscle atrophy"}]}, 2_000_000_000)
+    assert manager.reload_if_changed() is True
+    second = manager.snapshot
+    assert second is not first
+    assert second.version == 2
+    assert second.content_hash != first.content_hash
+    assert second.indexes["count"] == 2
+    assert manager.reload_count == 1
+
+
+def test_unchanged_file_keeps_snapshot(papers_file):
+    manager = CorpusManager(str(papers_file))
+    first = manager.snapshot
+
+    # Same mtime and size: not even read
+    assert manager.reload_if_changed() is False
+    assert manager.snapshot is first
+
+    # Touched but identical content: read and hashed, not rebuilt
+    os.utime(papers_file, ns=(3_000_000_000, 3_000_000_000))
+    assert manager.reload_if_changed() is False
+    assert manager.snapshot is first
+    assert manager.reload_count == 0
+
+
+def test_malformed_json_keeps_previous_snapshot(papers_file):
+    manager = CorpusManager(str(papers_file))
+    first = manager.snapshot
+
+    papers_file.write_text('{"Biology": [', encoding="utf-8")
+    os.utime(papers_file, ns=(4_000_000_000, 4_000_000_000))
+    assert manager.reload_if_changed() is False
+    assert manager.snapshot is first
+    assert manager.last_error.startswith("JSONDecodeError")
+
+    write_papers(papers_file, [{"title": "Plant growth"}], 5_000_000_000)
+    assert manager.reload_if_changed() is True
+    assert manager.snapshot.papers[0]["title"] == "Plant growth"
+    assert manager.last_error is None
+
+
+def test_missing_file_serves_empty_corpus(tmp_path):
+    manager = CorpusManager(str(tmp_path / "missing.json"))
+    assert manager.snapshot.papers == ()
+    assert manager.snapshot.content_hash is None
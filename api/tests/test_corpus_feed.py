@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+from starlette.testclient import TestClient
+
+from compression import ResponseEncoder
+from corpus import CorpusManager
+from corpus_feed import CorpusFeedBuilder
+
+
+def papers(count, revised=()):
+    return [
+        {"id": n, "title": f"Study {n}" + (" (revised)" if n in revised else ""),
+         "category": "Biology" if n % 2 else "Physics"}
+        for n in range(count)
+    ]
+
+
+def body(payload):
+    return json.loads(payload.body)
+
+
+def test_delta_holds_only_changed_and_removed_papers():
+    builder = CorpusFeedBuilder(ResponseEncoder())
+    first = builder(papers(4))
+    second = builder(papers(3, revised={1}) + [{"id": 9, "title": "New study", "category": "Biology"}])
+
+    delta = body(second.delta(first.version))
+    assert delta["delta"] is True
+    assert delta["since"] == first.version
+    assert delta["changed"] == {"Biology": [{"id": 1, "title": "Study 1 (revised)"}, {"id": 9, "title": "New study"}]}
+    assert delta["removed"] == ["3"]
+
+    # A category slice compares only that category
+    physics = body(second.delta(first.version, "Physics"))
+    assert (physics["changed"], physics["removed"]) == ({}, [])
+    assert body(second.delta(second.version))["changed_count"] == 0
+
+
+def test_unknown_version_has_no_delta():
+    builder = CorpusFeedBuilder(ResponseEncoder())
+    feed = builder(papers(2))
+    assert feed.delta("0123456789abcdef") is None
+
+
+def test_history_keeps_the_last_versions():
+    builder = CorpusFeedBuilder(ResponseEncoder(), max_versions=20)
+    feeds = [builder(papers(n + 1)) for n in range(21)]
+    latest = feeds[-1]
+
+    assert builder.get_stats()["versions"] == [feed.version for feed in feeds[1:]]
+    assert latest.delta(feeds[0].version) is None
+    # Papers 2..20 were added since the oldest version still remembered
+    delta = body(latest.delta(feeds[1].version))
+    assert (delta["changed_count"], delta["removed"]) == (19, [])
+
+
+@pytest.fixture
+def corpus(api, tmp_path, monkeypatch):
+    """A temporary papers.json installed as the app's corpus; returns a function rewriting it."""
+    path = tmp_path / "papers.json"
+
+    def write(papers_by_category, mtime_ns):
+        path.write_text(json.dumps(papers_by_category), encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    write({"Biology": [{"id": 1, "title": "Bone loss"}, {"id": 2, "title": "Muscle atrophy"}]}, 1_000_000_000)
+    manager = CorpusManager(str(path), index_builders=api.corpus_manager.index_builders)
+    monkeypatch.setattr(api, "corpus_manager", manager)
+    return write, manager
+
+
+def test_corpus_endpoint_serves_deltas_and_versions(api, corpus):
+    write, manager = corpus
+    client = TestClient(api.app)
+
+    full = client.get("/corpus")
+    assert full.status_code == 200
+    version = full.headers["x-corpus-version"]
+    assert full.json()["version"] == version
+    assert full.json()["delta"] is False
+
+    # The client's copy is current
+    not_modified = client.get("/corpus", headers={"If-None-Match": full.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["x-corpus-version"] == version
+
+    write({"Biology": [{"id": 1, "title": "Bone loss"}, {"id": 2, "title": "Muscle atrophy in spaceflight"}]},
+          2_000_000_000)
+    assert manager.reload_if_changed() is True
+
+    delta = client.get("/corpus", params={"since": version})
+    assert delta.status_code == 200
+    assert delta.headers["x-corpus-version"] != version
+    assert delta.json()["changed"] == {"Biology": [{"id": 2, "title": "Muscle atrophy in spaceflight"}]}
+    assert delta.json()["removed"] == []
+
+    # An unknown version gets the full payload
+    unknown = client.get("/corpus", params={"since": "0123456789abcdef"})
+    assert unknown.json()["delta"] is False
+    assert unknown.json()["paper_count"] == 2
@@ -0,0 +1,26 @@
+import pytest
+
+from identity import IdentityResolver
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("https://www.ncbi.nlm.nih.gov/pmc/articles/PMC4095884/", "PMC4095884"),
+    ("https://pmc.ncbi.nlm.nih.gov/articles/pmc4095884", "PMC4095884"),
+    ("https://nih.gov/articles/PMC4095884", "PMC4095884"),
+    ("https://pubmed.ncbi.nlm.nih.gov/25012345/", "PMID:25012345"),
+    ("https://europepmc.org/article/MED/25012345", "PMID:25012345"),
+    ("https://doi.org/10.1038/NPJMGRAV.2016.5", "DOI:10.1038/npjmgrav.2016.5"),
+])
+def test_parses_article_urls(url, canonical):
+    assert IdentityResolver.parse(url).canonical == canonical
+
+
+@pytest.mark.parametrize("url", [
+    "https://evilnih.gov/articles/PMC4095884/",
+    "https://notncbi.nlm.nih.gov.example.com/pmc/articles/PMC4095884/",
+    "https://fakeeuropepmc.org/article/MED/25012345",
+    "https://notdoi.org/10.1038/npjmgrav.2016.5",
+])
+def test_lookalike_hosts_are_not_article_hosts(url):
+    identity = IdentityResolver.parse(url)
+    assert identity.pmcid is None and identity.pmid is None and identity.doi is None
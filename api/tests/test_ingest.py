@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+from ingest import CorpusIngestor, IngestCheckpoint
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def pmc_urls(start, count):
+    return [f"https://pmc.ncbi.nlm.nih.gov/articles/PMC{number}/" for number in range(start, start + count)]
+
+
+def requested_ids(server, since):
+    return {pmc_id for ids in server.requests[since:] for pmc_id in ids}
+
+
+def test_resumes_from_checkpoint(api, fake_eutils, fake_model, run_api, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    links = pmc_urls(710001, 5)
+    ingestor = CorpusIngestor(api.summarize_urls, checkpoint, workers=2, batch_size=2)
+
+    first = run_api(ingestor.run, links, limit=3)
+    assert first['state'] == "completed"
+    assert (first['processed'], first['summarized'], first['failed']) == (3, 3, 0)
+    assert IngestCheckpoint(checkpoint).completed == set(links[:3])
+
+    seen = len(fake_eutils.requests)
+    second = run_api(ingestor.run, links)
+    assert second['skipped_from_checkpoint'] == 3
+    assert (second['total'], second['summarized']) == (2, 2)
+    # Only the papers missing from the checkpoint are fetched again
+    assert requested_ids(fake_eutils, seen) == {"PMC710004", "PMC710005"}
+    assert IngestCheckpoint(checkpoint).completed == set(links)
+
+
+def test_failures_are_counted_and_retried(api, fake_eutils, fake_model, run_api, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    broken = fake_eutils.base_url + "/no-such-article"  # The fake server answers 404
+    links = pmc_urls(720001, 2) + [broken]
+    ingestor = CorpusIngestor(api.summarize_urls, checkpoint, workers=1, batch_size=3)
+
+    stats = run_api(ingestor.run, links)
+    assert (stats['processed'], stats['summarized'], stats['failed']) == (3, 2, 1)
+    assert IngestCheckpoint(checkpoint).status[broken] == "error"
+    with open(checkpoint, "r", encoding="utf-8") as file:
+        entries = [json.loads(line) for line in file]
+    assert [entry['detail'] for entry in entries if entry['url'] == broken]
+
+    # Failed papers are not completed, so the next run tries them again
+    retry = run_api(ingestor.run, links)
+    assert (retry['skipped_from_checkpoint'], retry['total'], retry['failed']) == (2, 1, 1)
+
+
+def test_populates_the_summary_cache(api, fake_eutils, fake_model, run_api, tmp_path):
+    links = pmc_urls(730001, 4)
+    ingestor = CorpusIngestor(api.summarize_urls, str(tmp_path / "checkpoint.jsonl"), workers=2, batch_size=4)
+
+    seen = len(fake_eutils.requests)
+    stats = run_api(ingestor.run, links)
+    assert stats['summarized'] == 4
+    # One multi-ID efetch for the whole batch
+    assert stats['efetch_requests'] == 1
+    assert fake_eutils.requests[seen:] == [[f"PMC{number}" for number in range(730001, 730005)]]
+    for url in links:
+        summary = api.summarization_cache.get(url)
+        assert summary is not None and summary['simplified_ai_version']
+
+    # A fresh checkpoint finds everything in the cache: no fetch, no model call
+    calls = fake_model.calls
+    again = CorpusIngestor(api.summarize_urls, str(tmp_path / "other.jsonl"), workers=1, batch_size=4)
+    stats = run_api(again.run, links)
+    assert (stats['cached'], stats['summarized']) == (4, 0)
+    assert fake_model.calls == calls
+
+
+def run_cli(*args, env=None):
+    return subprocess.run(
+        [sys.executable, "ingest.py", *args], cwd=API_DIR, capture_output=True, text=True, timeout=120,
+        env={**os.environ, 'PARSE_WORKERS': '0', 'CORPUS_RELOAD_INTERVAL': '0', 'LOG_LEVEL': 'WARNING', **(env or {})},
+    )
+
+
+def test_fake_run_keeps_out_of_real_checkpoint_and_cache(tmp_path):
+    database = tmp_path / "cache.sqlite3"
+    env = {'CACHE_BACKEND': 'sqlite', 'CACHE_DB_PATH': str(database),
+           'INGEST_CHECKPOINT_PATH': str(tmp_path / "real.jsonl")}
+
+    refused = run_cli("--fake", "--limit", "2", "--checkpoint", str(tmp_path / "real.jsonl"), env=env)
+    assert refused.returncode == 2
+    assert "checkpoint of real runs" in refused.stderr
+
+    fake_checkpoint = tmp_path / "fake.jsonl"
+    result = run_cli("--fake", "--limit", "2", "--workers", "1", "--checkpoint", str(fake_checkpoint), env=env)
+    assert result.returncode == 0, result.stderr
+    stats = json.loads(result.stdout[result.stdout.index("{"):])
+    assert stats['summarized'] == 2
+    assert len(IngestCheckpoint(str(fake_checkpoint)).completed) == 2
+    assert not (tmp_path / "real.jsonl").exists()
+    # The synthetic summaries stayed in memory
+    if database.exists():
+        with sqlite3.connect(database) as connection:
+            tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            assert all(connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0 for table in tables)
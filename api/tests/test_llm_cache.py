@@ -0,0 +1,54 @@
+import pytest
+
+from fakes import publisher_page
+
+
+@pytest.fixture
+def same_article_pages(fake_eutils, tmp_path):
+    """Publisher pages with identical content under several names (recorded responses)."""
+    content = publisher_page("llm-cache-article")
+    for name in ("llm-cache-a", "llm-cache-b", "llm-cache-c"):
+        (tmp_path / f"{name}.html").write_text(content, encoding="utf-8")
+    fake_eutils.recordings = str(tmp_path)
+    yield lambda name: fake_eutils.page_url(name)
+    fake_eutils.recordings = None
+
+
+def test_same_prompt_hits_across_urls(api, fake_model, same_article_pages, run_api):
+    cache = api.llm_cache
+    before = cache.get_cache_stats()
+
+    first = run_api(api.refresh_summary, same_article_pages("llm-cache-a"))
+    second = run_api(api.refresh_summary, same_article_pages("llm-cache-b"))
+
+    # Different URLs (and summary cache entries), same prompt: one model call
+    assert api.summarization_cache._generate_cache_key(same_article_pages("llm-cache-a")) != \
+        api.summarization_cache._generate_cache_key(same_article_pages("llm-cache-b"))
+    assert fake_model.calls == 1
+    assert second.data['simplified_ai_version'] == first.data['simplified_ai_version']
+    stats = cache.get_cache_stats()
+    assert stats['hits'] == before['hits'] + 1
+    assert stats['prompt_tokens_saved'] > before['prompt_tokens_saved']
+    assert stats['output_tokens_saved'] > before['output_tokens_saved']
+
+
+def test_other_model_misses(api, fake_model, same_article_pages, run_api):
+    run_api(api.refresh_summary, same_article_pages("llm-cache-a"))
+    calls = fake_model.calls
+
+    fake_model.model_name = "models/another-model"
+    run_api(api.refresh_summary, same_article_pages("llm-cache-c"))
+    assert fake_model.calls == calls + 1
+
+
+def test_prompt_key_is_content_addressed(api):
+    key = api.LLMResponseCache.prompt_key
+    assert key("models/a", "prompt") == key("models/a", "prompt")
+    assert key("models/a", "prompt") != key("models/b", "prompt")
+    assert key("models/a", "prompt") != key("models/a", "prompt ")
+    # Keys are not normalized like URLs
+    cache = api.LLMResponseCache(ttl_hours=1)
+    cache.set_response("models/a", "prompt", "text")
+    assert cache.get_response("models/a", "prompt") == "text"
+    assert cache.get_response("models/b", "prompt") is None
+    assert cache.get_response("models/a", "Prompt") is None
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import logging
+
+import pytest
+
+from logging_setup import RequestIdMiddleware, configure_logging, request_id_var
+
+
+@pytest.fixture
+def log_output():
+    """Route the astrolens loggers to a buffer; returns (logger, flush) where flush returns the output."""
+    root = logging.getLogger("astrolens")
+    saved = root.handlers[:], root.level, root.propagate
+    stream = io.StringIO()
+    state = configure_logging(level="DEBUG", fmt="text", stream=stream)
+
+    def flush():
+        state.stop()
+        return stream.getvalue()
+
+    yield logging.getLogger("astrolens.test"), flush
+    state.stop()
+    root.handlers[:], root.level, root.propagate = saved
+
+
+def test_container_arguments_are_logged_as_they_were(log_output):
+    logger, flush = log_output
+    ids = ["PMC1"]
+    details = {"status": "pending"}
+    logger.info("Fetching %s", ids)
+    logger.info("Status %(status)s", details)
+    ids.append("PMC2")
+    details["status"] = "done"
+
+    output = flush()
+    assert "Fetching ['PMC1']" in output
+    assert "Status pending" in output
+
+
+def test_scalar_arguments_are_formatted_on_the_listener(log_output):
+    logger, flush = log_output
+    records = []
+    handler = logger.parent.handlers[0]
+    original = handler.enqueue
+    handler.enqueue = lambda record: (records.append(record), original(record))
+    logger.info("Fetched %s (%d bytes)", "PMC1", 42)
+
+    assert records[0].args == ("PMC1", 42)
+    assert "Fetched PMC1 (42 bytes)" in flush()
+
+
+def response_request_id(header_value):
+    """Send a request with X-Request-ID through the middleware; returns (ID seen by the app, response header)."""
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(request_id_var.get())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def main():
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "headers": [(b"x-request-id", header_value.encode("latin-1"))]}
+        await RequestIdMiddleware(app)(scope, None, send)
+        return dict(messages[0]["headers"])[b"x-request-id"].decode("latin-1")
+
+    echoed = asyncio.run(main())
+    return seen[0], echoed
+
+
+def test_well_formed_request_id_is_reused():
+    assert response_request_id("abc-123.4:5") == ("abc-123.4:5", "abc-123.4:5")
+
+
+@pytest.mark.parametrize("header_value", ["abc\n", "abc\ninjected line", "a b", "x" * 65, ""])
+def test_malformed_request_id_is_replaced(header_value):
+    seen, echoed = response_request_id(header_value)
+    assert seen == echoed
+    assert echoed != header_value and "\n" not in echoed
+    assert len(echoed) == 16
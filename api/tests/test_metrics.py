@@ -0,0 +1,61 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from metrics import MetricsMiddleware, MetricsRegistry
+
+
+def scrape(client, prefix):
+    body = client.get("/metrics").text
+    return [line for line in body.splitlines() if line.startswith(prefix)]
+
+
+def test_requests_are_labelled_by_route_template():
+    registry = MetricsRegistry("test")
+    requests = registry.counter("http_requests_total", "Requests", ["route", "method", "status"])
+    latency = registry.histogram("http_request_duration_seconds", "Latency", ["route", "method"], buckets=(0.5, 1.0))
+
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return item_id
+
+    @app.get("/metrics")
+    async def metrics():
+        return PlainTextResponse(registry.render())
+
+    app.add_middleware(MetricsMiddleware, requests=requests, latency=latency,
+                       in_flight=registry.gauge("in_flight", "In flight"), excluded_paths=["/metrics"])
+    client = TestClient(app)
+    for item_id in ("1", "2", "3"):
+        assert client.get(f"/items/{item_id}?q={item_id}").status_code == 200
+    assert client.get("/nowhere/4").status_code == 404
+
+    assert scrape(client, "test_http_requests_total{") == [
+        'test_http_requests_total{route="/items/{item_id}",method="GET",status="200"} 3',
+        'test_http_requests_total{route="unmatched",method="GET",status="404"} 1',
+    ]
+    histogram = scrape(client, 'test_http_request_duration_seconds')
+    item_series = [line for line in histogram if 'route="/items/{item_id}"' in line]
+    assert [line.rsplit(" ", 1)[0] for line in item_series] == [
+        'test_http_request_duration_seconds_bucket{route="/items/{item_id}",method="GET",le="0.5"}',
+        'test_http_request_duration_seconds_bucket{route="/items/{item_id}",method="GET",le="1"}',
+        'test_http_request_duration_seconds_bucket{route="/items/{item_id}",method="GET",le="+Inf"}',
+        'test_http_request_duration_seconds_sum{route="/items/{item_id}",method="GET"}',
+        'test_http_request_duration_seconds_count{route="/items/{item_id}",method="GET"}',
+    ]
+    assert item_series[2].endswith(" 3") and item_series[4].endswith(" 3")
+    assert not any("/items/1" in line or "/metrics" in line for line in histogram)
+
+
+def test_app_metrics_use_route_templates(api):
+    client = TestClient(api.app)
+    client.get("/cache/stats", params={"verbose": "raw-value"})
+
+    lines = scrape(client, "astrolens_http_requests_total{")
+    assert any(line.startswith('astrolens_http_requests_total{route="/cache/stats",method="GET",status="200"}')
+               for line in lines)
+    assert not any("raw-value" in line for line in lines)
+    assert any(line.startswith('astrolens_http_request_duration_seconds_count{route="/cache/stats",method="GET"}')
+               for line in client.get("/metrics").text.splitlines())
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, ResilientUpstream, RetryPolicy, TokenBucket
+
+
+def efetch_url(server, pmc_id):
+    return f"{server.base_url}/efetch.fcgi?db=pmc&id={pmc_id}&rettype=full&retmode=xml"
+
+
+def make_upstream(max_attempts=3, failure_threshold=5, recovery_timeout=30.0):
+    return ResilientUpstream(
+        "test",
+        TokenBucket("test", 0),
+        CircuitBreaker("test", failure_threshold, recovery_timeout),
+        RetryPolicy(max_attempts=max_attempts, base_delay=0.01),
+        max_wait=5.0,
+    )
+
+
+def test_retries_throttled_requests(api, fake_eutils, run_api):
+    upstream = make_upstream()
+    url = efetch_url(fake_eutils, "PMC740001")
+    fake_eutils.fail_next(2, status=429)
+    seen = len(fake_eutils.requests)
+
+    response = run_api(upstream.call, lambda: api.http_pool.get(url))
+    assert response.status_code == 200
+    assert len(fake_eutils.requests) - seen == 3
+    assert (upstream.attempts, upstream.retries, upstream.failures) == (3, 2, 2)
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_gives_up_after_max_attempts(api, fake_eutils, run_api):
+    upstream = make_upstream(max_attempts=2)
+    fake_eutils.fail_next(2, status=503)
+
+    response = run_api(upstream.call, lambda: api.http_pool.get(efetch_url(fake_eutils, "PMC740002")))
+    # The last response is returned as is
+    assert response.status_code == 503
+    assert upstream.attempts == 2
+
+
+def test_breaker_trips_and_recovers(api, fake_eutils, run_api):
+    upstream = make_upstream(max_attempts=1, failure_threshold=2, recovery_timeout=0.2)
+    url = efetch_url(fake_eutils, "PMC740003")
+
+    async def scenario():
+        fake_eutils.fail_next(2, status=500)
+        for _ in range(2):
+            assert (await upstream.call(lambda: api.http_pool.get(url))).status_code == 500
+        assert upstream.breaker.state == CircuitBreaker.OPEN
+
+        # While open, calls fail fast without reaching the upstream
+        seen = len(fake_eutils.requests)
+        with pytest.raises(CircuitOpenError) as error:
+            await upstream.call(lambda: api.http_pool.get(url))
+        assert error.value.retry_after > 0
+        assert len(fake_eutils.requests) == seen
+
+        # After the recovery timeout one trial call goes through and closes the circuit
+        await asyncio.sleep(0.25)
+        assert upstream.breaker.state == CircuitBreaker.HALF_OPEN
+        assert (await upstream.call(lambda: api.http_pool.get(url))).status_code == 200
+        assert upstream.breaker.state == CircuitBreaker.CLOSED
+        assert upstream.breaker.get_stats()['opened'] == 1
+
+    run_api(scenario)
+
+
+def test_failed_trial_call_reopens_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    breaker.before_call()
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    # Only one trial call at a time while half-open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened == 2
+
+
+def test_batch_efetch_retries_through_the_ncbi_guard(api, fake_eutils, run_api):
+    fake_eutils.fail_next(1, status=429)
+    seen = len(fake_eutils.requests)
+
+    articles, requests_made = run_api(api.fetch_pmc_articles, ["PMC740011", "PMC740012"], "test-key")
+    assert sorted(articles) == ["PMC740011", "PMC740012"]
+    assert requests_made == 1
+    assert fake_eutils.requests[seen:] == [["PMC740011", "PMC740012"]] * 2
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from corpus import flatten_papers
+from retrieval import BM25Index, MatrixIndex
+
+PAPERS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "assets", "papers.json")
+
+QUERIES = [
+    "bone loss in microgravity",
+    "muscle atrophy mice spaceflight",
+    "radiation exposure DNA damage",
+    "plant growth arabidopsis",
+    "immune response astronauts",
+    "cardiovascular",
+    "the of and",
+    "zzzz unknownterm",
+]
+
+
+@pytest.fixture(scope="module")
+def indexes():
+    with open(PAPERS_PATH, "r", encoding="utf-8") as file:
+        papers = flatten_papers(json.load(file))
+    return BM25Index(papers), MatrixIndex(papers)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_numpy_engine_matches_bm25(indexes, query):
+    # numpy is the default /chat and /search engine; it must rank exactly like the postings walk
+    bm25_index, matrix_index = indexes
+    bm25 = bm25_index.search(query, top_k=20)
+    matrix = matrix_index.search(query, top_k=20)
+
+    assert [paper.get('link') for paper, _ in matrix] == [paper.get('link') for paper, _ in bm25]
+    assert [score for _, score in matrix] == pytest.approx([score for _, score in bm25], abs=1e-9)
+
+
+def test_worker_corpus_follows_content_version(tmp_path):
+    import retrieval
+
+    with open(PAPERS_PATH, "rb") as file:
+        raw = file.read()
+    path = tmp_path / "papers.json"
+    path.write_bytes(raw)
+    content_hash = retrieval.load_worker_corpus(str(path))
+    papers = flatten_papers(json.loads(raw))
+    query = "bone loss in microgravity"
+
+    assert retrieval.find_most_relevant_in_corpus(query, str(path), content_hash) == \
+        retrieval.find_most_relevant_paper(query, papers)
+
+    # The loaded version is served from memory, a newer one is loaded on demand,
+    # and a version neither loaded nor in the file is refused
+    path.write_text(json.dumps([{"title": "Bone loss in microgravity", "summary": "", "keywords": []}]))
+    assert retrieval.find_most_relevant_in_corpus(query, str(path), content_hash) == \
+        retrieval.find_most_relevant_paper(query, papers)
+    new_hash = retrieval.load_worker_corpus(str(path), "not-this-version")
+    assert new_hash != content_hash
+    paper, _ = retrieval.find_most_relevant_in_corpus(query, str(path), new_hash)
+    assert paper["title"] == "Bone loss in microgravity"
+    assert retrieval.find_most_relevant_in_corpus(query, str(path), content_hash) is None
+
+
+def test_sequence_engine_sends_only_the_query_to_workers(api, monkeypatch):
+    import asyncio
+    from parse_pool import ParsePool
+
+    pool = ParsePool(workers=1, corpus_path=api.PAPERS_PATH)
+    monkeypatch.setattr(api, "parse_pool", pool)
+    snapshot = api.corpus_manager.snapshot
+    query = "muscle atrophy mice spaceflight"
+    sent = []
+    run = pool.run
+
+    async def recording_run(func, *args, **kwargs):
+        sent.append((func.__name__, args))
+        return await run(func, *args, **kwargs)
+    monkeypatch.setattr(pool, "run", recording_run)
+
+    async def main():
+        await pool.start()
+        try:
+            return await api.retrieve_relevant_papers(query, "sequence", snapshot)
+        finally:
+            await pool.shutdown()
+
+    results = asyncio.run(main())
+    assert results == [api.find_most_relevant_paper(query, list(snapshot.papers))]
+    assert sent == [("find_most_relevant_in_corpus", (query, api.corpus_manager.path, snapshot.content_hash))]
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+
+def article_url(number):
+    return f"https://pmc.ncbi.nlm.nih.gov/articles/PMC{number}/"
+
+
+def expire(api, url, hours_expired, **validators):
+    """Backdate the cached entry for url to hours_expired past its TTL, optionally replacing validators."""
+    cache = api.summarization_cache
+    entry = cache.get_stale(url)
+    timestamp = datetime.now() - timedelta(hours=cache.ttl_hours + hours_expired)
+    cache._store(cache._generate_cache_key(url), url, entry.data, timestamp, {**entry.validators, **validators})
+
+
+@pytest.fixture
+def stats(api):
+    """Changes of the revalidation counters since the start of the test."""
+    before = dict(api.revalidation_stats)
+    return lambda: {key: value - before[key] for key, value in api.revalidation_stats.items()}
+
+
+def test_not_modified_extends_entry_without_model_call(api, fake_eutils, fake_model, run_api, stats):
+    url = article_url(790001)
+    first = run_api(api.refresh_summary, url)
+    assert first.validators['etag']
+    expire(api, url, 2)
+    assert api.summarization_cache.get(url) is None
+
+    entry = run_api(api.refresh_summary, url)
+    assert fake_eutils.conditional_requests[-1] == ["PMC790001"]
+    assert entry.data == first.data
+    assert fake_model.calls == 1
+    assert stats() == {'revalidations': 1, 'not_modified': 1, 'unchanged_content': 0, 'changed_content': 0,
+                       'llm_calls_saved': 1}
+    # Fresh again for another TTL
+    assert api.summarization_cache.get(url) == first.data
+
+
+def test_unchanged_content_reuses_summary(api, fake_eutils, fake_model, run_api, stats):
+    url = article_url(790002)
+    first = run_api(api.refresh_summary, url)
+    # Upstream's ETag changed, the extracted text did not
+    expire(api, url, 2, etag='"an-older-etag"')
+
+    entry = run_api(api.refresh_summary, url)
+    assert entry.data == first.data
+    assert entry.validators['content_hash'] == first.validators['content_hash']
+    assert entry.validators['etag'] == first.validators['etag']
+    assert fake_model.calls == 1
+    assert stats()['unchanged_content'] == 1
+    assert stats()['llm_calls_saved'] == 1
+
+
+def test_changed_content_regenerates_summary(api, fake_eutils, fake_model, run_api, stats):
+    url = article_url(790003)
+    first = run_api(api.refresh_summary, url)
+    expire(api, url, 2)
+    fake_eutils.revisions["PMC790003"] = 1
+
+    entry = run_api(api.refresh_summary, url)
+    assert entry.data['abstract'].startswith("Correction 1")
+    assert entry.data['simplified_ai_version'] != first.data['simplified_ai_version']
+    assert entry.validators['content_hash'] != first.validators['content_hash']
+    assert fake_model.calls == 2
+    assert stats()['changed_content'] == 1
+    assert stats()['llm_calls_saved'] == 0
+    assert api.summarization_cache.get(url) == entry.data
+
+
+UNREACHABLE_URL = "http://127.0.0.1:9/articles/unreachable-paper"
+
+
+async def get(api, url):
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/summarize-get", params={"url": url})
+
+
+def test_stale_hit_is_served_at_once_and_refreshed_once(api, fake_eutils, fake_model, run_api):
+    url = fake_eutils.page_url("stale-while-revalidate")
+    first = run_api(api.refresh_summary, url)
+    expire(api, url, 1)
+    queue = api.summary_refresh_queue
+    before = queue.get_stats()
+    fake_eutils.page_latency = 0.5
+
+    async def main():
+        queue.start()
+        try:
+            started = time.perf_counter()
+            responses = [await get(api, url), await get(api, url)]
+            elapsed = time.perf_counter() - started
+            pending = queue.get_stats()['pending']
+            while queue.get_stats()['pending']:
+                await asyncio.sleep(0.05)
+            return responses, elapsed, pending, await get(api, url)
+        finally:
+            await queue.stop()
+            fake_eutils.page_latency = 0.0
+
+    responses, elapsed, pending, refreshed = run_api(main)
+    for response in responses:
+        assert response.status_code == 200
+        assert response.headers["x-cache"] == "STALE"
+        assert int(response.headers["age"]) >= (api.summarization_cache.ttl_hours + 1) * 3600 - 5
+        assert response.json() == first.data
+    # Neither request waited for the slow upstream
+    assert elapsed < 0.4
+    assert pending == 1
+    stats = queue.get_stats()
+    assert (stats['queued'] - before['queued'], stats['deduplicated'] - before['deduplicated']) == (1, 1)
+    assert stats['completed'] - before['completed'] == 1
+    assert refreshed.headers["x-cache"] == "HIT"
+
+
+def seed_unreachable(api, hours_expired):
+    """A summary for a URL whose host refuses connections, expired hours_expired ago."""
+    api.summarization_cache.set(UNREACHABLE_URL, {'title': 'Kept through the outage', 'link': UNREACHABLE_URL})
+    expire(api, UNREACHABLE_URL, hours_expired)
+
+
+def test_upstream_error_serves_stale_within_window(api, run_api):
+    seed_unreachable(api, api.summarization_cache.stale_while_revalidate_hours + 1)
+    served = api.outage_stats['stale_served']
+
+    response = run_api(get, api, UNREACHABLE_URL)
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == "STALE"
+    assert response.json()['title'] == 'Kept through the outage'
+    assert api.outage_stats['stale_served'] == served + 1
+
+
+def test_upstream_error_fails_after_window(api, run_api, monkeypatch):
+    # Still retained for revalidation, but past the stale-if-error window
+    monkeypatch.setattr(api.summarization_cache, 'stale_if_error_hours', 48)
+    seed_unreachable(api, 49)
+    assert api.summarization_cache.get_stale(UNREACHABLE_URL) is not None
+
+    response = run_api(get, api, UNREACHABLE_URL)
+    assert response.status_code == 400
+    assert "Network error" in response.json()['detail']
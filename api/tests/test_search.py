@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+from starlette.testclient import TestClient
+
+from corpus import CorpusManager
+
+
+@pytest.fixture
+def client(api):
+    return TestClient(api.app)
+
+
+@pytest.fixture
+def corpus(api, tmp_path, monkeypatch):
+    """A corpus of 5 papers in a temporary papers.json, installed as the app's corpus."""
+    path = tmp_path / "papers.json"
+    path.write_text(json.dumps({"Biology": [
+        {"id": n, "title": f"Bone loss study {n}", "summary": "bone loss in microgravity", "keywords": ["bone"]}
+        for n in range(5)
+    ]}), encoding="utf-8")
+    manager = CorpusManager(str(path), index_builders=api.corpus_manager.index_builders)
+    monkeypatch.setattr(api, "corpus_manager", manager)
+    return path, manager
+
+
+def test_sequence_engine_searches_with_numpy(api, client, monkeypatch):
+    response = client.get("/search", params={"q": "bone loss", "engine": "sequence"})
+    assert response.status_code == 200
+    assert response.json()["engine"] == "numpy"
+
+    monkeypatch.setattr(api, "DEFAULT_RETRIEVAL_ENGINE", "sequence")
+    response = client.get("/search", params={"q": "bone loss"})
+    assert response.status_code == 200
+    assert response.json()["engine"] == "numpy"
+
+    assert client.get("/search", params={"q": "bone loss", "engine": "tfidf"}).status_code == 422
+
+
+def test_cursor_pages_through_results(client, corpus):
+    first = client.get("/search", params={"q": "bone loss", "limit": 2}).json()
+    second = client.get("/search", params={"q": "bone loss", "limit": 2, "cursor": first["next_cursor"]}).json()
+    third = client.get("/search", params={"q": "bone loss", "limit": 2, "cursor": second["next_cursor"]}).json()
+    ids = [paper["id"] for page in (first, second, third) for paper in page["results"]]
+    assert sorted(ids) == list(range(5))
+    assert third["next_cursor"] is None
+
+
+def test_cursor_after_corpus_reload_conflicts(client, corpus):
+    path, manager = corpus
+    first = client.get("/search", params={"q": "bone loss", "limit": 2}).json()
+
+    path.write_text(json.dumps([{"id": 9, "title": "Bone loss", "summary": "", "keywords": []}]), encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert manager.reload_if_changed()
+
+    response = client.get("/search", params={"q": "bone loss", "limit": 2, "cursor": first["next_cursor"]})
+    assert response.status_code == 409
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJ2IjoxfQ"])
+def test_malformed_cursor_is_rejected(client, corpus, cursor):
+    response = client.get("/search", params={"q": "bone loss", "limit": 2, "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_cursor_of_another_search_is_rejected(client, corpus):
+    first = client.get("/search", params={"q": "bone loss", "limit": 2}).json()
+    for params in ({"q": "microgravity"}, {"q": "bone loss", "category": "Biology"}, {"q": "bone loss", "engine": "bm25"}):
+        response = client.get("/search", params={**params, "limit": 2, "cursor": first["next_cursor"]})
+        assert response.status_code == 400
@@ -0,0 +1,85 @@
+import glob
+import os
+
+import pytest
+
+from fakes import _paragraph, jats_article, publisher_page
+from html_sections import extract_html_sections
+from pmc_parser import extract_pmc_sections
+from sections import extract_html_sections_bs4, extract_pmc_sections_bs4
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "pages")
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def jats_edge_cases():
+    return read(os.path.join(DATA_DIR, "jats-edge-cases.xml"))
+
+
+# Variants of real efetch layouts; each is compared field by field with the BeautifulSoup parser
+PMC_DOCUMENTS = {
+    "fake-article": jats_article("PMC781001").encode("utf-8"),
+    "fake-article-long": jats_article("PMC781002", paragraphs_per_section=12).encode("utf-8"),
+    "fake-articleset": b"<pmc-articleset>" + jats_article("PMC781003").encode("utf-8") + b"</pmc-articleset>",
+    "fake-article-str": jats_article("PMC781004"),
+    "edge-cases": jats_edge_cases(),
+    "default-namespace": jats_edge_cases().replace(
+        b'<article xmlns:xlink', b'<article xmlns="http://jats.nlm.nih.gov/ns/archiving/1.3/" xmlns:xlink'),
+    "no-section-titles": (
+        "<article><front><article-meta><title-group><article-title>Untitled sections</article-title></title-group>"
+        "</article-meta></front><body>"
+        f"<sec><p>{_paragraph('intro', 3)}</p></sec>"
+        "<sec><p>Methods: cells were cultured in a rotating wall vessel.</p></sec>"
+        "<sec><p>Results showed reduced proliferation.</p></sec>"
+        "<sec><p>Discussion of the implications for long missions.</p></sec>"
+        "</body></article>"
+    ).encode("utf-8"),
+    "no-body": b"<article><front><article-meta><abstract><p>Only an abstract.</p></abstract></article-meta></front></article>",
+}
+
+
+@pytest.mark.parametrize("name", PMC_DOCUMENTS)
+def test_streaming_pmc_parser_matches_beautifulsoup(name):
+    document = PMC_DOCUMENTS[name]
+    assert extract_pmc_sections(document) == extract_pmc_sections_bs4(document)
+
+
+def test_pmc_edge_cases_are_extracted():
+    sections = extract_pmc_sections(jats_edge_cases())
+    assert sections["title"] == "Spaceflight alters Arabidopsis root growth *"
+    # The abstract's titles and labels are left out; the graphical abstract is not used
+    assert sections["abstract"] == "Plants grown on the ISS show altered root skewing.\nRoots skewed x>3 degrees & more."
+    # CDATA is text; nested sections belong to their ancestors; figures are skipped
+    assert "Text in a CDATA section < kept as text >." in sections["introduction"]
+    assert "A doubly nested subsection." in sections["introduction"]
+    assert "Figure caption" not in sections["introduction"]
+    # Tables, footnotes and inline reference lists are skipped; untitled subsections stay in their parent
+    assert sections["materials_methods"] == "Seedlings were grown in hardware. An untitled subsection inside methods."
+    assert "footnote" not in sections["results"]
+    assert sections["discussion"] == "Gravity sensing differs in orbit."
+
+
+PAGES = sorted(glob.glob(os.path.join(PAGES_DIR, "*.html")))
+
+
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+def test_single_pass_html_extractor_matches_beautifulsoup_on_saved_pages(path):
+    page = read(path)
+    assert extract_html_sections(page) == extract_html_sections_bs4(page)
+
+
+@pytest.mark.parametrize("name, kwargs", [
+    ("fake-page", {}),
+    ("fake-page-flat", {"depth": 0}),
+    ("fake-page-deep", {"depth": 40, "paragraphs_per_section": 6}),
+    ("fake-page-short", {"paragraphs_per_section": 1}),
+])
+def test_single_pass_html_extractor_matches_beautifulsoup_on_fake_pages(name, kwargs):
+    page = publisher_page(name, **kwargs)
+    assert extract_html_sections(page) == extract_html_sections_bs4(page)
+    assert extract_html_sections(page.encode("utf-8")) == extract_html_sections_bs4(page.encode("utf-8"))
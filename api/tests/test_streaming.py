@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+def sse_events(body):
+    """The (event, data) pairs of a Server-Sent Events body."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def get_stream(api, run_api):
+    """GET a streaming endpoint through the app and return its events."""
+    def get(path, **params):
+        async def main():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get(path, params=params)
+            assert response.headers["content-type"].startswith("text/event-stream")
+            return response
+        response = run_api(main)
+        return response.headers, sse_events(response.text)
+    return get
+
+
+def test_summary_stream_event_sequence(fake_model, get_stream):
+    url = "https://pmc.ncbi.nlm.nih.gov/articles/PMC780001/"
+    headers, events = get_stream("/summarize-get/stream", url=url)
+    names = [name for name, _ in events]
+    assert names == ["sections"] + ["token"] * fake_model.stream_chunks + ["done"]
+    assert headers["x-cache"] == "MISS"
+    sections, done = events[0][1], events[-1][1]
+    assert sections["title"].startswith("Synthetic article PMC780001")
+    assert "simplified_ai_version" not in sections
+    assert done == {**sections, "simplified_ai_version": done["simplified_ai_version"]}
+    assert "".join(data["text"] for name, data in events[1:-1]).strip() == done["simplified_ai_version"]
+
+    # A cached summary is replayed as a single token
+    headers, events = get_stream("/summarize-get/stream", url=url)
+    assert [name for name, _ in events] == ["sections", "token", "done"]
+    assert headers["x-cache"] == "HIT"
+    assert events[-1][1] == done
+    assert fake_model.calls == 1
+
+
+def test_summary_stream_reports_errors(fake_eutils, get_stream):
+    headers, events = get_stream("/summarize-get/stream", url=fake_eutils.base_url + "/no-such-article")
+    assert [name for name, _ in events] == ["error"]
+    assert events[0][1]["status_code"] == 400
+    assert "404" in events[0][1]["detail"]
+
+
+def test_slow_reader_does_not_hold_an_llm_slot(api, fake_model, run_api):
+    fake_model.latency = 0.05
+    prompt = "A prompt streamed to a slow reader"
+
+    async def main():
+        stream = api.stream_model_content(prompt)
+        first = await stream.__anext__()
+        # The reader stalls; the model finishes in the meantime
+        await asyncio.sleep(0.2)
+        active_while_stalled = api.llm_stats['active']
+        rest = [text async for text in stream]
+        return first, rest, active_while_stalled
+
+    first, rest, active_while_stalled = run_api(main)
+    assert active_while_stalled == 0
+    assert len([first, *rest]) == fake_model.stream_chunks
+    assert api.llm_cache.get_response(api.model_name(), prompt) == first + "".join(rest)
+
+
+def test_chat_stream_event_sequence(fake_model, get_stream):
+    headers, events = get_stream("/chat/stream", message="How does microgravity affect bone loss in mice?")
+    names = [name for name, _ in events]
+    assert names == ["papers"] + ["token"] * fake_model.stream_chunks + ["done"]
+    papers, done = events[0][1], events[-1][1]
+    assert papers["link"] and papers["engine"] == "numpy"
+    assert done["response"] == "".join(data["text"] for name, data in events[1:-1]).strip()
+    assert done["link"] == papers["link"]
@@ -0,0 +1,38 @@
+import time
+from datetime import datetime, timedelta
+
+from cache_backends import SQLiteCacheBackend
+
+URL_FRESH = "https://pmc.ncbi.nlm.nih.gov/articles/PMC900001/"
+URL_OLD = "https://pmc.ncbi.nlm.nih.gov/articles/PMC900002/"
+
+
+def test_promoted_entry_is_queued_by_its_own_timestamp(api, tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    cache = api.SummarizationCache(ttl_hours=1, backend=backend, revalidate_hours=2,
+                                   stale_while_revalidate_hours=2)
+    cache.set(URL_FRESH, {'title': 'fresh'})
+
+    # Written by another worker 90 minutes ago: expired, but within the stale window
+    stored_at = time.time() - 90 * 60
+    old_key = cache._generate_cache_key(URL_OLD)
+    backend.set(old_key, URL_OLD, {'title': 'old'}, stored_at, stored_at + 3600, retain_until=stored_at + 3 * 3600)
+
+    entry = cache.lookup(URL_OLD)
+    assert entry is not None and entry.stale
+    assert next(iter(cache._expiry_queue)) == old_key
+
+    stats = cache.get_cache_stats()
+    assert stats['expired_entries'] == 1
+    assert stats['active_entries'] == 1
+    backend.close()
+
+
+def test_clear_expired_reaches_promoted_entries(api):
+    cache = api.SummarizationCache(ttl_hours=1)
+    cache.set(URL_FRESH, {'title': 'fresh'})
+    cache._store(cache._generate_cache_key(URL_OLD), URL_OLD, {'title': 'old'}, datetime.now() - timedelta(hours=5))
+
+    assert cache.clear_expired() == 1
+    assert cache.get(URL_OLD) is None
+    assert cache.get(URL_FRESH) == {'title': 'fresh'}
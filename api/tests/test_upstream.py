@@ -0,0 +1,31 @@
+from upstream import UpstreamClientPool
+
+
+def test_per_host_state_is_bounded():
+    pool = UpstreamClientPool(known_hosts=["eutils.ncbi.nlm.nih.gov"], max_hosts=3)
+    pool._host_state("eutils.ncbi.nlm.nih.gov")[1]['requests'] = 5
+    busy = pool._host_state("busy.example")[1]
+    busy['active'] = 1
+    for index in range(10):
+        pool._host_state(f"host{index}.example")[1]['requests'] = 1
+
+    stats = pool.get_stats()
+    # Known hosts and hosts with requests in flight are kept; the oldest idle ones are dropped
+    assert list(stats['hosts']) == ["eutils.ncbi.nlm.nih.gov", "busy.example", "host8.example", "host9.example"]
+    assert stats['hosts']["eutils.ncbi.nlm.nih.gov"]['requests'] == 5
+    assert stats['evicted_hosts'] == {'hosts': 8, 'requests': 8, 'errors': 0}
+
+
+def test_host_metrics_collapse_unknown_hosts(api):
+    pool = api.http_pool
+    pool._host_state("eutils.ncbi.nlm.nih.gov")[1]['requests'] += 2
+    for index in range(pool.max_hosts + 20):
+        pool._host_state(f"attacker{index}.example")[1]['requests'] += 1
+
+    lines = [line for line in api.metrics_registry.render().splitlines()
+             if line.startswith("astrolens_upstream_host_requests_total{")]
+    labels = {line.split('"')[1]: float(line.rsplit(" ", 1)[1]) for line in lines}
+    assert "eutils.ncbi.nlm.nih.gov" in labels
+    assert not any(label.startswith("attacker") for label in labels)
+    # Requests of dropped hosts stay counted, so the counter never goes down
+    assert labels["other"] >= pool.max_hosts + 20
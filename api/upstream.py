@@ -0,0 +1,159 @@
+"""
+Shared HTTP client pool for upstream fetches (NCBI E-utilities, publisher pages).
+
+One ``httpx.AsyncClient`` is created for the lifetime of the application so
+TCP/TLS connections are kept alive and reused across requests, HTTP/2 is
+negotiated where the server supports it, and concurrency per upstream host is
+capped with a semaphore.
+
+Publisher hosts come from user-supplied URLs, so per-host state is bounded:
+beyond ``max_hosts`` hosts, the least recently used idle ones are dropped and
+their counters added to the ``evicted_hosts`` totals. ``known_hosts`` (the
+NCBI and configured upstreams) are never dropped.
+"""
+import asyncio
+import importlib.util
+from collections import OrderedDict
+from typing import Dict, Any, Iterable
+
+import httpx
+
+
+class UpstreamClientPool:
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, per_host_limit: int = 10, http2: bool = True,
+                 known_hosts: Iterable[str] = (), max_hosts: int = 256):
+        """
+        Configure the pool. The client itself is created by start().
+
+        Args:
+            max_connections: Maximum concurrent connections across all hosts
+            max_keepalive_connections: Maximum idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open
+            per_host_limit: Maximum concurrent requests per upstream host
+            http2: Negotiate HTTP/2 when the h2 package is installed
+            known_hosts: Hosts whose state is always kept
+            max_hosts: Other hosts tracked before the least recently used idle ones are dropped
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.per_host_limit = per_host_limit
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._client: httpx.AsyncClient | None = None
+        self.known_hosts = set(known_hosts)
+        self.max_hosts = max(1, max_hosts)
+        # Semaphore and counters per host, least recently used first
+        self._hosts: OrderedDict[str, tuple[asyncio.Semaphore, Dict[str, int]]] = OrderedDict()
+        self._evicted = {'hosts': 0, 'requests': 0, 'errors': 0}
+
+    async def start(self) -> None:
+        """Create the shared client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, http2=self.http2, timeout=30.0)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use if start() was not called."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, http2=self.http2, timeout=30.0)
+        return self._client
+
+    def add_known_hosts(self, *hosts: str) -> None:
+        self.known_hosts.update(host for host in hosts if host)
+
+    def _host_state(self, host: str) -> tuple[asyncio.Semaphore, Dict[str, int]]:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = (
+                asyncio.Semaphore(self.per_host_limit),
+                {'active': 0, 'waiting': 0, 'requests': 0, 'errors': 0},
+            )
+            self._evict_hosts()
+        else:
+            self._hosts.move_to_end(host)
+        return state
+
+    def _evict_hosts(self) -> None:
+        """Drop the least recently used idle hosts outside known_hosts beyond max_hosts."""
+        excess = sum(1 for host in self._hosts if host not in self.known_hosts) - self.max_hosts
+        for host in list(self._hosts):
+            if excess <= 0:
+                return
+            stats = self._hosts[host][1]
+            # A host with requests in flight keeps its semaphore, or its cap would not hold
+            if host in self.known_hosts or stats['active'] or stats['waiting']:
+                continue
+            del self._hosts[host]
+            self._evicted['hosts'] += 1
+            self._evicted['requests'] += stats['requests']
+            self._evicted['errors'] += stats['errors']
+            excess -= 1
+
+    async def get(self, url: str, headers: Dict[str, str] | None = None, timeout: float = 30.0,
+                  follow_redirects: bool = False) -> httpx.Response:
+        """
+        Perform a GET through the shared client, respecting the per-host cap.
+
+        Args:
+            url: URL to fetch
+            headers: Request headers
+            timeout: Request timeout in seconds
+            follow_redirects: Whether to follow redirects
+
+        Returns:
+            The httpx response (body fully read)
+        """
+        host = httpx.URL(url).host
+        semaphore, stats = self._host_state(host)
+
+        stats['waiting'] += 1
+        async with semaphore:
+            stats['waiting'] -= 1
+            stats['active'] += 1
+            stats['requests'] += 1
+            try:
+                return await self.client.get(url, headers=headers, timeout=timeout, follow_redirects=follow_redirects)
+            except Exception:
+                stats['errors'] += 1
+                raise
+            finally:
+                stats['active'] -= 1
+
+    def _connection_stats(self) -> Dict[str, Any]:
+        """Open/idle connection counts from the underlying connection pool."""
+        if self._client is None:
+            return {'open_connections': 0, 'idle_connections': 0}
+        try:
+            # httpx does not expose pool state publicly; read it from the transport's pool
+            connections = self._client._transport._pool.connections
+            idle = sum(1 for connection in connections if connection.is_idle())
+            return {'open_connections': len(connections), 'idle_connections': idle}
+        except Exception:
+            return {'open_connections': None, 'idle_connections': None}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool utilization statistics."""
+        connection_stats = self._connection_stats()
+        open_connections = connection_stats['open_connections']
+        return {
+            'started': self._client is not None,
+            'http2': self.http2,
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+            'keepalive_expiry': self.limits.keepalive_expiry,
+            'per_host_limit': self.per_host_limit,
+            **connection_stats,
+            'utilization': round(open_connections / self.limits.max_connections, 4) if open_connections is not None else None,
+            'max_hosts': self.max_hosts,
+            'hosts': {host: dict(stats) for host, (_, stats) in self._hosts.items()},
+            'evicted_hosts': dict(self._evicted),
+        }